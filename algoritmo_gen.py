@@ -1,6 +1,11 @@
+import time
 import numpy as np
-from funciones_redes import red_completa
-from sklearn.metrics import f1_score
+from funciones_redes import red_completa_poblacion
+from tensores import datos_a_tensor, seleccionar_individuos
+from metricas import obtener_metrica
+from checkpoint import EscritorCheckpoint, cargar_checkpoint, estado_optimizacion
+from observadores import notificar, cerrar_observadores
+from diversidad import entropia_posiciones, distancia_hamming
 
 def gen_a_diccionario(gen:list,var_redes:int,var_const:int)->dict:
     '''
@@ -43,8 +48,114 @@ def gen_a_diccionario(gen:list,var_redes:int,var_const:int)->dict:
         dict1["wvar"+str(total-i)]=gen[-i]
     return dict0, dict1
 
+def genes_a_pesos(poblacion:'list | np.ndarray',var_redes:int,var_const:int)->tuple:
+    '''
+    Función encargada de pasar todos los genes de una población a arrays de pesos para
+    usar junto a las funciones vectorizadas de redes, equivale a gen_a_diccionario
+    aplicado a cada gen pero sin construir diccionarios
+    ------------------------------
+    poblacion: lista o array 2d con los genes de la población
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    ----------------------------------
+    RETURN
+    pesos_lstm: array de forma (población, var_redes, 12) con pesos y bias de la red LSTM
+    pesos_const: array de forma (población, var_redes+var_const+1) con los pesos y bias
+    de la red categorica
+    '''
+    poblacion=np.asarray(poblacion,dtype=float)
+    pesos_lstm=poblacion[:,:12*var_redes].reshape(-1,var_redes,12)
+    pesos_const=poblacion[:,12*var_redes:12*var_redes+var_redes+var_const+1]
+    return pesos_lstm, pesos_const
+
+def tipo_indices(genetic_pool:'list | np.ndarray')->type:
+    '''
+    Función encargada de elegir el tipo entero más pequeño para guardar posiciones
+    dentro del genetic_pool
+    ---------------------------------
+    genetic_pool: lista o array de la cual se sacan los valores de los genes
+    ---------------------------------
+    RETURN
+    tipo: np.uint8, np.uint16 o np.uint32 según el tamaño del genetic_pool
+    '''
+    for tipo in (np.uint8,np.uint16):
+        if len(genetic_pool)<=np.iinfo(tipo).max+1:
+            return tipo
+    return np.uint32
+
+def codificar_poblacion(poblacion:'list | np.ndarray',
+                        genetic_pool:'list | np.ndarray')->np.ndarray:
+    '''
+    Función encargada de pasar una población de pesos a posiciones dentro del
+    genetic_pool, de forma que cada gen ocupe 1 o 2 bytes por peso en vez de 8
+    ---------------------------------
+    poblacion: lista o array 2d con los genes, todos sus valores deben estar en el pool
+    genetic_pool: lista o array de la cual se sacaron los valores de los genes
+    ---------------------------------
+    RETURN
+    indices: array 2d contiguo con la posición en el genetic_pool de cada peso
+    '''
+    pool=np.asarray(genetic_pool,dtype=float)
+    poblacion=np.asarray(poblacion,dtype=float)
+    orden=np.argsort(pool,kind="stable")
+    posiciones=np.searchsorted(pool[orden],poblacion).clip(0,len(pool)-1)
+    indices=orden[posiciones]
+    if not (pool[indices]==poblacion).all():
+        raise ValueError("La población tiene valores que no están en el genetic_pool")
+    return np.ascontiguousarray(indices,dtype=tipo_indices(pool))
+
+def decodificar_poblacion(indices:np.ndarray,
+                          genetic_pool:'list | np.ndarray')->np.ndarray:
+    '''
+    Función encargada de pasar una población codificada con codificar_poblacion a los
+    valores de los pesos
+    ---------------------------------
+    indices: array 2d con posiciones dentro del genetic_pool
+    genetic_pool: lista o array de la cual se sacaron los valores de los genes
+    ---------------------------------
+    RETURN
+    poblacion: array 2d con los pesos y bias de cada gen
+    '''
+    return np.asarray(genetic_pool,dtype=float)[indices]
+
+def pesos_codificados(indices:np.ndarray,genetic_pool:'list | np.ndarray',
+                      var_redes:int,var_const:int)->tuple:
+    '''
+    Función encargada de obtener los pesos de una población codificada como arrays para
+    las funciones vectorizadas de redes. Los pesos se decodifican una sola vez y los
+    arrays que se regresan son vistas de ese único array
+    ---------------------------------
+    indices: array 2d con posiciones dentro del genetic_pool
+    genetic_pool: lista o array de la cual se sacaron los valores de los genes
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    ---------------------------------
+    RETURN
+    pesos_lstm: array de forma (población, var_redes, 12)
+    pesos_const: array de forma (población, var_redes+var_const+1)
+    '''
+    return genes_a_pesos(decodificar_poblacion(indices,genetic_pool),var_redes,var_const)
+
+def largo_gen(var_redes:int,var_const:int)->int:
+    '''
+    Función encargada de calcular la cantidad de pesos y bias de un gen
+    ---------------------------------
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    -----------------------------
+    RETURN
+    largo: cantidad de elementos del gen
+    '''
+    if var_const==0:
+        return 12*var_redes
+    return 12*var_redes+var_redes+var_const+1
+
 def crear_individuo(genetic_pool:'list | np.ndarray',
-                    tamano_red:int,tamano_const:int)->list:
+                    tamano_red:int,tamano_const:int,
+                    rng:'np.random.Generator | None'=None)->np.ndarray:
     '''
     Función encargada de crear un gen a partir de una lista de opción
     ---------------------------------
@@ -53,21 +164,17 @@ def crear_individuo(genetic_pool:'list | np.ndarray',
     tamano_red: cantidad de variables que se estiman en la red LSTM
     tamano_const: cantidad de variables que se usan en la red categorica sin incluir las 
     estimadas en la red LSTM
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
     -----------------------------
     RETURN
     individuo: regresa el gen de un individuo
     '''
-    individuo=[]
-    if tamano_const==0:
-        individuo+=[np.random.choice(genetic_pool,12*tamano_red)]
-        return individuo[0]
-    else:
-        individuo+=[np.random.choice(genetic_pool,
-                                         12*tamano_red+tamano_red+tamano_const+1)]
-        return individuo[0]
+    rng=np.random.default_rng(rng)
+    return rng.choice(genetic_pool,largo_gen(tamano_red,tamano_const))
 
 def crear_poblacion(genetic_pool:'list | np.ndarray',var_redes:int, var_const:int,
-                    tamano_poblacion:int)->list:
+                    tamano_poblacion:int,
+                    rng:'np.random.Generator | None'=None)->np.ndarray:
     '''
     Función encargada de crear una población que sera evaluada en sus genes
     ------------------------------
@@ -77,20 +184,174 @@ def crear_poblacion(genetic_pool:'list | np.ndarray',var_redes:int, var_const:in
     var_const: cantidad de variables que se usan en la red categorica sin incluir las 
     estimadas en la red LSTM
     tamano_poblacion: cantidad de individuos de la población
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
     -------------------------------------------
     RETURN
-    poblacion:list Lista con los genes 
+    poblacion: array 2d (tamano_poblacion, largo del gen) con los genes, uno por fila
     '''
-    poblacion=[]
-    for i in range(tamano_poblacion):
-        ind=crear_individuo(genetic_pool=genetic_pool,
-                            tamano_red=var_redes,
-                            tamano_const=var_const)
-        poblacion.append(ind)
-    return poblacion
+    rng=np.random.default_rng(rng)
+    return rng.choice(genetic_pool,(tamano_poblacion,largo_gen(var_redes,var_const)))
+
+def calcular_fitness(poblacion:'list | np.ndarray', data_red:'list | np.ndarray',
+                     data_const:np.ndarray, var_redes:int, var_const:int,
+                     verdadero:np.ndarray,
+                     longitudes:'np.ndarray | None'=None,
+                     metrica:'str | callable'="f1_macro",
+                     cache_lstm=None,tamano_bloque_red:'int | None'=None)->np.ndarray:
+    '''
+    Función encargada de calcular la métrica de desempeño de cada gen de una población
+    ---------------------------------------------------------
+    poblacion: lista o array 2d con los genes a ser puestos a prueba
+    data_red: array de numpy o list con la información necesaria de las variables y 
+    observaciones de cada individuo para realizar la red LSTM
+    data_const: array con información de un individuo y las variables asociadas a este para
+    la predicción binaria
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_red es un tensor rellenado con ceros
+    metrica: nombre de la métrica (ver metricas.METRICAS) o función que recibe
+    (predicciones, verdadero) y regresa el valor de cada gen
+    cache_lstm: CacheLSTM (ver cache_lstm) para no recalcular las salidas de la red LSTM
+    de bloques de pesos ya vistos en estos mismos individuos
+    tamano_bloque_red: cantidad de individuos que pasan a la vez por la red, si es None
+    se elige según el tamaño de la población (ver funciones_redes.tamano_bloque_red)
+    -------------------------------------------------------
+    RETURN
+    fitness: array con la métrica de cada gen
+    '''
+    pesos_lstm,pesos_const=genes_a_pesos(poblacion,var_redes,var_const)
+    predicciones=red_completa_poblacion(data_temp=data_red,data_const=data_const,
+                                        pesos_lstm=pesos_lstm,pesos_const=pesos_const,
+                                        longitudes=longitudes,
+                                        tamano_bloque=tamano_bloque_red,
+                                        cache_lstm=cache_lstm)
+    return obtener_metrica(metrica)(predicciones,verdadero)
+
+def evaluar_poblacion(poblacion:'list | np.ndarray', data_red:'list | np.ndarray',
+                      data_const:np.ndarray, var_redes:int, var_const:int,
+                      verdadero:np.ndarray, longitudes:'np.ndarray | None'=None,
+                      evaluador=None, cache=None, metrica:'str | callable'="f1_macro",
+                      escalonado=None, cache_lstm=None, sustituto=None,
+                      tamano_bloque_red:'int | None'=None)->tuple:
+    '''
+    Función encargada de calcular el fitness de cada gen de una población, con las
+    mismas opciones que fitness_poblacion
+    ---------------------------------------------------------
+    poblacion: lista con los genes a ser puestos a prueba
+    data_red: array de numpy o list con la información necesaria de las variables y 
+    observaciones de cada individuo para realizar la red LSTM
+    data_const: array con información de un individuo y las variables asociadas a este para
+    la predicción binaria
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_red es un tensor rellenado con ceros
+    evaluador: EvaluadorParalelo (ver fitness_paralelo) que ya tiene los datos en memoria
+    compartida, si es None la evaluación se hace en el proceso actual
+    cache: CacheFitness (ver cache_fitness) con el fitness de genes ya evaluados, solo se
+    evaluan los genes que no están guardados (una vez por gen distinto)
+    metrica: nombre de la métrica (ver metricas.METRICAS) o función vectorizada, no se
+    usa si se entrega evaluador (el evaluador ya tiene su métrica)
+    escalonado: EvaluacionEscalonada (ver fitness_escalonado) para evaluar primero en
+    muestras de los individuos y solo los mejores genes con todos. El valor máximo y los
+    mejores parámetros solo se toman de genes evaluados con todos los individuos y solo
+    esos se guardan en el cache. No se puede usar junto con evaluador
+    cache_lstm: CacheLSTM (ver cache_lstm) con salidas de la red LSTM por variable, solo
+    se usa en las evaluaciones con todos los individuos en el proceso actual
+    sustituto: ModeloSustituto (ver sustituto) que estima el fitness de los genes nuevos,
+    solo se evaluan de verdad los de mejor estimación o mayor incertidumbre. Los genes
+    estimados no se consideran completos. No se puede usar junto con escalonado
+    tamano_bloque_red: cantidad de individuos que pasan a la vez por la red en el
+    proceso actual, si es None se elige según el tamaño de la población
+    -------------------------------------------------------
+    RETURN
+    fitness: array con el fitness de cada gen
+    completos: array booleano con los genes evaluados con todos los individuos
+    evaluados: cantidad de genes que se evaluaron (sin contar los del cache ni los
+    estimados con el sustituto)
+    '''
+    poblacion=np.asarray(poblacion)
+    if escalonado is not None and evaluador is not None:
+        raise ValueError("escalonado no se puede usar junto con evaluador")
+    if escalonado is not None and sustituto is not None:
+        raise ValueError("escalonado no se puede usar junto con sustituto")
+    def evaluar(genes):
+        if evaluador is None:
+            return calcular_fitness(genes,data_red,data_const,var_redes,var_const,
+                                    verdadero,longitudes,metrica,cache_lstm,
+                                    tamano_bloque_red)
+        return evaluador.evaluar(genes)
+    def evaluar_muestra(genes,muestra):
+        if muestra is None:
+            return evaluar(genes)
+        tensor,long_muestra=seleccionar_individuos(data_red,longitudes,muestra)
+        return calcular_fitness(genes,tensor,np.asarray(data_const)[muestra],var_redes,
+                                var_const,np.asarray(verdadero)[muestra],long_muestra,
+                                metrica,tamano_bloque_red=tamano_bloque_red)
+    def evaluar_nuevos(genes):
+        if escalonado is not None:
+            return escalonado.evaluar(genes,evaluar_muestra,verdadero)
+        if sustituto is not None:
+            return sustituto.evaluar(genes,evaluar)
+        return evaluar(genes), np.ones(len(genes),dtype=bool)
+    if cache is None:
+        fitness,completos=evaluar_nuevos(poblacion)
+        evaluados=len(poblacion)
+        if sustituto is not None:
+            evaluados=int(completos.sum())
+    else:
+        fitness,faltantes=cache.buscar(poblacion)
+        completos=np.ones(len(poblacion),dtype=bool)
+        evaluados=0
+        if faltantes.any():
+            # genes repetidos dentro de la generación se evaluan una sola vez
+            nuevos,inversa=np.unique(poblacion[faltantes],axis=0,return_inverse=True)
+            valores,nuevos_completos=evaluar_nuevos(nuevos)
+            fitness[faltantes]=valores[inversa.ravel()]
+            completos[faltantes]=nuevos_completos[inversa.ravel()]
+            cache.guardar(nuevos[nuevos_completos],valores[nuevos_completos])
+            evaluados=len(nuevos)
+            if sustituto is not None:
+                evaluados=int(nuevos_completos.sum())
+    return fitness, completos, evaluados
+
+def resumen_fitness(poblacion:'list | np.ndarray',fitness:np.ndarray,
+                    completos:'np.ndarray | None'=None)->tuple:
+    '''
+    Función encargada de obtener la probabilidad de reproducción y el mejor gen a partir
+    del fitness de una población
+    ---------------------------------------------------------
+    poblacion: lista o array 2d con los genes
+    fitness: array con el fitness de cada gen
+    completos: array booleano con los genes evaluados con todos los individuos, solo
+    estos pueden ser el mejor gen. Si es None se consideran todos
+    -------------------------------------------------------
+    RETURN
+    prob_reproduccion: array con las probabilidad de reproducción del gen
+    max_valor:int valor maximo del fitness dentro de la población
+    mejores_params:list lista con los mejores pesos y bias para los datos recolectados 
+    '''
+    if completos is None:
+        candidatos=np.arange(len(fitness))
+    else:
+        candidatos=np.flatnonzero(completos)
+    mejor=candidatos[np.argmax(fitness[candidatos])]
+    max_valor=fitness[mejor]
+    mejores_params=np.asarray(poblacion)[mejor]
+    prob_reproduccion=fitness/fitness.sum()
+    return prob_reproduccion, max_valor, mejores_params
 
 def fitness_poblacion(poblacion:list, data_red:'list | np.ndarray',data_const:np.ndarray,
-                      var_redes:int, var_const:int, verdadero:np.ndarray):
+                      var_redes:int, var_const:int, verdadero:np.ndarray,
+                      longitudes:'np.ndarray | None'=None, evaluador=None, cache=None,
+                      metrica:'str | callable'="f1_macro", escalonado=None,
+                      cache_lstm=None, sustituto=None,
+                      tamano_bloque_red:'int | None'=None):
     '''
     Función encargada de medir el desempeño de una población candidata de solución
     ---------------------------------------------------------
@@ -103,84 +364,207 @@ def fitness_poblacion(poblacion:list, data_red:'list | np.ndarray',data_const:np
     var_const: cantidad de variables que se usan en la red categorica sin incluir las 
     estimadas en la red LSTM
     verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_red es un tensor rellenado con ceros
+    evaluador: EvaluadorParalelo (ver fitness_paralelo) que ya tiene los datos en memoria
+    compartida, si es None la evaluación se hace en el proceso actual
+    cache: CacheFitness (ver cache_fitness) con el fitness de genes ya evaluados, solo se
+    evaluan los genes que no están guardados (una vez por gen distinto)
+    metrica: nombre de la métrica (ver metricas.METRICAS) o función vectorizada, no se
+    usa si se entrega evaluador (el evaluador ya tiene su métrica)
+    escalonado: EvaluacionEscalonada (ver fitness_escalonado) para evaluar primero en
+    muestras de los individuos y solo los mejores genes con todos. El valor máximo y los
+    mejores parámetros solo se toman de genes evaluados con todos los individuos y solo
+    esos se guardan en el cache. No se puede usar junto con evaluador
+    cache_lstm: CacheLSTM (ver cache_lstm) con salidas de la red LSTM por variable, solo
+    se usa en las evaluaciones con todos los individuos en el proceso actual
+    sustituto: ModeloSustituto (ver sustituto) que estima el fitness de los genes nuevos,
+    solo se evaluan de verdad los de mejor estimación o mayor incertidumbre. Los genes
+    estimados no se consideran completos. No se puede usar junto con escalonado
+    tamano_bloque_red: cantidad de individuos que pasan a la vez por la red en el
+    proceso actual, si es None se elige según el tamaño de la población
     -------------------------------------------------------
     RETURN
     prob_reproduccion: array con las probabilidad de reproducción del gen
     max_valor:int valor maximo del fitness dentro de la población
     mejores_params:list lista con los mejores pesos y bias para los datos recolectados 
     '''
-    fitness=[]
-    for i in poblacion:
-        dicc_red, dicc_const=gen_a_diccionario(gen=i,var_redes=var_redes,
-                                               var_const=var_const)
-        prediccion=red_completa(data_temp=data_red,data_const=data_const,
-                                pesos_lstm=dicc_red,pesos_const=dicc_const)
-        metrica=f1_score(y_true=verdadero,y_pred=prediccion,average='macro')
-        fitness.append(metrica)
-    fitness=np.array(fitness)
     poblacion=np.array(poblacion)
-    max_valor=fitness[np.where(fitness==fitness.max())[0][0]]
-    mejores_params=poblacion[np.where(fitness==fitness.max())[0][0]]
-    prob_reproduccion=fitness/fitness.sum()
-    return prob_reproduccion, max_valor, mejores_params
+    fitness,completos,evaluados=evaluar_poblacion(poblacion,data_red,data_const,
+                                                  var_redes,var_const,verdadero,
+                                                  longitudes,evaluador,cache,metrica,
+                                                  escalonado,cache_lstm,sustituto,
+                                                  tamano_bloque_red)
+    return resumen_fitness(poblacion,fitness,completos)
 
-def reproduccion(poblacion:list,prob_reproduccion:np.ndarray,
-                 var_redes:int, var_const:int)->list:
+# formas de elegir los padres en optimizar_gen
+SELECCIONES=("proporcional","rango","torneo")
+
+def seleccionar_padres(prob_reproduccion:np.ndarray,
+                       rng:'np.random.Generator | None'=None,
+                       parejas:'int | None'=None)->np.ndarray:
     '''
-    Función encargada de generar la decendencia de una población de genes, esta cuenta con
-    una probabilidad de reproducción para cada gen
+    Función encargada de elegir en un solo sorteo todas las parejas de padres de una
+    generación según su probabilidad de reproducción
     -------------------------------------------------------
-    poblacion: lista con los genes a ser puestos a prueba
     prob_reproduccion: array en el cual se encuentra la probabilidad de que el gen se 
     multiplique en una siguiente generación
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
+    parejas: cantidad de parejas, si es None la mitad de la población
+    -------------------------------------------------------
+    RETURN
+    padres: array de forma (parejas, 2) con las posiciones de los padres
+    '''
+    rng=np.random.default_rng(rng)
+    tamano_pob=len(prob_reproduccion)
+    if parejas is None:
+        parejas=tamano_pob//2
+    return rng.choice(tamano_pob,(parejas,2),p=prob_reproduccion)
+
+def probabilidad_rango(fitness:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular la probabilidad de reproducción según la posición de
+    cada gen al ordenar por fitness (el peor tiene rango 1 y el mejor rango igual al
+    tamaño de la población), de forma que no depende de la escala del fitness
+    -------------------------------------------------------
+    fitness: array con el fitness de cada gen
+    -------------------------------------------------------
+    RETURN
+    prob_reproduccion: array con la probabilidad de reproducción de cada gen
+    '''
+    rango=np.empty(len(fitness))
+    rango[np.argsort(fitness,kind="stable")]=np.arange(1,len(fitness)+1)
+    return rango/rango.sum()
+
+def seleccionar_torneo(fitness:np.ndarray,parejas:int,tamano_torneo:int=2,
+                       rng:'np.random.Generator | None'=None)->np.ndarray:
+    '''
+    Función encargada de elegir todas las parejas de padres por torneo: para cada padre
+    se sortean tamano_torneo genes y gana el de mayor fitness
+    -------------------------------------------------------
+    fitness: array con el fitness de cada gen
+    parejas: cantidad de parejas de padres
+    tamano_torneo: cantidad de genes que compiten en cada torneo
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
+    -------------------------------------------------------
+    RETURN
+    padres: array de forma (parejas, 2) con las posiciones de los padres
+    '''
+    rng=np.random.default_rng(rng)
+    competidores=rng.integers(len(fitness),size=(parejas,2,tamano_torneo))
+    ganador=np.argmax(fitness[competidores],axis=2)
+    return np.take_along_axis(competidores,ganador[:,:,None],axis=2)[:,:,0]
+
+def elegir_elite(fitness:np.ndarray,completos:np.ndarray,elite:int)->np.ndarray:
+    '''
+    Función encargada de elegir los genes que pasan sin cambios a la siguiente
+    generación. Se eligen primero los de mayor fitness entre los evaluados con todos los
+    individuos, los estimados (escalonado o sustituto) solo completan si faltan
+    ---------------------------------
+    fitness: array con el fitness de cada gen
+    completos: array booleano con los genes evaluados con todos los individuos
+    elite: cantidad de genes a elegir
+    ---------------------------------
+    RETURN
+    mejores: array con las posiciones de los genes elegidos
+    '''
+    orden=np.argsort(fitness,kind="stable")[::-1]
+    orden=np.concatenate([orden[completos[orden]],orden[~completos[orden]]])
+    return orden[:elite]
+
+def cruzar(poblacion:'list | np.ndarray',padres:np.ndarray,var_redes:int,
+           var_const:int,rng:'np.random.Generator | None'=None)->np.ndarray:
+    '''
+    Función encargada de hacer el cruce en un punto de todas las parejas de padres con una
+    mascara para toda la población
+    -------------------------------------------------------
+    poblacion: lista o array 2d con los genes
+    padres: array de forma (parejas, 2) generado con seleccionar_padres
     var_redes: cantidad de variables que se estiman en la red LSTM
     var_const: cantidad de variables que se usan en la red categorica sin incluir las 
     estimadas en la red LSTM
-    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
     -------------------------------------------------------
     RETURN
-    offspring: List, lista de arrays la decendencia de la población original insertada
+    offspring: array 2d con la decendencia, cada pareja de padres genera dos hijos
+    seguidos
     '''
-    tamano_pob=len(poblacion)
+    rng=np.random.default_rng(rng)
+    poblacion=np.asarray(poblacion)
+    largo=largo_gen(var_redes,var_const)
+    parejas=len(padres)
+    cross_point=rng.integers(largo,size=parejas)
+    # True en las posiciones que se toman del primer padre
+    mascara=np.arange(largo)[None,:]<cross_point[:,None]
+    padre0=poblacion[padres[:,0]]
+    padre1=poblacion[padres[:,1]]
     #desendencia
-    offspring=[]
-    for i in range(tamano_pob//2):
-        padres=np.random.choice(tamano_pob,2,p=prob_reproduccion)
-        cross_point=np.random.randint(12*var_redes+var_redes+var_const+1)
-        offspring+=[np.append(poblacion[padres[0]][:cross_point],poblacion[padres[1]][cross_point:])]
-        offspring+=[np.append(poblacion[padres[1]][:cross_point],poblacion[padres[0]][cross_point:])]
+    offspring=np.empty((2*parejas,largo),dtype=poblacion.dtype)
+    offspring[0::2]=np.where(mascara,padre0,padre1)
+    offspring[1::2]=np.where(mascara,padre1,padre0)
     return offspring
 
-def mutar(poblacion:list, prob:float, pool:'list | np.ndarray'):
+def reproduccion(poblacion:'list | np.ndarray',prob_reproduccion:np.ndarray,
+                 var_redes:int, var_const:int,
+                 rng:'np.random.Generator | None'=None)->np.ndarray:
+    '''
+    Función encargada de generar la decendencia de una población de genes, esta cuenta con
+    una probabilidad de reproducción para cada gen. Todas las parejas de padres se
+    eligen en un solo sorteo y el cruce en un punto se hace con una mascara para toda la
+    población
+    -------------------------------------------------------
+    poblacion: lista o array 2d con los genes a ser puestos a prueba
+    prob_reproduccion: array en el cual se encuentra la probabilidad de que el gen se 
+    multiplique en una siguiente generación
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las 
+    estimadas en la red LSTM
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
+    -------------------------------------------------------
+    RETURN
+    offspring: array 2d con la decendencia de la población original, cada pareja de
+    padres genera dos hijos seguidos
+    '''
+    rng=np.random.default_rng(rng)
+    padres=seleccionar_padres(prob_reproduccion,rng)
+    return cruzar(poblacion,padres,var_redes,var_const,rng)
+
+def mutar(poblacion:'list | np.ndarray', prob:float, pool:'list | np.ndarray',
+          rng:'np.random.Generator | None'=None)->np.ndarray:
     '''
     Función encargada de generar mutaciones en la población basada en una posibilidad de 
-    mutar
+    mutar, cada posición de cada gen muta de forma independiente
     ---------------------------------------------------------------
-    poblacion: lista con los genes a ser puestos a prueba
+    poblacion: lista o array 2d con los genes a ser puestos a prueba
     prob: probabilidad de que se realice una mutación
     pool:lista o array de la cual se sacaran valores que seran parte del gen de
     un individuo
+    rng: generador de números aleatorios de numpy, si es None se crea uno sin semilla
     -----------------------------------------------------------------
     RETURN
-    poblacion: List o array, de la población generada tras la mutación
-    '''
-    for i in range(len(poblacion)):
-        ind_mutar=poblacion[i]
-        if np.random.random()<prob:
-            mutacion=np.random.choice(pool)
-            ind_mutar=np.append([mutacion],ind_mutar[1:])
-        for j in range(1,len(ind_mutar)-1):
-            if np.random.random()<prob:
-                mutacion=np.random.choice(pool)
-                ind_mutar_pre=np.append(ind_mutar[0:j],[mutacion])
-                ind_mutar=np.append(ind_mutar_pre,ind_mutar[j+1:])
-        poblacion[i]=ind_mutar
+    poblacion: array 2d de la población generada tras la mutación
+    '''
+    rng=np.random.default_rng(rng)
+    poblacion=np.array(poblacion)
+    mascara=rng.random(poblacion.shape)<prob
+    poblacion[mascara]=rng.choice(pool,mascara.sum())
     return poblacion
 
 def optimizar_gen(genetic_pool:'list | np.ndarray',var_redes:int, var_const:int,
                     tamano_poblacion:int,data_red:'list | np.ndarray',
                     data_const:np.ndarray,verdadero:np.ndarray,prob:float,
-                    generaciones:int, tol:float, max_intentos:int):
+                    generaciones:int, tol:float, max_intentos:int,
+                    trabajadores:'int | None'=None, tamano_bloque:'int | None'=None,
+                    evaluador=None, cache=None,
+                    semilla:'int | np.random.Generator | None'=None,
+                    codificar:bool=False, metrica:'str | callable'="f1_macro",
+                    ruta_checkpoint:'str | None'=None, cada_checkpoint:int=1,
+                    resume_from:'str | None'=None, escalonado=None,
+                    cache_lstm=None, observadores:'list | None'=None,
+                    sustituto=None, control_diversidad=None, elite:int=0,
+                    seleccion:str="proporcional", tamano_torneo:int=2,
+                    busqueda_local=None, migracion=None,
+                    tamano_bloque_red:'int | None'=None):
     '''
     Función para encontrar la mejor configuración de la red mediante iteraciones con 
     varias generaciones de las poblaciones
@@ -191,7 +575,8 @@ def optimizar_gen(genetic_pool:'list | np.ndarray',var_redes:int, var_const:int,
     var_const: cantidad de variables que se usan en la red categorica sin incluir las 
     estimadas en la red LSTM
     tamano_poblacion: cantidad de individuos de la población
-    data_red: array de numpy o list con la información necesaria de las variables y 
+    data_red: array de numpy, list o diccionario empaquetado (por ejemplo abierto con
+    dataset_mmap.abrir_dataset) con la información necesaria de las variables y 
     observaciones de cada individuo para realizar la red LSTM
     data_const: array con información de un individuo y las variables asociadas a este para
     la predicción binaria
@@ -201,34 +586,302 @@ def optimizar_gen(genetic_pool:'list | np.ndarray',var_redes:int, var_const:int,
     algoritmo genetico
     tol: indica cuanto debe mejorar el valor optimo para seguir probando iteraciones
     max_intentos: maximo de intentos sin mejorar antes de parar abructamente
+    trabajadores: cantidad de procesos para evaluar el fitness en paralelo, si es None
+    (y no se entrega evaluador) la evaluación se hace en el proceso actual
+    tamano_bloque: cantidad de genes que se envian a cada proceso por tarea, no cambia
+    cuántos individuos pasan a la vez por la red (ver tamano_bloque_red)
+    evaluador: EvaluadorParalelo ya creado, permite mantener los procesos vivos entre
+    varias llamadas; no se cierra al terminar
+    cache: CacheFitness que se consulta antes de evaluar cada generación, al terminar
+    conserva los genes evaluados y los contadores de aciertos y fallos
+    semilla: semilla o generador de números aleatorios de numpy para que la búsqueda sea
+    reproducible
+    codificar: si es True la población se guarda como posiciones dentro del
+    genetic_pool (ver codificar_poblacion) y solo se decodifica para evaluarla
+    metrica: nombre de la métrica a maximizar (ver metricas.METRICAS) o función que
+    recibe (predicciones, verdadero) y regresa el valor de cada gen
+    ruta_checkpoint: archivo donde se guarda el estado de la optimización (ver
+    checkpoint), la escritura se hace en un hilo aparte
+    cada_checkpoint: cada cuantas generaciones se guarda el checkpoint
+    resume_from: archivo de un checkpoint desde el cual continuar, se deben entregar los
+    mismos datos y parámetros de la optimización original. Los estados de escalonado y
+    sustituto se guardan en el checkpoint y se recuperan al continuar
+    escalonado: EvaluacionEscalonada (ver fitness_escalonado) para evaluar cada generación
+    por niveles de muestras, al terminar se informa cuantas evaluaciones completas se
+    ahorraron
+    cache_lstm: CacheLSTM (ver cache_lstm) para reusar las salidas de la red LSTM de los
+    bloques de pesos que no cambian, al terminar cache_lstm.historial tiene el reuso de
+    cada generación
+    observadores: lista de funciones u objetos invocables (ver observadores) que reciben
+    al final de cada generación un diccionario con los tiempos de fitness, selección,
+    cruce y mutación, evaluaciones por segundo, mejor, media y desviación del fitness,
+    diversidad de la población y tasas de acierto de los cache. evaluaciones y
+    tasa_cache cuentan solo la evaluación de la generación, las de la búsqueda local
+    van en evaluaciones_busqueda_local. Si es None se imprime el número de generación
+    sustituto: ModeloSustituto (ver sustituto) para estimar el fitness de los genes nuevos
+    y evaluar de verdad solo una parte de cada generación, al terminar se informa
+    cuantas evaluaciones se evitaron
+    control_diversidad: ControlDiversidad (ver diversidad) que mide la diversidad de la
+    población al inicio de cada generación, sube la probabilidad de mutación cuando la
+    población pierde diversidad y detiene la búsqueda cuando converge, antes de evaluarla
+    elite: cantidad de mejores genes que pasan a la siguiente generación junto a su
+    fitness, solo se crean y evaluan tamano_poblacion-elite hijos que reemplazan al
+    resto (con elite cercano a tamano_poblacion el reemplazo es de estado estacionario).
+    Se eligen primero entre los genes evaluados con todos los individuos, los estimados
+    por escalonado o sustituto solo entran si no alcanzan.
+    Al continuar desde un checkpoint la primera generación se evalua completa
+    seleccion: forma de elegir los padres, "proporcional" (prob_reproduccion según el
+    fitness), "rango" (ver probabilidad_rango) o "torneo" (ver seleccionar_torneo)
+    tamano_torneo: cantidad de genes que compiten en cada torneo
+    busqueda_local: BusquedaLocal (ver busqueda_local) que cada cierta cantidad de
+    generaciones refina los mejores genes moviendo sus pesos a valores adyacentes del
+    genetic_pool, los genes refinados reemplazan a los originales. Al terminar se
+    informa el tiempo usado en el refinamiento y en el resto del algoritmo
+    migracion: Migracion (ver islas) que en cada generación, después de evaluarla,
+    intercambia genes con otras poblaciones y lleva la parada temprana global; la usa
+    optimizar_islas para ejecutar cada isla con este mismo ciclo
+    tamano_bloque_red: cantidad de individuos que pasan a la vez por la red al evaluar,
+    también en los procesos de trabajadores. Si es None se elige según el tamaño de la
+    población para que los arrays intermedios no superen
+    funciones_redes.ELEMENTOS_POR_BLOQUE elementos
     ---------------------------------------------------------------------------------
     RETURN
-    valor_opt: int, valor máximo alcanzado por el gen
+    valor_opt: float, valor máximo alcanzado por el gen
     param_opt: array con la configuración optima de genes
     '''
-    poblacion=crear_poblacion(genetic_pool,var_redes,var_const,tamano_poblacion)
+    if seleccion not in SELECCIONES:
+        raise ValueError(f"Selección desconocida {seleccion}, opciones: {SELECCIONES}")
+    if not 0<=elite<tamano_poblacion:
+        raise ValueError("elite debe estar entre 0 y tamano_poblacion-1")
+    rng=np.random.default_rng(semilla)
+    # con codificar se trabaja sobre las posiciones del pool en vez de sus valores
+    pool=genetic_pool
+    if codificar:
+        pool=np.arange(len(genetic_pool),dtype=tipo_indices(genetic_pool))
+    poblacion=crear_poblacion(pool,var_redes,var_const,tamano_poblacion,rng)
+    longitudes=None
+    # los diccionarios empaquetados (ej. abiertos con dataset_mmap) se leen por bloques
+    if not isinstance(data_red,dict):
+        data_red,longitudes=datos_a_tensor(data_red)
+    cerrar_evaluador=False
+    if evaluador is None and trabajadores is not None:
+        from fitness_paralelo import EvaluadorParalelo
+        evaluador=EvaluadorParalelo(data_red,data_const,verdadero,var_redes,var_const,
+                                    longitudes=longitudes,trabajadores=trabajadores,
+                                    tamano_bloque=tamano_bloque,metrica=metrica,
+                                    tamano_bloque_red=tamano_bloque_red)
+        cerrar_evaluador=True
     valor_opt=0
     param_opt=0
     intentos=max_intentos
-    for i in range(generaciones):
-        print(f"Esta es la generación {i+1} de {generaciones}")
-        if max_intentos==0:
-            print("CRITERIO DE PARADA TEMPRANA ALCANZADO")
-            break
-        prob_reproduccion,max_valor, mejores_params=fitness_poblacion(poblacion,
-                                                                  data_red,
-                                                                  data_const,
-                                                                  var_redes,var_const,
-                                                                  verdadero)
-        if max_valor-valor_opt<tol:
-            max_intentos-=1
-        else:
-            max_intentos=intentos
-            valor_opt=max_valor
-            param_opt=mejores_params
-        decendencia=reproduccion(poblacion,prob_reproduccion,var_redes,var_const)
-        decendencia=mutar(decendencia,prob,genetic_pool)
-        poblacion=decendencia
+    generacion_inicial=0
+    if resume_from is not None:
+        estado=cargar_checkpoint(resume_from)
+        generacion_inicial=estado["generacion"]
+        poblacion=estado["poblacion"]
+        rng.bit_generator.state=estado["rng"]
+        valor_opt=estado["valor_opt"]
+        param_opt=estado["param_opt"]
+        max_intentos=estado["max_intentos"]
+        if cache is not None and "cache" in estado:
+            cache.cargar_estado(estado["cache"])
+        for nombre,componente in (("escalonado",escalonado),("sustituto",sustituto)):
+            if componente is None:
+                continue
+            if nombre not in estado:
+                raise ValueError(f"El checkpoint no tiene el estado de {nombre}, no se "
+                                 "puede continuar igual a la optimización original")
+            componente.cargar_estado(estado[nombre])
+    escritor=None
+    if ruta_checkpoint is not None:
+        # el cache se exporta en el hilo del escritor, no en el ciclo de generaciones
+        escritor=EscritorCheckpoint(ruta_checkpoint,cache)
+    # fitness guardado de los primeros genes de la población (la elite)
+    fitness_elite=np.empty(0)
+    completos_elite=np.empty(0,dtype=bool)
+    inicio_optimizacion=time.perf_counter()
+    try:
+        for i in range(generacion_inicial,generaciones):
+            if observadores is None:
+                print(f"Esta es la generación {i+1} de {generaciones}")
+            if max_intentos==0:
+                print("CRITERIO DE PARADA TEMPRANA ALCANZADO")
+                break
+            if migracion is not None and migracion.detenida():
+                break
+            prob_mutacion=prob
+            registro_diversidad=None
+            if control_diversidad is not None:
+                registro_diversidad=control_diversidad.actualizar(poblacion,prob)
+                if registro_diversidad["detener"]:
+                    print("CRITERIO DE CONVERGENCIA ALCANZADO")
+                    break
+                prob_mutacion=registro_diversidad["prob_mutacion"]
+            inicio=time.perf_counter()
+            evaluar=poblacion
+            if codificar:
+                evaluar=decodificar_poblacion(poblacion,genetic_pool)
+            if cache is not None:
+                aciertos_cache,fallos_cache=cache.aciertos,cache.fallos
+            conocidos=len(fitness_elite)
+            fitness,completos,evaluados=evaluar_poblacion(evaluar[conocidos:],data_red,
+                                                          data_const,var_redes,var_const,
+                                                          verdadero,longitudes,evaluador,
+                                                          cache,metrica,escalonado,
+                                                          cache_lstm,sustituto,
+                                                          tamano_bloque_red)
+            # la tasa del cache se mide sobre las mismas evaluaciones que evaluados, sin
+            # las consultas de la búsqueda local
+            tasa_cache=None
+            if cache is not None:
+                consultas=cache.aciertos-aciertos_cache+cache.fallos-fallos_cache
+                tasa_cache=(cache.aciertos-aciertos_cache)/consultas if consultas else 0.0
+            if conocidos:
+                fitness=np.concatenate([fitness_elite,fitness])
+                completos=np.concatenate([completos_elite,completos])
+            prob_reproduccion,max_valor,mejores_params=resumen_fitness(evaluar,fitness,
+                                                                       completos)
+            segundos_local=0.0
+            evaluados_local=0
+            if busqueda_local is not None and (i+1)%busqueda_local.cada==0:
+                inicio_local=time.perf_counter()
+                evaluaciones_local=busqueda_local.evaluaciones
+                candidatos=np.flatnonzero(completos)
+                orden=np.argsort(fitness[candidatos],kind="stable")[::-1]
+                mejores=candidatos[orden[:busqueda_local.mejores]]
+                def evaluar_vecinos(genes):
+                    return evaluar_poblacion(genes,data_red,data_const,var_redes,
+                                             var_const,verdadero,longitudes,evaluador,
+                                             cache,metrica,cache_lstm=cache_lstm,
+                                             tamano_bloque_red=tamano_bloque_red)[0]
+                refinados,fitness[mejores]=busqueda_local.refinar(evaluar[mejores],
+                                                                  fitness[mejores],
+                                                                  evaluar_vecinos,
+                                                                  genetic_pool)
+                poblacion=poblacion.copy()
+                evaluar=np.array(evaluar,dtype=float)
+                evaluar[mejores]=refinados
+                if codificar:
+                    poblacion[mejores]=codificar_poblacion(refinados,genetic_pool)
+                else:
+                    poblacion[mejores]=refinados
+                prob_reproduccion,max_valor,mejores_params=resumen_fitness(evaluar,
+                                                                           fitness,
+                                                                           completos)
+                segundos_local=time.perf_counter()-inicio_local
+                busqueda_local.segundos+=segundos_local
+                evaluados_local=busqueda_local.evaluaciones-evaluaciones_local
+            if migracion is not None:
+                peores,genes,valores=migracion.intercambiar(i+1,evaluar,fitness,completos)
+                if len(peores):
+                    # los migrantes llegan evaluados con todos los individuos
+                    poblacion=poblacion.copy()
+                    evaluar=np.array(evaluar,dtype=float)
+                    evaluar[peores]=genes
+                    if codificar:
+                        poblacion[peores]=codificar_poblacion(genes,genetic_pool)
+                    else:
+                        poblacion[peores]=genes
+                    fitness[peores]=valores
+                    completos[peores]=True
+                    prob_reproduccion,max_valor,mejores_params=resumen_fitness(evaluar,
+                                                                               fitness,
+                                                                               completos)
+            registro_lstm=None
+            if cache_lstm is not None:
+                registro_lstm=cache_lstm.cerrar_generacion()
+            fin_fitness=time.perf_counter()
+            if max_valor-valor_opt<tol:
+                max_intentos-=1
+            else:
+                max_intentos=intentos
+                valor_opt=max_valor
+                param_opt=mejores_params
+            if migracion is not None:
+                migracion.actualizar(i+1,max_valor)
+            hijos=len(poblacion)-elite
+            parejas=None if elite==0 else -(-hijos//2)
+            if seleccion=="torneo":
+                padres=seleccionar_torneo(fitness,parejas or len(poblacion)//2,
+                                          tamano_torneo,rng)
+            elif seleccion=="rango":
+                padres=seleccionar_padres(probabilidad_rango(fitness),rng,parejas)
+            else:
+                padres=seleccionar_padres(prob_reproduccion,rng,parejas)
+            fin_seleccion=time.perf_counter()
+            decendencia=cruzar(poblacion,padres,var_redes,var_const,rng)
+            fin_cruce=time.perf_counter()
+            decendencia=mutar(decendencia,prob_mutacion,pool,rng)
+            if elite:
+                mejores=elegir_elite(fitness,completos,elite)
+                decendencia=np.concatenate([poblacion[mejores],decendencia[:hijos]])
+                fitness_elite=fitness[mejores]
+                completos_elite=completos[mejores]
+            fin_mutacion=time.perf_counter()
+            if observadores:
+                segundos_fitness=fin_fitness-inicio-segundos_local
+                registro={"generacion":i+1,"generaciones":generaciones,
+                          "segundos_fitness":segundos_fitness,
+                          "segundos_busqueda_local":segundos_local,
+                          "segundos_seleccion":fin_seleccion-fin_fitness,
+                          "segundos_cruce":fin_cruce-fin_seleccion,
+                          "segundos_mutacion":fin_mutacion-fin_cruce,
+                          "segundos_total":fin_mutacion-inicio,
+                          "evaluaciones":evaluados,
+                          "evaluaciones_por_segundo":evaluados/max(segundos_fitness,1e-12),
+                          "evaluaciones_busqueda_local":evaluados_local,
+                          "mejor":float(max_valor),
+                          "media":float(fitness.mean()),
+                          "desviacion":float(fitness.std()),
+                          "mejor_global":float(valor_opt),
+                          "intentos_restantes":max_intentos,
+                          "diversidad":len(np.unique(poblacion,axis=0))/len(poblacion),
+                          "prob_mutacion":prob_mutacion,
+                          "tasa_cache":tasa_cache,
+                          "tasa_cache_lstm":None}
+                if registro_lstm is not None:
+                    registro["tasa_cache_lstm"]=registro_lstm["tasa"]
+                if registro_diversidad is None:
+                    registro["entropia"]=float(entropia_posiciones(poblacion).mean())
+                    registro["hamming"]=distancia_hamming(poblacion)
+                else:
+                    registro["entropia"]=registro_diversidad["entropia"]
+                    registro["hamming"]=registro_diversidad["hamming"]
+                notificar(observadores,registro)
+            poblacion=decendencia
+            if escritor is not None and (i+1)%cada_checkpoint==0:
+                escritor.guardar(estado_optimizacion(i+1,poblacion,rng,valor_opt,
+                                                     param_opt,max_intentos,
+                                                     escalonado=escalonado,
+                                                     sustituto=sustituto))
+    finally:
+        # cada cierre se ejecuta aunque falle el anterior (ej. error de disco al
+        # escribir el último checkpoint)
+        try:
+            if escritor is not None:
+                escritor.cerrar()
+        finally:
+            try:
+                if cerrar_evaluador:
+                    evaluador.cerrar()
+            finally:
+                if observadores:
+                    cerrar_observadores(observadores)
+    if escalonado is not None:
+        print(f"Evaluaciones completas: {escalonado.evaluaciones_completas}, "
+              f"ahorradas: {escalonado.evaluaciones_ahorradas} "
+              f"(costo relativo {escalonado.costo_relativo():.2f})")
+    if busqueda_local is not None:
+        segundos=time.perf_counter()-inicio_optimizacion
+        print(f"Búsqueda local: {busqueda_local.segundos:.2f} seg, algoritmo genetico: "
+              f"{segundos-busqueda_local.segundos:.2f} seg, "
+              f"{busqueda_local.evaluaciones} evaluaciones en "
+              f"{busqueda_local.refinamientos} refinamientos "
+              f"(mejora total {busqueda_local.mejora:.4f})")
+    if sustituto is not None:
+        print(f"Evaluaciones reales: {sustituto.evaluaciones_reales}, "
+              f"evitadas: {sustituto.evaluaciones_evitadas} "
+              f"({sustituto.tasa_evitadas():.0%})")
     return valor_opt,param_opt
 
 # verdad=np.array([1,0,1,0,0,0,1])
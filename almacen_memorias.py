@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import numpy as np
+
+ARCHIVO_METADATOS="metadatos.json"
+ARRAYS=("identificadores","short_memory","long_memory","pasos")
+SUFIJO_TEMPORAL=".tmp"
+
+class AlmacenMemorias:
+    '''
+    Clase encargada de guardar en disco las memorias finales de la red LSTM de cada
+    individuo, para poder continuar la red solo con las observaciones nuevas (ver
+    prediccion.Predictor.update). Cada versión de modelo tiene su propia carpeta con un
+    metadatos.json que indica la subcarpeta con los archivos .npy vigentes, ordenados
+    por identificador. Cada escritura crea una subcarpeta nueva y luego reemplaza
+    metadatos.json con os.replace, por lo que una falla a mitad de la escritura deja la
+    versión anterior completa.
+    Cada escritura reescribe todos los individuos guardados de la versión, su costo
+    crece con el tamaño del almacén y no solo con los individuos actualizados: conviene
+    actualizar muchos individuos juntos (ej. todas las observaciones de un mes) o usar
+    un almacén por grupo de individuos
+    ---------------------------------
+    ruta: carpeta del almacén
+    dtype: tipo de las memorias guardadas, np.float32 usa la mitad de espacio pero las
+    predicciones pueden diferir levemente de recalcular toda la historia
+    '''
+    def __init__(self,ruta:str,dtype:type=np.float64):
+        self.ruta=ruta
+        self.dtype=np.dtype(dtype)
+        os.makedirs(ruta,exist_ok=True)
+
+    def _carpeta(self,version:str)->str:
+        return os.path.join(self.ruta,version)
+
+    def versiones(self)->list:
+        '''
+        RETURN
+        versiones: lista con las versiones de modelo guardadas
+        '''
+        return sorted(version for version in os.listdir(self.ruta)
+                      if not version.endswith(SUFIJO_TEMPORAL)
+                      and os.path.exists(os.path.join(self._carpeta(version),
+                                                      ARCHIVO_METADATOS)))
+
+    def _cabecera(self,version:str)->'dict | None':
+        carpeta=self._carpeta(version)
+        if not os.path.isdir(carpeta):
+            return None
+        metadatos_ruta=os.path.join(carpeta,ARCHIVO_METADATOS)
+        if not os.path.exists(metadatos_ruta):
+            raise FileNotFoundError(f"{carpeta} no tiene {ARCHIVO_METADATOS}, las memorias "
+                                    "guardadas están incompletas")
+        with open(metadatos_ruta) as archivo:
+            return json.load(archivo)
+
+    def _abrir(self,version:str)->'dict | None':
+        cabecera=self._cabecera(version)
+        if cabecera is None:
+            return None
+        datos=os.path.join(self._carpeta(version),cabecera["datos"])
+        return {llave:np.load(os.path.join(datos,llave+".npy"),mmap_mode="r")
+                for llave in ARRAYS}
+
+    def leer(self,version:str,identificadores:'list | np.ndarray',
+             variables:int)->tuple:
+        '''
+        Función encargada de obtener las memorias guardadas de varios individuos
+        ---------------------------------
+        version: versión del modelo (ver prediccion.Predictor.version)
+        identificadores: identificadores de los individuos
+        variables: cantidad de variables de la red LSTM
+        ---------------------------------
+        RETURN
+        short_memory: array de forma (individuos, variables), 0 para los no guardados
+        long_memory: array de forma (individuos, variables), 0 para los no guardados
+        pasos: array con la cantidad de observaciones ya procesadas de cada individuo
+        encontrados: array booleano con los individuos que estaban guardados
+        '''
+        identificadores=np.asarray(identificadores)
+        individuos=len(identificadores)
+        short_memory=np.zeros((individuos,variables))
+        long_memory=np.zeros((individuos,variables))
+        pasos=np.zeros(individuos,dtype=np.int64)
+        encontrados=np.zeros(individuos,dtype=bool)
+        guardado=self._abrir(version)
+        if guardado is None or len(guardado["identificadores"])==0:
+            return short_memory,long_memory,pasos,encontrados
+        posiciones=np.searchsorted(guardado["identificadores"],identificadores)
+        posiciones=posiciones.clip(0,len(guardado["identificadores"])-1)
+        encontrados=guardado["identificadores"][posiciones]==identificadores
+        filas=posiciones[encontrados]
+        short_memory[encontrados]=guardado["short_memory"][filas]
+        long_memory[encontrados]=guardado["long_memory"][filas]
+        pasos[encontrados]=guardado["pasos"][filas]
+        return short_memory,long_memory,pasos,encontrados
+
+    def escribir(self,version:str,identificadores:'list | np.ndarray',
+                 short_memory:np.ndarray,long_memory:np.ndarray,pasos:np.ndarray,
+                 metadatos:'dict | None'=None):
+        '''
+        Función encargada de guardar las memorias de varios individuos, los que ya
+        estaban guardados se reemplazan y el resto se mantiene. Se reescribe toda la
+        versión en una subcarpeta nueva que reemplaza a la anterior al final
+        ---------------------------------
+        version: versión del modelo
+        identificadores: identificadores de los individuos, sin repetir
+        short_memory: array de forma (individuos, variables)
+        long_memory: array de forma (individuos, variables)
+        pasos: array con la cantidad de observaciones procesadas de cada individuo
+        metadatos: diccionario con información adicional que se guarda en metadatos.json
+        '''
+        nuevos={"identificadores":np.asarray(identificadores),
+                "short_memory":np.asarray(short_memory,dtype=self.dtype),
+                "long_memory":np.asarray(long_memory,dtype=self.dtype),
+                "pasos":np.asarray(pasos,dtype=np.int64)}
+        if nuevos["identificadores"].dtype==object:
+            nuevos["identificadores"]=nuevos["identificadores"].astype(str)
+        cabecera=self._cabecera(version)
+        guardado=self._abrir(version)
+        if guardado is not None:
+            # los nuevos van primero para que np.unique se quede con ellos
+            unidos={llave:np.concatenate([nuevos[llave],np.asarray(guardado[llave])])
+                    for llave in ARRAYS}
+        else:
+            unidos=nuevos
+        _,primeros=np.unique(unidos["identificadores"],return_index=True)
+        carpeta=self._carpeta(version)
+        # una versión nueva se arma en una carpeta temporal que luego toma su nombre,
+        # una existente recibe una subcarpeta nueva y luego se reemplaza metadatos.json
+        destino=carpeta if cabecera is not None else carpeta+SUFIJO_TEMPORAL
+        if cabecera is None:
+            shutil.rmtree(destino,ignore_errors=True)
+        escritura=cabecera["escritura"]+1 if cabecera is not None else 1
+        datos=f"datos_{escritura}"
+        # restos de una escritura anterior que falló antes de reemplazar metadatos.json
+        shutil.rmtree(os.path.join(destino,datos),ignore_errors=True)
+        os.makedirs(os.path.join(destino,datos))
+        for llave in ARRAYS:
+            np.save(os.path.join(destino,datos,llave+".npy"),
+                    np.ascontiguousarray(unidos[llave][primeros]))
+        metadatos_ruta=os.path.join(destino,ARCHIVO_METADATOS)
+        with open(metadatos_ruta+".tmp","w") as archivo:
+            json.dump({"version":version,"datos":datos,"escritura":escritura,
+                       "individuos":int(len(primeros)),
+                       "variables":int(unidos["short_memory"].shape[1]),
+                       "dtype":self.dtype.str,"metadatos":metadatos or {}},
+                      archivo,indent=2)
+        os.replace(metadatos_ruta+".tmp",metadatos_ruta)
+        if cabecera is None:
+            os.replace(destino,carpeta)
+            return
+        del guardado
+        for nombre in os.listdir(carpeta):
+            if nombre.startswith("datos_") and nombre!=datos:
+                shutil.rmtree(os.path.join(carpeta,nombre),ignore_errors=True)
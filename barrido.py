@@ -0,0 +1,234 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import itertools
+import os
+import tempfile
+import time
+import numpy as np
+from algoritmo_gen import optimizar_gen
+from dataset_mmap import abrir_dataset
+from observadores import HistorialMemoria, notificar, cerrar_observadores
+
+# parámetros de optimizar_gen que se pueden variar en el barrido
+PARAMETROS=("prob","tamano_poblacion","resolucion_pool","tol","max_intentos")
+
+# conjunto de datos del proceso trabajador, se abre una sola vez en _iniciar_trabajador
+_DATOS_TRABAJADOR={}
+
+def espacio_grilla(espacio:dict)->list:
+    '''
+    Función encargada de generar todas las combinaciones de un espacio de búsqueda
+    ---------------------------------
+    espacio: diccionario con el nombre de cada parámetro (ver PARAMETROS) y la lista de
+    valores a probar
+    ---------------------------------
+    RETURN
+    configuraciones: lista de diccionarios, uno por combinación
+    '''
+    nombres=list(espacio)
+    return [dict(zip(nombres,valores))
+            for valores in itertools.product(*(espacio[nombre] for nombre in nombres))]
+
+def espacio_aleatorio(espacio:dict,cantidad:int,
+                      semilla:'int | np.random.Generator | None'=None)->list:
+    '''
+    Función encargada de sortear configuraciones de un espacio de búsqueda
+    ---------------------------------
+    espacio: diccionario con el nombre de cada parámetro y sus valores posibles: una
+    lista para elegir uno de sus valores o una tupla (minimo, maximo) para sortear un
+    valor uniforme en ese rango (entero si ambos extremos son enteros)
+    cantidad: cantidad de configuraciones a sortear
+    semilla: semilla o generador de números aleatorios de numpy
+    ---------------------------------
+    RETURN
+    configuraciones: lista de diccionarios
+    '''
+    rng=np.random.default_rng(semilla)
+    configuraciones=[]
+    for _ in range(cantidad):
+        configuracion={}
+        for nombre,valores in espacio.items():
+            if isinstance(valores,tuple):
+                minimo,maximo=valores
+                if isinstance(minimo,int) and isinstance(maximo,int):
+                    configuracion[nombre]=int(rng.integers(minimo,maximo+1))
+                else:
+                    configuracion[nombre]=float(rng.uniform(minimo,maximo))
+            else:
+                configuracion[nombre]=valores[rng.integers(len(valores))]
+        configuraciones.append(configuracion)
+    return configuraciones
+
+def tramos_generaciones(generaciones:int,generaciones_minimas:int,eta:int)->list:
+    '''
+    Función encargada de calcular las generaciones en las que se revisa cada
+    configuración: generaciones_minimas, generaciones_minimas*eta, ... hasta generaciones
+    ---------------------------------
+    generaciones: generaciones máximas de cada configuración
+    generaciones_minimas: generaciones del primer tramo
+    eta: factor de crecimiento de los tramos, en cada revisión sigue 1 de cada eta
+    ---------------------------------
+    RETURN
+    tramos: lista creciente de generaciones, la última es generaciones
+    '''
+    tramos=[]
+    tramo=max(generaciones_minimas,1)
+    while tramo<generaciones:
+        tramos.append(tramo)
+        tramo*=eta
+    tramos.append(generaciones)
+    return tramos
+
+def _iniciar_trabajador(ruta_dataset:str):
+    '''
+    Inicializador de cada proceso del pool, abre el conjunto de datos con np.memmap
+    '''
+    dataset=abrir_dataset(ruta_dataset)
+    _DATOS_TRABAJADOR["data_red"]={llave:dataset[llave] for llave in
+                                   ("valores","offsets","longitudes","identificadores")}
+    _DATOS_TRABAJADOR["data_const"]=dataset["const"]
+    _DATOS_TRABAJADOR["verdadero"]=dataset["verdadero"]
+    _DATOS_TRABAJADOR["var_redes"]=dataset["metadatos"]["variables_redes"]
+    _DATOS_TRABAJADOR["var_const"]=dataset["metadatos"]["variables_const"]
+
+def _ejecutar_tramo(configuracion:dict,generaciones:int,ruta_checkpoint:str,
+                    reanudar:bool,rango_pool:tuple,fijos:dict)->dict:
+    '''
+    Tarea de cada proceso del pool, ejecuta optimizar_gen hasta generaciones guardando
+    el estado en ruta_checkpoint para poder continuar en el tramo siguiente
+    '''
+    historial=HistorialMemoria()
+    genetic_pool=np.linspace(rango_pool[0],rango_pool[1],
+                             configuracion["resolucion_pool"])
+    inicio=time.perf_counter()
+    valor_opt,_=optimizar_gen(genetic_pool,_DATOS_TRABAJADOR["var_redes"],
+                              _DATOS_TRABAJADOR["var_const"],
+                              configuracion["tamano_poblacion"],
+                              _DATOS_TRABAJADOR["data_red"],
+                              _DATOS_TRABAJADOR["data_const"],
+                              _DATOS_TRABAJADOR["verdadero"],configuracion["prob"],
+                              generaciones,configuracion["tol"],
+                              configuracion["max_intentos"],
+                              semilla=configuracion["semilla"],
+                              ruta_checkpoint=ruta_checkpoint,
+                              resume_from=ruta_checkpoint if reanudar else None,
+                              observadores=[historial],**fijos)
+    # optimizar_gen termina antes de generaciones solo por la parada temprana
+    ultima=historial.registros[-1]["generacion"] if len(historial) else 0
+    # los registros vuelven al proceso principal para los observadores del usuario
+    return {"valor":float(valor_opt),"segundos":time.perf_counter()-inicio,
+            "generacion":ultima,"convergio":ultima<generaciones,
+            "evaluaciones":int(historial.columna("evaluaciones").sum()) if len(historial)
+            else 0,"registros":historial.registros}
+
+def ejecutar_barrido(ruta_dataset:str,configuraciones:list,generaciones:int,
+                     generaciones_minimas:int=2,eta:int=3,
+                     trabajadores:'int | None'=None,rango_pool:tuple=(-2,2),
+                     fijos:'dict | None'=None,carpeta:'str | None'=None,
+                     ruta_resultados:'str | None'=None,
+                     semilla:'int | None'=None,
+                     observadores:'list | None'=None)->'pd.DataFrame':
+    '''
+    Función encargada de probar varias configuraciones de optimizar_gen en paralelo
+    sobre un mismo conjunto de datos. Cada configuración avanza por tramos de
+    generaciones (ver tramos_generaciones); al terminar un tramo su mejor fitness se
+    compara con el de las configuraciones que ya llegaron a ese tramo y solo sigue si
+    está dentro del mejor 1/eta (regla de successive halving asíncrona, como ASHA), las
+    demás se detienen. Entre tramos el estado se guarda con checkpoint, por lo que una
+    configuración que llega al final da el mismo resultado que una llamada directa a
+    optimizar_gen con la misma semilla
+    ---------------------------------
+    ruta_dataset: carpeta escrita con dataset_mmap.escribir_dataset (incluyendo
+    verdadero), cada proceso la abre con np.memmap sin copiarla
+    configuraciones: lista de diccionarios con prob, tamano_poblacion, resolucion_pool
+    (cantidad de valores del genetic_pool), tol, max_intentos y opcionalmente semilla
+    (ver espacio_grilla y espacio_aleatorio)
+    generaciones: generaciones máximas de cada configuración
+    generaciones_minimas: generaciones del primer tramo
+    eta: factor de crecimiento de los tramos y de reducción de configuraciones
+    trabajadores: cantidad de procesos, si es None se usa la cantidad de CPUs
+    rango_pool: extremos del genetic_pool, que se genera con np.linspace
+    fijos: diccionario con otros argumentos de optimizar_gen iguales para todas las
+    configuraciones (por ejemplo metrica o codificar), deben poder enviarse a los procesos.
+    No puede incluir observadores, para eso está el argumento observadores
+    carpeta: carpeta donde se guardan los checkpoints de cada configuración, si es None
+    se usa una carpeta temporal
+    ruta_resultados: archivo CSV donde se escribe la tabla de resultados
+    semilla: semilla para las configuraciones que no tienen una propia
+    observadores: lista de funciones u objetos invocables (ver observadores) que reciben
+    en el proceso principal el registro de cada generación de cada configuración, con
+    la llave configuracion (posición en configuraciones) agregada. Los registros de un
+    tramo se entregan al terminar el tramo y los observadores se cierran al terminar el
+    barrido
+    ---------------------------------
+    RETURN
+    resultados: DataFrame ordenado de mejor a peor valor con los parámetros de cada
+    configuración, valor, generaciones alcanzadas, estado (completa, convergio o
+    detenida), evaluaciones, segundos y checkpoint con el mejor gen
+    '''
+    import pandas as pd
+    fijos=fijos or {}
+    if "observadores" in fijos:
+        raise ValueError("Los observadores no se pueden enviar a los procesos en fijos, "
+                         "se deben entregar con el argumento observadores")
+    observadores=observadores or []
+    for configuracion in configuraciones:
+        faltantes=[nombre for nombre in PARAMETROS if nombre not in configuracion]
+        if faltantes:
+            raise ValueError(f"Faltan los parámetros {faltantes} en {configuracion}")
+    if carpeta is None:
+        carpeta=tempfile.mkdtemp(prefix="barrido_")
+    os.makedirs(carpeta,exist_ok=True)
+    tramos=tramos_generaciones(generaciones,generaciones_minimas,eta)
+    semillas=np.random.SeedSequence(semilla).generate_state(len(configuraciones))
+    filas=[]
+    for k,configuracion in enumerate(configuraciones):
+        configuracion=dict(configuracion)
+        configuracion.setdefault("semilla",int(semillas[k]))
+        filas.append({**configuracion,"valor":0.0,"generaciones":0,"estado":"detenida",
+                      "evaluaciones":0,"segundos":0.0,
+                      "checkpoint":os.path.join(carpeta,f"configuracion_{k}.npz")})
+    # mejores valores de las configuraciones que terminaron cada tramo
+    valores_tramo=[[] for _ in tramos]
+    def enviar(pool,k,tramo):
+        fila=filas[k]
+        futuro=pool.submit(_ejecutar_tramo,fila,tramos[tramo],fila["checkpoint"],
+                           tramo>0,rango_pool,fijos)
+        pendientes[futuro]=(k,tramo)
+    pendientes={}
+    try:
+        with ProcessPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1,
+                                 initializer=_iniciar_trabajador,
+                                 initargs=(ruta_dataset,)) as pool:
+            for k in range(len(filas)):
+                enviar(pool,k,0)
+            while pendientes:
+                terminados,_=wait(pendientes,return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    k,tramo=pendientes.pop(futuro)
+                    resultado=futuro.result()
+                    for registro in resultado["registros"]:
+                        notificar(observadores,{**registro,"configuracion":k})
+                    fila=filas[k]
+                    fila["valor"]=resultado["valor"]
+                    fila["generaciones"]=max(fila["generaciones"],resultado["generacion"])
+                    fila["evaluaciones"]+=resultado["evaluaciones"]
+                    fila["segundos"]+=resultado["segundos"]
+                    valores=valores_tramo[tramo]
+                    valores.append(resultado["valor"])
+                    if resultado["convergio"]:
+                        fila["estado"]="convergio"
+                    elif tramo==len(tramos)-1:
+                        fila["estado"]="completa"
+                    elif (np.sum(np.array(valores)>resultado["valor"])
+                          <max(len(valores)//eta,1)):
+                        enviar(pool,k,tramo+1)
+                    else:
+                        fila["estado"]="detenida"
+    finally:
+        cerrar_observadores(observadores)
+    resultados=pd.DataFrame(filas).sort_values("valor",ascending=False,kind="stable")
+    resultados=resultados.reset_index(drop=True)
+    resultados.index.name="posicion"
+    if ruta_resultados is not None:
+        resultados.to_csv(ruta_resultados)
+    return resultados
@@ -0,0 +1,7 @@
+'''
+Benchmarks reproducibles del algoritmo genetico sobre paneles sintéticos.
+
+Uso desde la carpeta del repositorio:
+    python -m benchmarks run --tamano pequeno --salida base.json
+    python -m benchmarks compare base.json nuevo.json --umbral 0.1
+'''
@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+from benchmarks.escenarios import ejecutar_escenarios, comparar, leer_resultado
+from benchmarks.sintetico import TAMANOS
+
+def main(argumentos:'list | None'=None)->int:
+    '''
+    Punto de entrada de los comandos run (medir y escribir JSON) y compare (marcar
+    regresiones entre dos archivos JSON). compare regresa 1 si hay regresiones
+    '''
+    parser=argparse.ArgumentParser(prog="python -m benchmarks")
+    comandos=parser.add_subparsers(dest="comando",required=True)
+    run=comandos.add_parser("run",help="ejecuta los escenarios y escribe JSON")
+    run.add_argument("--tamano",choices=list(TAMANOS),default="pequeno")
+    for llave in ("individuos","pasos","pasos_min","var_redes","var_const","poblacion"):
+        run.add_argument("--"+llave,type=int)
+    run.add_argument("--repeticiones",type=int,default=3)
+    run.add_argument("--semilla",type=int,default=0)
+    run.add_argument("--escenarios",nargs="*")
+    run.add_argument("--salida",help="archivo JSON, si no se entrega se imprime")
+    compare=comandos.add_parser("compare",help="compara dos archivos JSON")
+    compare.add_argument("base")
+    compare.add_argument("nuevo")
+    compare.add_argument("--umbral",type=float,default=0.1,
+                         help="aumento relativo de la mediana que se marca regresión")
+    args=parser.parse_args(argumentos)
+    if args.comando=="run":
+        configuracion=dict(TAMANOS[args.tamano])
+        for llave in ("individuos","pasos","pasos_min","var_redes","var_const",
+                      "poblacion"):
+            if getattr(args,llave) is not None:
+                configuracion[llave]=getattr(args,llave)
+        resultado=ejecutar_escenarios(**configuracion,repeticiones=args.repeticiones,
+                                      semilla=args.semilla,escenarios=args.escenarios)
+        texto=json.dumps(resultado,indent=2)
+        if args.salida:
+            with open(args.salida,"w") as archivo:
+                archivo.write(texto)
+        else:
+            print(texto)
+        return 0
+    base,nuevo=leer_resultado(args.base),leer_resultado(args.nuevo)
+    if base["configuracion"]!=nuevo["configuracion"]:
+        print("AVISO: los resultados tienen configuraciones distintas")
+    filas=comparar(base,nuevo,args.umbral)
+    for fila in filas:
+        marca="REGRESION" if fila["regresion"] else ""
+        print(f"{fila['escenario']:<28}{fila['base']:>12.6f}{fila['nuevo']:>12.6f}"
+              f"{fila['cambio']:>+10.1%}  {marca}")
+    return 1 if any(fila["regresion"] for fila in filas) else 0
+
+if __name__=="__main__":
+    sys.exit(main())
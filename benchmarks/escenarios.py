@@ -0,0 +1,128 @@
+import json
+import platform
+import time
+import numpy as np
+from algoritmo_gen import (crear_poblacion, fitness_poblacion, genes_a_pesos,
+                           reproduccion, mutar)
+from funciones_data import construir_datos_redes, agregar_info_redes
+from funciones_redes import red_completa_poblacion
+from tensores import datos_a_tensor
+from metricas import f1_macro_poblacion
+from benchmarks.sintetico import generar_panel
+
+def medir(funcion:callable,repeticiones:int)->dict:
+    '''
+    Función encargada de medir el tiempo de una función varias veces
+    ---------------------------------
+    funcion: función sin argumentos a medir
+    repeticiones: cantidad de veces que se ejecuta
+    ---------------------------------
+    RETURN
+    tiempos: diccionario con minimo, mediana y maximo en segundos
+    '''
+    tiempos=[]
+    for i in range(repeticiones):
+        inicio=time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter()-inicio)
+    return {"minimo":min(tiempos),"mediana":float(np.median(tiempos)),
+            "maximo":max(tiempos),"repeticiones":repeticiones}
+
+def ejecutar_escenarios(individuos:int,pasos:int,var_redes:int,var_const:int,
+                        poblacion:int,pasos_min:'int | None'=None,
+                        repeticiones:int=3,semilla:int=0,
+                        escenarios:'list | None'=None)->dict:
+    '''
+    Función encargada de medir cada etapa del algoritmo sobre un panel sintético
+    ---------------------------------
+    individuos: cantidad de individuos del panel
+    pasos: cantidad máxima de observaciones por individuo
+    var_redes: cantidad de variables de la red LSTM
+    var_const: cantidad de variables constantes
+    poblacion: cantidad de genes de la población
+    pasos_min: cantidad mínima de observaciones por individuo (None para panel parejo)
+    repeticiones: cantidad de mediciones por escenario
+    semilla: semilla del panel y de la población
+    escenarios: nombres de los escenarios a ejecutar, si es None se ejecutan todos
+    ---------------------------------
+    RETURN
+    resultado: diccionario con la configuración, el entorno y los tiempos de cada
+    escenario, listo para escribir como JSON
+    '''
+    rng=np.random.default_rng(semilla)
+    data_temp,data_const,verdadero=generar_panel(individuos,pasos,var_redes,var_const,
+                                                 pasos_min,rng)
+    excluir_temp=["NDI","fecha"]
+    empaquetado,const=construir_datos_redes(data_temp,data_const,excluir_temp,["NDI"],
+                                            "NDI")
+    tensor,longitudes=datos_a_tensor(empaquetado)
+    pool=np.linspace(-2,2,50)
+    genes=crear_poblacion(pool,var_redes,var_const,poblacion,rng)
+    pesos_lstm,pesos_const=genes_a_pesos(genes,var_redes,var_const)
+    predicciones=red_completa_poblacion(tensor,const,pesos_lstm,pesos_const,longitudes)
+    prob_reproduccion,_,_=fitness_poblacion(genes,tensor,const,var_redes,var_const,
+                                            verdadero,longitudes)
+    def generacion():
+        prob,_,_=fitness_poblacion(genes,tensor,const,var_redes,var_const,verdadero,
+                                   longitudes)
+        mutar(reproduccion(genes,prob,var_redes,var_const,rng),0.01,pool,rng)
+    disponibles={
+        "datos_construir":lambda:construir_datos_redes(data_temp,data_const,
+                                                       excluir_temp,["NDI"],"NDI"),
+        "datos_agregar_info_redes":lambda:agregar_info_redes(data_temp,excluir_temp,
+                                                             "NDI"),
+        "datos_tensor":lambda:datos_a_tensor(empaquetado),
+        "red_completa_poblacion":lambda:red_completa_poblacion(tensor,const,pesos_lstm,
+                                                               pesos_const,longitudes),
+        "metrica_f1_macro":lambda:f1_macro_poblacion(predicciones,verdadero),
+        "seleccion_cruce":lambda:reproduccion(genes,prob_reproduccion,var_redes,
+                                              var_const,rng),
+        "mutacion":lambda:mutar(genes,0.01,pool,rng),
+        "generacion_completa":generacion}
+    if escenarios is None:
+        escenarios=list(disponibles)
+    tiempos={}
+    for nombre in escenarios:
+        if nombre not in disponibles:
+            raise ValueError(f"Escenario desconocido {nombre}, opciones: "
+                             f"{list(disponibles)}")
+        tiempos[nombre]=medir(disponibles[nombre],repeticiones)
+    return {"configuracion":{"individuos":individuos,"pasos":pasos,
+                             "pasos_min":pasos_min,"var_redes":var_redes,
+                             "var_const":var_const,"poblacion":poblacion,
+                             "filas":len(data_temp),"repeticiones":repeticiones,
+                             "semilla":semilla},
+            "entorno":{"python":platform.python_version(),
+                       "numpy":np.__version__,
+                       "plataforma":platform.platform(),
+                       "procesador":platform.processor()},
+            "escenarios":tiempos}
+
+def comparar(base:dict,nuevo:dict,umbral:float=0.1)->list:
+    '''
+    Función encargada de comparar dos resultados de ejecutar_escenarios
+    ---------------------------------
+    base: resultado de referencia
+    nuevo: resultado a comparar
+    umbral: aumento relativo de la mediana a partir del cual se marca una regresión
+    ---------------------------------
+    RETURN
+    filas: lista de diccionarios con escenario, mediana base, mediana nueva, cambio
+    relativo y si es regresión, para los escenarios presentes en ambos resultados
+    '''
+    filas=[]
+    for nombre,tiempo in nuevo["escenarios"].items():
+        if nombre not in base["escenarios"]:
+            continue
+        anterior=base["escenarios"][nombre]["mediana"]
+        cambio=tiempo["mediana"]/anterior-1 if anterior>0 else 0.0
+        filas.append({"escenario":nombre,"base":anterior,"nuevo":tiempo["mediana"],
+                      "cambio":cambio,"regresion":cambio>umbral})
+    return filas
+
+def leer_resultado(ruta:str)->dict:
+    '''
+    Lee un archivo JSON escrito con el comando run
+    '''
+    with open(ruta) as archivo:
+        return json.load(archivo)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+def generar_panel(individuos:int,pasos:int,var_redes:int,var_const:int,
+                  pasos_min:'int | None'=None,
+                  semilla:'int | np.random.Generator | None'=None)->tuple:
+    '''
+    Función encargada de generar un panel sintético con la misma forma que los datos de
+    ejecucion.py: una tabla temporal con varias observaciones por individuo y una tabla
+    constante con una fila por individuo
+    ---------------------------------
+    individuos: cantidad de individuos
+    pasos: cantidad máxima de observaciones por individuo
+    var_redes: cantidad de variables temporales (red LSTM)
+    var_const: cantidad de variables constantes (red categorica)
+    pasos_min: cantidad mínima de observaciones por individuo, si es None todos tienen
+    pasos observaciones
+    semilla: semilla o generador de números aleatorios
+    ---------------------------------
+    RETURN
+    data_temp: DataFrame con columnas NDI, fecha y var1..varN
+    data_const: DataFrame con columnas NDI y const1..constM
+    verdadero: array con etiquetas 1 o 0 en el orden de NDI
+    '''
+    rng=np.random.default_rng(semilla)
+    if pasos_min is None:
+        longitudes=np.full(individuos,pasos)
+    else:
+        longitudes=rng.integers(pasos_min,pasos+1,individuos)
+    identificadores=np.array([f"ID{i:09d}" for i in range(individuos)])
+    filas=int(longitudes.sum())
+    data_temp=pd.DataFrame({"NDI":np.repeat(identificadores,longitudes),
+                            "fecha":np.arange(filas)-np.repeat(np.cumsum(longitudes)
+                                                               -longitudes,longitudes)})
+    for v in range(var_redes):
+        data_temp[f"var{v+1}"]=rng.random(filas)
+    data_const=pd.DataFrame({"NDI":identificadores})
+    for c in range(var_const):
+        data_const[f"const{c+1}"]=rng.integers(0,2,individuos)
+    verdadero=rng.integers(0,2,individuos)
+    return data_temp, data_const, verdadero
+
+# tamaños predefinidos de los escenarios
+TAMANOS={"pequeno":{"individuos":200,"pasos":6,"var_redes":2,"var_const":3,
+                    "poblacion":20},
+         "mediano":{"individuos":5000,"pasos":12,"var_redes":3,"var_const":5,
+                    "poblacion":50},
+         "grande":{"individuos":50000,"pasos":24,"var_redes":4,"var_const":8,
+                   "poblacion":100}}
@@ -0,0 +1,87 @@
+import numpy as np
+
+def vecinos_pool(rangos:np.ndarray,tamano_pool:int)->tuple:
+    '''
+    Función encargada de generar todos los vecinos de una posición de varios genes:
+    cada peso se mueve al valor anterior o siguiente del genetic_pool ordenado
+    ---------------------------------
+    rangos: array 2d con la posición de cada peso dentro del genetic_pool ordenado
+    tamano_pool: cantidad de valores del genetic_pool
+    ---------------------------------
+    RETURN
+    vecinos: array de forma (genes, 2*largo del gen, largo del gen) con los rangos de
+    los vecinos de cada gen
+    validos: array booleano de forma (genes, 2*largo del gen), False para los vecinos que
+    salen del genetic_pool
+    '''
+    largo=rangos.shape[1]
+    identidad=np.eye(largo,dtype=np.int64)
+    desplazamientos=np.concatenate([identidad,-identidad])
+    vecinos=rangos[:,None,:].astype(np.int64)+desplazamientos[None,:,:]
+    validos=((vecinos>=0)&(vecinos<tamano_pool)).all(axis=2)
+    return vecinos, validos
+
+class BusquedaLocal:
+    '''
+    Clase encargada de refinar los mejores genes con búsqueda local (hill climbing):
+    en cada paso se evaluan juntos todos los vecinos de los genes (cada peso movido al
+    valor adyacente del genetic_pool) y cada gen se mueve a su mejor vecino si mejora,
+    hasta que ningún vecino mejora o se llega a max_pasos
+    ---------------------------------
+    cada: cada cuantas generaciones de optimizar_gen se refinan los mejores genes
+    mejores: cantidad de mejores genes que se refinan
+    max_pasos: cantidad máxima de pasos de cada refinamiento
+    '''
+    def __init__(self,cada:int=5,mejores:int=1,max_pasos:int=50):
+        self.cada=cada
+        self.mejores=mejores
+        self.max_pasos=max_pasos
+        self.segundos=0.0
+        self.evaluaciones=0
+        self.pasos=0
+        self.refinamientos=0
+        self.mejora=0.0
+
+    def refinar(self,genes:np.ndarray,fitness:np.ndarray,funcion:callable,
+                genetic_pool:'list | np.ndarray')->tuple:
+        '''
+        Función encargada de refinar varios genes a la vez
+        ---------------------------------
+        genes: array 2d con los pesos de los genes, todos sus valores deben estar en el
+        genetic_pool
+        fitness: array con el fitness de cada gen
+        funcion: función que recibe un array 2d de pesos y regresa su fitness
+        genetic_pool: lista o array de la cual se sacaron los valores de los genes
+        ---------------------------------
+        RETURN
+        genes: array 2d con los genes refinados
+        fitness: array con el fitness de los genes refinados
+        '''
+        pool=np.sort(np.asarray(genetic_pool,dtype=float))
+        genes=np.asarray(genes,dtype=float)
+        rangos=np.searchsorted(pool,genes).clip(0,len(pool)-1)
+        if not (pool[rangos]==genes).all():
+            raise ValueError("Los genes tienen valores que no están en el genetic_pool")
+        fitness=np.array(fitness,dtype=float)
+        inicial=fitness.copy()
+        activos=np.ones(len(genes),dtype=bool)
+        for _ in range(self.max_pasos):
+            if not activos.any():
+                break
+            posiciones=np.flatnonzero(activos)
+            vecinos,validos=vecinos_pool(rangos[posiciones],len(pool))
+            # vecinos repetidos entre genes se evaluan una sola vez
+            unicos,inversa=np.unique(vecinos[validos],axis=0,return_inverse=True)
+            valores=np.full(validos.shape,-np.inf)
+            valores[validos]=np.asarray(funcion(pool[unicos]))[inversa.ravel()]
+            self.evaluaciones+=len(unicos)
+            self.pasos+=1
+            mejor=np.argmax(valores,axis=1)
+            mejor_valor=valores[np.arange(len(posiciones)),mejor]
+            mejora=mejor_valor>fitness[posiciones]
+            rangos[posiciones[mejora]]=vecinos[mejora,mejor[mejora]]
+            fitness[posiciones[mejora]]=mejor_valor[mejora]
+            activos[posiciones[~mejora]]=False
+        self.refinamientos+=1
+        self.mejora+=float((fitness-inicial).sum())
+        return pool[rangos], fitness
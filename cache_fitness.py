@@ -0,0 +1,219 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+class CacheFitness:
+    '''
+    Clase encargada de guardar el fitness de genes ya evaluados para no volver a pasar
+    por la red genes repetidos (copias de los padres tras la reproducción o genes iguales
+    dentro de una misma generación). La llave es un hash de los bytes del gen y, al
+    superar el tamaño máximo, se elimina el gen usado hace más tiempo (LRU)
+    ---------------------------------
+    tamano_maximo: cantidad máxima de genes guardados, si es None no hay límite
+    '''
+    def __init__(self,tamano_maximo:'int | None'=100000):
+        self.tamano_maximo=tamano_maximo
+        self.aciertos=0
+        self.fallos=0
+        self._valores=OrderedDict()
+        # RegistroCambios con los usos desde tomar_cambios, None si no se registran
+        self._cambios=None
+
+    @staticmethod
+    def llave(gen:np.ndarray)->bytes:
+        '''
+        Función encargada de generar la llave de un gen
+        ---------------------------------
+        gen: array con los pesos y bias del gen
+        ---------------------------------
+        RETURN
+        llave: hash de 16 bytes del contenido del gen
+        '''
+        gen=np.ascontiguousarray(gen,dtype=float)
+        return hashlib.blake2b(gen.tobytes(),digest_size=16).digest()
+
+    def buscar(self,poblacion:'list | np.ndarray')->tuple:
+        '''
+        Función encargada de buscar el fitness de cada gen de una población
+        ---------------------------------
+        poblacion: lista o array 2d con los genes
+        ---------------------------------
+        RETURN
+        fitness: array con el fitness guardado de cada gen, np.nan si no está
+        faltantes: array booleano con los genes que no estaban guardados
+        '''
+        fitness=np.full(len(poblacion),np.nan)
+        for i,gen in enumerate(poblacion):
+            llave=self.llave(gen)
+            valor=self._valores.get(llave)
+            if valor is not None:
+                self._valores.move_to_end(llave)
+                fitness[i]=valor
+                if self._cambios is not None:
+                    self._cambios.usar(llave,valor)
+        faltantes=np.isnan(fitness)
+        self.fallos+=int(faltantes.sum())
+        self.aciertos+=len(fitness)-int(faltantes.sum())
+        return fitness, faltantes
+
+    def guardar(self,poblacion:'list | np.ndarray',fitness:np.ndarray):
+        '''
+        Función encargada de guardar el fitness de varios genes
+        ---------------------------------
+        poblacion: lista o array 2d con los genes
+        fitness: array con el fitness de cada gen
+        '''
+        for gen,valor in zip(poblacion,fitness):
+            llave=self.llave(gen)
+            self._valores[llave]=float(valor)
+            self._valores.move_to_end(llave)
+            if self._cambios is not None:
+                self._cambios.usar(llave,float(valor))
+        self._recortar()
+
+    def _recortar(self):
+        if self.tamano_maximo is not None:
+            while len(self._valores)>self.tamano_maximo:
+                self._valores.popitem(last=False)
+
+    def registrar_cambios(self):
+        '''
+        Función encargada de empezar a registrar los genes guardados o encontrados, para
+        que otra copia del cache pueda seguirlo con aplicar_cambios sin exportarlo entero
+        '''
+        self._cambios=RegistroCambios(self.tamano_maximo)
+
+    def detener_cambios(self):
+        '''
+        Función encargada de dejar de registrar los genes guardados o encontrados
+        '''
+        self._cambios=None
+
+    def tomar_cambios(self)->'RegistroCambios':
+        '''
+        RETURN
+        cambios: RegistroCambios con los usos desde la llamada anterior, el registro del
+        cache queda vacío
+        '''
+        cambios=self._cambios
+        if cambios is None:
+            return RegistroCambios(self.tamano_maximo)
+        self._cambios=RegistroCambios(self.tamano_maximo)
+        return cambios
+
+    def aplicar_cambios(self,cambios:'RegistroCambios',aciertos:int,fallos:int):
+        '''
+        Función encargada de repetir sobre este cache los usos registrados en otro con el
+        mismo tamano_maximo, de forma que ambos queden con los mismos genes y el mismo
+        orden de uso
+        ---------------------------------
+        cambios: RegistroCambios generado con tomar_cambios
+        aciertos: aciertos del otro cache
+        fallos: fallos del otro cache
+        '''
+        if cambios.reinicio:
+            self._valores.clear()
+        for llave,valor in cambios.valores.items():
+            self._valores[llave]=valor
+            self._valores.move_to_end(llave)
+        self._recortar()
+        self.aciertos=aciertos
+        self.fallos=fallos
+
+    def tasa_aciertos(self)->float:
+        '''
+        RETURN
+        tasa: proporción de búsquedas que encontraron el gen guardado
+        '''
+        total=self.aciertos+self.fallos
+        return self.aciertos/total if total else 0.0
+
+    def estado(self)->dict:
+        '''
+        Función encargada de exportar el contenido del cache como arrays, para guardarlo
+        en un checkpoint
+        ---------------------------------
+        RETURN
+        estado: diccionario con las llaves (array uint8 de forma (genes, 16)) en orden de
+        uso, los valores y los contadores
+        '''
+        llaves=np.frombuffer(b"".join(self._valores.keys()),dtype=np.uint8)
+        return {"llaves":llaves.reshape(-1,16),
+                "valores":np.fromiter(self._valores.values(),dtype=float,
+                                      count=len(self._valores)),
+                "aciertos":self.aciertos,
+                "fallos":self.fallos}
+
+    def cargar_estado(self,estado:dict):
+        '''
+        Función encargada de reemplazar el contenido del cache por uno exportado con
+        estado
+        ---------------------------------
+        estado: diccionario generado con estado
+        '''
+        self._valores=OrderedDict(zip((bytes(i) for i in estado["llaves"]),
+                                      (float(i) for i in estado["valores"])))
+        self.aciertos=int(estado["aciertos"])
+        self.fallos=int(estado["fallos"])
+        if self._cambios is not None:
+            self._cambios.reiniciar()
+            for llave,valor in self._valores.items():
+                self._cambios.usar(llave,valor)
+
+    def limpiar(self):
+        '''
+        Función encargada de borrar los genes guardados y los contadores
+        '''
+        self._valores.clear()
+        self.aciertos=0
+        self.fallos=0
+        if self._cambios is not None:
+            self._cambios.reiniciar()
+
+    def __len__(self):
+        return len(self._valores)
+
+class RegistroCambios:
+    '''
+    Clase encargada de registrar los usos de un CacheFitness para repetirlos en una
+    copia. Solo se guarda el último valor de cada llave en orden de último uso y a lo
+    sumo tamano_maximo llaves: las más antiguas saldrían del cache de todas formas, por
+    lo que el registro no crece aunque pasen muchas generaciones entre dos tomas
+    ---------------------------------
+    tamano_maximo: tamano_maximo del cache que se registra, si es None no hay límite
+    '''
+    def __init__(self,tamano_maximo:'int | None'=None):
+        self.tamano_maximo=tamano_maximo
+        # True si el cache se vació o se reemplazó antes de los usos registrados
+        self.reinicio=False
+        self.valores=OrderedDict()
+
+    def usar(self,llave:bytes,valor:float):
+        '''
+        Función encargada de registrar que una llave se guardó o se encontró con valor
+        '''
+        self.valores[llave]=valor
+        self.valores.move_to_end(llave)
+        if self.tamano_maximo is not None and len(self.valores)>self.tamano_maximo:
+            self.valores.popitem(last=False)
+
+    def reiniciar(self):
+        '''
+        Función encargada de registrar que el cache se vació, los usos anteriores ya no
+        importan
+        '''
+        self.reinicio=True
+        self.valores.clear()
+
+    def agregar(self,otro:'RegistroCambios'):
+        '''
+        Función encargada de sumar a este registro los usos posteriores de otro, de forma
+        que aplicar el resultado equivale a aplicar ambos en orden
+        '''
+        if otro.reinicio:
+            self.reiniciar()
+        for llave,valor in otro.valores.items():
+            self.usar(llave,valor)
+
+    def __len__(self):
+        return len(self.valores)
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+import numpy as np
+from funciones_redes import red_lstm_poblacion
+from tensores import bloque_datos, cantidad_individuos
+
+class CacheLSTM:
+    '''
+    Clase encargada de guardar las salidas de la red LSTM de cada variable para cada
+    bloque de individuos. La llave son los 12 pesos de la variable junto a su posición y
+    al rango de individuos, de forma que los bloques que el cruce deja iguales a los de
+    un padre no vuelven a pasar por la red recurrente, solo la red categorica. Como se
+    guarda por bloque, nunca se arma la salida de todos los individuos a la vez. Las
+    salidas guardadas solo son válidas para
+    un mismo conjunto de individuos, por eso se usa un cache por conjunto de datos
+    ---------------------------------
+    memoria_maxima: cantidad máxima de bytes de salidas guardadas, al superarla se
+    eliminan las usadas hace más tiempo (LRU)
+    '''
+    def __init__(self,memoria_maxima:int=512*1024**2):
+        self.memoria_maxima=memoria_maxima
+        self.memoria=0
+        self.individuos=None
+        self.aciertos=0
+        self.fallos=0
+        self.historial=[]
+        self._aciertos_generacion=0
+        self._fallos_generacion=0
+        self._valores=OrderedDict()
+
+    @staticmethod
+    def llave(pesos:np.ndarray,variable:int)->bytes:
+        '''
+        Función encargada de generar la llave de un bloque de 12 pesos
+        ---------------------------------
+        pesos: array con los 12 pesos y bias de la variable
+        variable: posición de la variable en la red LSTM
+        ---------------------------------
+        RETURN
+        llave: bytes de los pesos seguidos de la posición de la variable
+        '''
+        return np.ascontiguousarray(pesos,dtype=float).tobytes()+variable.to_bytes(4,"little")
+
+    def _guardar(self,llave:bytes,salida:np.ndarray):
+        self._valores[llave]=salida
+        self.memoria+=salida.nbytes
+        while self.memoria>self.memoria_maxima and self._valores:
+            llave_vieja,vieja=self._valores.popitem(last=False)
+            self.memoria-=vieja.nbytes
+
+    def salidas(self,data_temp:np.ndarray,pesos_lstm:np.ndarray,
+                longitudes:'np.ndarray | None'=None,inicio:int=0,
+                fin:'int | None'=None)->np.ndarray:
+        '''
+        Función encargada de obtener las salidas de la red LSTM de todos los genes para
+        los individuos inicio:fin, calculando solo los bloques de pesos que no están
+        guardados. Cada rango de individuos se guarda por separado, por lo que se deben
+        pedir siempre los mismos rangos para reusar las salidas
+        ---------------------------------
+        data_temp: array 3d de forma (individuos, pasos de tiempo, variables) o
+        diccionario empaquetado
+        pesos_lstm: array de forma (población, variables, 12)
+        longitudes: array con la cantidad de observaciones reales de cada individuo
+        inicio: posición del primer individuo
+        fin: posición siguiente al último individuo, si es None hasta el final
+        ---------------------------------
+        RETURN
+        short_memory: array de forma (población, fin-inicio, variables), igual a
+        red_lstm_poblacion sobre esos individuos
+        '''
+        individuos=cantidad_individuos(data_temp)
+        if self.individuos is None:
+            self.individuos=individuos
+        elif self.individuos!=individuos:
+            raise ValueError("El CacheLSTM se creó para otro conjunto de individuos")
+        fin=individuos if fin is None else min(fin,individuos)
+        rango=inicio.to_bytes(8,"little")+fin.to_bytes(8,"little")
+        poblacion,variables=pesos_lstm.shape[:2]
+        resultado=np.empty((poblacion,fin-inicio,variables))
+        bloque=None
+        for v in range(variables):
+            faltantes={}
+            for p in range(poblacion):
+                llave=self.llave(pesos_lstm[p,v],v)+rango
+                salida=self._valores.get(llave)
+                if salida is None:
+                    faltantes.setdefault(llave,[]).append(p)
+                    continue
+                self._valores.move_to_end(llave)
+                resultado[p,:,v]=salida
+                self._aciertos_generacion+=1
+            if not faltantes:
+                continue
+            self._fallos_generacion+=len(faltantes)
+            if bloque is None:
+                bloque,long_bloque=bloque_datos(data_temp,longitudes,inicio,fin)
+            # los bloques repetidos dentro de la población se calculan una sola vez
+            genes=[posiciones[0] for posiciones in faltantes.values()]
+            pesos=pesos_lstm[genes,v][:,None,:]
+            nuevas=red_lstm_poblacion(bloque[:,:,v:v+1],pesos,long_bloque)[:,:,0]
+            for k,(llave,posiciones) in enumerate(faltantes.items()):
+                resultado[posiciones,:,v]=nuevas[k]
+                self._aciertos_generacion+=len(posiciones)-1
+                self._guardar(llave,nuevas[k])
+        return resultado
+
+    def cerrar_generacion(self)->dict:
+        '''
+        Función encargada de registrar en historial el reuso de la generación actual y
+        reiniciar los contadores de la generación
+        ---------------------------------
+        RETURN
+        registro: diccionario con aciertos, fallos, tasa de reuso, bloques guardados y
+        memoria usada en la generación
+        '''
+        total=self._aciertos_generacion+self._fallos_generacion
+        registro={"aciertos":self._aciertos_generacion,
+                  "fallos":self._fallos_generacion,
+                  "tasa":self._aciertos_generacion/total if total else 0.0,
+                  "bloques":len(self._valores),
+                  "memoria":self.memoria}
+        self.historial.append(registro)
+        self.aciertos+=self._aciertos_generacion
+        self.fallos+=self._fallos_generacion
+        self._aciertos_generacion=0
+        self._fallos_generacion=0
+        return registro
+
+    def __len__(self):
+        return len(self._valores)
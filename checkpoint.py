@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import numpy as np
+from cache_fitness import RegistroCambios
+
+def estado_optimizacion(generacion:int,poblacion:np.ndarray,rng:np.random.Generator,
+                        valor_opt:float,param_opt:'np.ndarray | int',max_intentos:int,
+                        cache=None,escalonado=None,sustituto=None)->dict:
+    '''
+    Función encargada de tomar una copia del estado de optimizar_gen al terminar una
+    generación, para escribirla como checkpoint
+    ---------------------------------
+    generacion: número de generaciones ya completadas
+    poblacion: array 2d con la población de la siguiente generación
+    rng: generador de números aleatorios de numpy usado en la optimización
+    valor_opt: mejor valor alcanzado hasta el momento
+    param_opt: mejor gen encontrado hasta el momento (0 si aún no hay)
+    max_intentos: intentos sin mejorar que quedan antes de la parada temprana
+    cache: CacheFitness usado en la optimización, si es None no se guarda
+    escalonado: EvaluacionEscalonada usada en la optimización, si es None no se guarda
+    sustituto: ModeloSustituto usado en la optimización, si es None no se guarda
+    ---------------------------------
+    RETURN
+    estado: diccionario de arrays de numpy listo para escribir_checkpoint
+    '''
+    estado={"generacion":np.asarray(generacion),
+            "poblacion":np.array(poblacion),
+            "rng":np.asarray(json.dumps(rng.bit_generator.state)),
+            "valor_opt":np.asarray(valor_opt,dtype=float),
+            "param_opt":np.array(param_opt,dtype=float),
+            "max_intentos":np.asarray(max_intentos)}
+    # el resto de los componentes con estado se guardan con su nombre como prefijo
+    for nombre,componente in (("cache",cache),("escalonado",escalonado),
+                              ("sustituto",sustituto)):
+        if componente is not None:
+            for llave,valor in componente.estado().items():
+                estado[nombre+"_"+llave]=np.array(valor)
+    return estado
+
+def escribir_checkpoint(ruta:str,estado:dict):
+    '''
+    Función encargada de escribir un checkpoint en formato npz comprimido. Se escribe
+    primero a un archivo temporal y luego se reemplaza, para que un fallo a mitad de la
+    escritura no dañe el checkpoint anterior
+    ---------------------------------
+    ruta: ruta del archivo
+    estado: diccionario generado con estado_optimizacion
+    '''
+    temporal=ruta+".tmp"
+    with open(temporal,"wb") as archivo:
+        np.savez_compressed(archivo,**estado)
+    os.replace(temporal,ruta)
+
+def cargar_checkpoint(ruta:str)->dict:
+    '''
+    Función encargada de leer un checkpoint escrito con escribir_checkpoint
+    ---------------------------------
+    ruta: ruta del archivo
+    ---------------------------------
+    RETURN
+    estado: diccionario con generacion, poblacion, rng (estado del generador), valor_opt,
+    param_opt, max_intentos y, si se guardaron, cache (estado de CacheFitness),
+    escalonado (estado de EvaluacionEscalonada) y sustituto (estado de ModeloSustituto)
+    '''
+    with np.load(ruta,allow_pickle=False) as archivo:
+        datos={llave:archivo[llave] for llave in archivo.files}
+    param_opt=datos["param_opt"]
+    estado={"generacion":int(datos["generacion"]),
+            "poblacion":datos["poblacion"],
+            "rng":json.loads(str(datos["rng"])),
+            "valor_opt":float(datos["valor_opt"]),
+            "param_opt":param_opt if param_opt.ndim else 0,
+            "max_intentos":int(datos["max_intentos"])}
+    for nombre in ("cache","escalonado","sustituto"):
+        componente={llave[len(nombre)+1:]:valor for llave,valor in datos.items()
+                    if llave.startswith(nombre+"_")}
+        if componente:
+            estado[nombre]=componente
+    return estado
+
+class EscritorCheckpoint:
+    '''
+    Clase encargada de escribir checkpoints en un hilo aparte, para que la escritura a
+    disco no detenga el ciclo de generaciones. Si llega un estado nuevo mientras se
+    escribe el anterior, solo se escribe el más reciente.
+    Si se entrega cache, el hilo mantiene una copia propia que sigue los cambios del
+    cache (ver CacheFitness.registrar_cambios) y la exporta al escribir, de forma que en
+    cada generación solo se pasan los genes usados desde el checkpoint anterior
+    ---------------------------------
+    ruta: ruta del archivo del checkpoint
+    cache: CacheFitness usado en la optimización, si es None no se guarda
+    '''
+    def __init__(self,ruta:str,cache=None):
+        self.ruta=ruta
+        self.escritos=0
+        self._cache=cache
+        self._copia_cache=None
+        self._cambios_cache=None
+        self._contadores_cache=None
+        if cache is not None:
+            self._cambios_cache=RegistroCambios(cache.tamano_maximo)
+            self._copia_cache=type(cache)(cache.tamano_maximo)
+            self._copia_cache.cargar_estado(cache.estado())
+            cache.registrar_cambios()
+        self._pendiente=None
+        self._cerrado=False
+        self._error=None
+        self._condicion=threading.Condition()
+        self._hilo=threading.Thread(target=self._escribir,daemon=True)
+        self._hilo.start()
+
+    def guardar(self,estado:dict):
+        '''
+        Función encargada de dejar un estado listo para escribir, no espera la escritura
+        ---------------------------------
+        estado: diccionario generado con estado_optimizacion, sin cache si este se
+        entregó al crear el escritor
+        '''
+        with self._condicion:
+            self._pendiente=estado
+            if self._cache is not None:
+                # los cambios se acumulan aunque se descarte un estado sin escribir
+                self._cambios_cache.agregar(self._cache.tomar_cambios())
+                self._contadores_cache=(self._cache.aciertos,self._cache.fallos)
+            self._condicion.notify()
+
+    def _escribir(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None and not self._cerrado:
+                    self._condicion.wait()
+                if self._pendiente is None:
+                    return
+                estado=self._pendiente
+                self._pendiente=None
+                cambios=self._cambios_cache
+                if cambios is not None:
+                    self._cambios_cache=RegistroCambios(cambios.tamano_maximo)
+                contadores=self._contadores_cache
+            try:
+                if self._copia_cache is not None:
+                    self._copia_cache.aplicar_cambios(cambios,*contadores)
+                    estado=dict(estado)
+                    for llave,valor in self._copia_cache.estado().items():
+                        estado["cache_"+llave]=np.array(valor)
+                escribir_checkpoint(self.ruta,estado)
+                self.escritos+=1
+            except Exception as error:
+                self._error=error
+
+    def cerrar(self):
+        '''
+        Función encargada de esperar a que se escriba el último estado y terminar el hilo,
+        si alguna escritura falló se levanta el error. El cache deja de registrar cambios
+        '''
+        if self._cache is not None:
+            self._cache.detener_cambios()
+        with self._condicion:
+            self._cerrado=True
+            self._condicion.notify()
+        self._hilo.join()
+        if self._error is not None:
+            raise self._error
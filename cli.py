@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+# versión de la preparación de datos, cambiarla invalida los conjuntos ya preparados
+VERSION_PREPARACION=1
+
+def leer_configuracion(ruta:str)->dict:
+    '''
+    Función encargada de leer el archivo de configuración, JSON o TOML según su extensión
+    ---------------------------------
+    ruta: archivo de configuración
+    ---------------------------------
+    RETURN
+    configuracion: diccionario con las secciones datos, entrenamiento y prediccion
+    '''
+    if ruta.endswith(".toml"):
+        import tomllib
+        with open(ruta,"rb") as archivo:
+            configuracion=tomllib.load(archivo)
+    else:
+        with open(ruta) as archivo:
+            configuracion=json.load(archivo)
+    if "datos" not in configuracion:
+        raise ValueError(f"{ruta} no tiene la sección datos")
+    # las rutas relativas se toman desde la carpeta del archivo de configuración
+    base=os.path.dirname(os.path.abspath(ruta))
+    datos=configuracion["datos"]
+    for llave in ("temporal","constante","cache"):
+        if llave in datos:
+            datos[llave]=os.path.join(base,datos[llave])
+    for seccion,llave in (("entrenamiento","modelo"),("entrenamiento","ruta_checkpoint"),
+                          ("prediccion","modelo"),("prediccion","salida")):
+        if llave in configuracion.get(seccion,{}):
+            configuracion[seccion][llave]=os.path.join(base,configuracion[seccion][llave])
+    return configuracion
+
+def huella_datos(datos:dict)->str:
+    '''
+    Función encargada de calcular la huella de los datos de entrada: la ruta, el tamaño y
+    la fecha de modificación de los archivos y las opciones que cambian la preparación.
+    No se lee el contenido, por lo que se puede calcular en cada ejecución sin costo
+    ---------------------------------
+    datos: sección datos de la configuración
+    ---------------------------------
+    RETURN
+    huella: texto hexadecimal, igual mientras no cambien los archivos ni las opciones
+    '''
+    huella=hashlib.blake2b(digest_size=16)
+    opciones={llave:datos.get(llave) for llave in ("identificador","excluir_temp",
+                                                   "excluir_const","verdadero","dtype")}
+    opciones["version"]=VERSION_PREPARACION
+    for llave in ("temporal","constante"):
+        informacion=os.stat(datos[llave])
+        opciones[llave]=[os.path.abspath(datos[llave]),informacion.st_size,
+                         informacion.st_mtime_ns]
+    huella.update(json.dumps(opciones,sort_keys=True).encode())
+    return huella.hexdigest()
+
+def huella_contenido(datos:dict)->str:
+    '''
+    Función encargada de calcular la huella del contenido de los archivos de datos, se
+    lee cada archivo completo
+    ---------------------------------
+    datos: sección datos de la configuración
+    ---------------------------------
+    RETURN
+    huella: texto hexadecimal, igual para archivos con el mismo contenido
+    '''
+    huella=hashlib.blake2b(digest_size=16)
+    for llave in ("temporal","constante"):
+        with open(datos[llave],"rb") as archivo:
+            for parte in iter(lambda:archivo.read(1<<20),b""):
+                huella.update(parte)
+        huella.update(b"\0")
+    return huella.hexdigest()
+
+def ruta_preparada(datos:dict)->str:
+    '''
+    RETURN
+    ruta: carpeta del conjunto de datos preparado para los datos de la configuración
+    '''
+    return os.path.join(datos.get("cache","cache_datos"),huella_datos(datos))
+
+def preparar(configuracion:dict,forzar:bool=False)->str:
+    '''
+    Función encargada de leer los archivos de datos, empaquetarlos (ver
+    funciones_data.construir_datos_redes) y escribirlos con dataset_mmap en una carpeta
+    nombrada con la huella de los archivos (ver huella_datos). Si la carpeta ya existe
+    no se vuelve a procesar
+    ---------------------------------
+    configuracion: diccionario leído con leer_configuracion
+    forzar: si es True se compara el contenido de los archivos con el de la carpeta ya
+    preparada (ver huella_contenido) y se vuelve a preparar si es distinto o si la
+    carpeta se preparó sin esa huella
+    ---------------------------------
+    RETURN
+    ruta: carpeta del conjunto de datos preparado
+    '''
+    from dataset_mmap import ARCHIVO_METADATOS
+    datos=configuracion["datos"]
+    ruta=ruta_preparada(datos)
+    metadatos_ruta=os.path.join(ruta,ARCHIVO_METADATOS)
+    contenido=None
+    if os.path.exists(metadatos_ruta):
+        if not forzar:
+            print(f"Datos ya preparados en {ruta}")
+            return ruta
+        contenido=huella_contenido(datos)
+        with open(metadatos_ruta) as archivo:
+            anterior=json.load(archivo).get("metadatos",{}).get("contenido")
+        if anterior==contenido:
+            print(f"Datos ya preparados en {ruta}, el contenido no cambió")
+            return ruta
+    import numpy as np
+    import pandas as pd
+    from funciones_data import construir_datos_redes
+    from dataset_mmap import escribir_dataset
+    identificador=datos["identificador"]
+    data_temp=pd.read_csv(datos["temporal"])
+    data_const=pd.read_csv(datos["constante"])
+    columna=datos.get("verdadero")
+    excluir_const=list(datos.get("excluir_const",[identificador]))
+    if columna is not None and columna not in excluir_const:
+        excluir_const.append(columna)
+    dtype=np.dtype(datos.get("dtype","float32"))
+    empaquetado,const=construir_datos_redes(data_temp,data_const,datos["excluir_temp"],
+                                            excluir_const,identificador,dtype)
+    verdadero=None
+    # los datos nuevos a predecir pueden no tener la columna verdadero
+    if columna is not None and columna in data_const.columns:
+        verdadero=data_const.set_index(identificador)[columna]
+        verdadero=verdadero.loc[empaquetado["identificadores"]].to_numpy()
+    metadatos={"temporal":datos["temporal"],"constante":datos["constante"],
+               "identificador":identificador}
+    if forzar:
+        metadatos["contenido"]=contenido or huella_contenido(datos)
+    escribir_dataset(ruta,empaquetado,const,verdadero,metadatos)
+    print(f"Datos preparados en {ruta}")
+    return ruta
+
+def _abrir_preparado(configuracion:dict,preparado:'str | None'=None)->dict:
+    '''
+    Abre el conjunto de datos preparado, preparándolo si aún no existe. Si se entrega
+    la carpeta preparado se abre directamente, sin mirar los archivos de datos
+    '''
+    from dataset_mmap import abrir_dataset
+    return abrir_dataset(preparado or preparar(configuracion))
+
+def entrenar(configuracion:dict,preparado:'str | None'=None)->tuple:
+    '''
+    Función encargada de ejecutar optimizar_gen sobre los datos preparados y guardar el
+    mejor gen en el archivo modelo de la sección entrenamiento
+    ---------------------------------
+    configuracion: diccionario leído con leer_configuracion, la sección entrenamiento
+    tiene genetic_pool (lista o diccionario con inicio, fin y cantidad para np.linspace),
+    modelo y los argumentos de optimizar_gen
+    preparado: carpeta de datos ya preparados a usar en vez de la sección datos
+    ---------------------------------
+    RETURN
+    valor_opt: float, valor máximo alcanzado por el gen
+    param_opt: array con la configuración optima de genes
+    '''
+    import numpy as np
+    from algoritmo_gen import optimizar_gen
+    opciones=dict(configuracion["entrenamiento"])
+    ruta_modelo=opciones.pop("modelo","modelo.npz")
+    genetic_pool=opciones.pop("genetic_pool",{"inicio":-2,"fin":2,"cantidad":50})
+    if isinstance(genetic_pool,dict):
+        genetic_pool=np.linspace(genetic_pool["inicio"],genetic_pool["fin"],
+                                 genetic_pool["cantidad"])
+    dataset=_abrir_preparado(configuracion,preparado)
+    if dataset["verdadero"] is None:
+        raise ValueError("Para entrenar se necesita la columna verdadero en datos")
+    var_redes=dataset["metadatos"]["variables_redes"]
+    var_const=dataset["metadatos"]["variables_const"]
+    data_red={llave:dataset[llave] for llave in ("valores","offsets","longitudes",
+                                                 "identificadores")}
+    valor_opt,param_opt=optimizar_gen(np.asarray(genetic_pool),var_redes,var_const,
+                                      data_red=data_red,data_const=dataset["const"],
+                                      verdadero=dataset["verdadero"],**opciones)
+    np.savez(ruta_modelo,param_opt=np.asarray(param_opt,dtype=float),
+             var_redes=var_redes,var_const=var_const,valor_opt=valor_opt)
+    print(f"Valor optimo {valor_opt}, modelo guardado en {ruta_modelo}")
+    return valor_opt,param_opt
+
+def predecir(configuracion:dict,temporal:'str | None'=None,
+             constante:'str | None'=None,salida:'str | None'=None,
+             preparado:'str | None'=None)->str:
+    '''
+    Función encargada de predecir la etiqueta de cada individuo con el modelo guardado
+    por entrenar y escribirla en un CSV con el identificador. Por defecto se predicen los
+    datos de la sección datos, temporal y constante permiten predecir archivos nuevos
+    con el mismo formato (la columna verdadero no es necesaria), que se preparan en la
+    misma carpeta cache
+    ---------------------------------
+    configuracion: diccionario leído con leer_configuracion, la sección prediccion tiene
+    modelo (si no, se usa el de entrenamiento), salida y tamano_bloque
+    temporal: archivo CSV con la información temporal a predecir
+    constante: archivo CSV con la información constante a predecir
+    salida: archivo CSV a escribir, reemplaza al de la sección prediccion
+    preparado: carpeta de datos ya preparados a predecir en vez de los archivos
+    ---------------------------------
+    RETURN
+    salida: archivo CSV escrito
+    '''
+    import csv
+    import numpy as np
+    from prediccion import Predictor
+    opciones=configuracion.get("prediccion",{})
+    ruta_modelo=opciones.get("modelo",
+                             configuracion.get("entrenamiento",{}).get("modelo",
+                                                                        "modelo.npz"))
+    salida=salida or opciones.get("salida","predicciones.csv")
+    if temporal is not None or constante is not None:
+        datos=dict(configuracion["datos"])
+        datos["temporal"]=temporal or datos["temporal"]
+        datos["constante"]=constante or datos["constante"]
+        configuracion=dict(configuracion,datos=datos)
+    with np.load(ruta_modelo) as modelo:
+        predictor=Predictor(modelo["param_opt"],int(modelo["var_redes"]),
+                            int(modelo["var_const"]))
+    dataset=_abrir_preparado(configuracion,preparado)
+    data_red={llave:dataset[llave] for llave in ("valores","offsets","longitudes",
+                                                 "identificadores")}
+    prediccion=predictor.predict(data_red,dataset["const"],
+                                 tamano_bloque=opciones.get("tamano_bloque"))
+    identificador=configuracion["datos"]["identificador"]
+    with open(salida,"w",newline="") as archivo:
+        escritor=csv.writer(archivo)
+        escritor.writerow([identificador,"prediccion"])
+        escritor.writerows(zip(dataset["identificadores"].tolist(),prediccion.tolist()))
+    print(f"{len(prediccion)} predicciones escritas en {salida}")
+    return salida
+
+def main(argumentos:'list | None'=None):
+    parser=argparse.ArgumentParser(description="Red LSTM con algoritmo genetico")
+    subparsers=parser.add_subparsers(dest="comando",required=True)
+    preparar_parser=subparsers.add_parser("prepare",help="prepara y guarda los datos")
+    preparar_parser.add_argument("--forzar",action="store_true",
+                                 help="compara el contenido de los archivos y prepara "
+                                      "de nuevo si cambió")
+    entrenar_parser=subparsers.add_parser("train",help="entrena con optimizar_gen")
+    predecir_parser=subparsers.add_parser("predict",
+                                          help="predice con el modelo entrenado")
+    predecir_parser.add_argument("--temporal",
+                                 help="CSV con la información temporal a predecir")
+    predecir_parser.add_argument("--constante",
+                                 help="CSV con la información constante a predecir")
+    predecir_parser.add_argument("--salida",help="CSV donde escribir las predicciones")
+    for subparser in (entrenar_parser,predecir_parser):
+        subparser.add_argument("--preparado",
+                               help="carpeta de datos ya preparados, no se revisan los "
+                                    "archivos de la configuración")
+    for subparser in subparsers.choices.values():
+        subparser.add_argument("--config",required=True,
+                               help="archivo de configuración JSON o TOML")
+    args=parser.parse_args(argumentos)
+    configuracion=leer_configuracion(args.config)
+    if args.comando=="prepare":
+        preparar(configuracion,args.forzar)
+    elif args.comando=="train":
+        entrenar(configuracion,args.preparado)
+    else:
+        predecir(configuracion,args.temporal,args.constante,args.salida,args.preparado)
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import json
+import os
+import numpy as np
+
+VERSION_FORMATO=1
+ARCHIVO_METADATOS="metadatos.json"
+
+def escribir_dataset(ruta:str,empaquetado:dict,const:np.ndarray,
+                     verdadero:'np.ndarray | None'=None,
+                     metadatos:'dict | None'=None):
+    '''
+    Función encargada de escribir en disco un conjunto de datos empaquetado para que se
+    pueda abrir con np.memmap sin volver a procesar los DataFrames. Se crea una carpeta
+    con un archivo .npy por array (valores, offsets, longitudes, const, verdadero e
+    identificadores) y un archivo metadatos.json que se escribe al final, por lo que su
+    presencia indica que el conjunto está completo
+    ---------------------------------
+    ruta: carpeta donde se escribe el conjunto de datos
+    empaquetado: diccionario generado con funciones_data.empaquetar_info_redes (o la
+    primera salida de construir_datos_redes)
+    const: array 2d con la información constante en el orden de los identificadores
+    verdadero: array con los valores verdaderos en el orden de los identificadores
+    metadatos: diccionario con información adicional que se guarda en metadatos.json
+    '''
+    os.makedirs(ruta,exist_ok=True)
+    metadatos_ruta=os.path.join(ruta,ARCHIVO_METADATOS)
+    if os.path.exists(metadatos_ruta):
+        os.remove(metadatos_ruta)
+    identificadores=np.asarray(empaquetado["identificadores"])
+    if identificadores.dtype==object:
+        identificadores=identificadores.astype(str)
+    arrays={"valores":np.ascontiguousarray(empaquetado["valores"]),
+            "offsets":np.asarray(empaquetado["offsets"],dtype=np.int64),
+            "longitudes":np.asarray(empaquetado["longitudes"],dtype=np.int64),
+            "identificadores":identificadores,
+            "const":np.ascontiguousarray(const)}
+    if verdadero is not None:
+        arrays["verdadero"]=np.asarray(verdadero)
+    individuos=len(arrays["longitudes"])
+    for llave in ("identificadores","const","verdadero"):
+        if llave in arrays and len(arrays[llave])!=individuos:
+            raise ValueError(f"{llave} no tiene un elemento por individuo")
+    for llave,array in arrays.items():
+        np.save(os.path.join(ruta,llave+".npy"),array)
+    cabecera={"version":VERSION_FORMATO,
+              "individuos":individuos,
+              "observaciones":int(arrays["valores"].shape[0]),
+              "variables_redes":int(arrays["valores"].shape[1]),
+              "variables_const":int(arrays["const"].reshape(individuos,-1).shape[1]),
+              "arrays":{llave:{"dtype":array.dtype.str,"forma":list(array.shape)}
+                        for llave,array in arrays.items()},
+              "metadatos":metadatos or {}}
+    with open(metadatos_ruta,"w") as archivo:
+        json.dump(cabecera,archivo,indent=2)
+
+def abrir_dataset(ruta:str,modo:str="r")->dict:
+    '''
+    Función encargada de abrir un conjunto de datos escrito con escribir_dataset. Los
+    arrays se abren con np.memmap, sin leerlos a memoria: el sistema operativo carga solo
+    las partes que se usan y los comparte entre procesos que abren la misma carpeta
+    ---------------------------------
+    ruta: carpeta del conjunto de datos
+    modo: modo de apertura de np.memmap, "r" solo lectura
+    ---------------------------------
+    RETURN
+    dataset: diccionario empaquetado (valores, offsets, longitudes, identificadores) que
+    se puede entregar directamente como data_red, junto a const, verdadero (si se
+    escribió) y metadatos con la cabecera
+    '''
+    metadatos_ruta=os.path.join(ruta,ARCHIVO_METADATOS)
+    if not os.path.exists(metadatos_ruta):
+        raise FileNotFoundError(f"{ruta} no es un conjunto de datos completo")
+    with open(metadatos_ruta) as archivo:
+        cabecera=json.load(archivo)
+    if cabecera["version"]!=VERSION_FORMATO:
+        raise ValueError(f"Versión de formato {cabecera['version']} no soportada")
+    dataset={llave:np.load(os.path.join(ruta,llave+".npy"),mmap_mode=modo)
+             for llave in cabecera["arrays"]}
+    dataset.setdefault("verdadero",None)
+    dataset["metadatos"]=cabecera
+    return dataset
@@ -0,0 +1,122 @@
+import numpy as np
+
+def entropia_posiciones(poblacion:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular la entropía de los valores de cada posición del gen
+    dentro de la población, normalizada entre 0 (todos los genes con el mismo valor) y 1
+    (todos distintos o repartidos por igual). Sirve tanto para poblaciones codificadas
+    como de valores, ya que solo cuenta repeticiones
+    ---------------------------------
+    poblacion: array 2d con los genes
+    ---------------------------------
+    RETURN
+    entropia: array con la entropía normalizada de cada posición
+    '''
+    poblacion=np.asarray(poblacion)
+    tamano,largo=poblacion.shape
+    if tamano<2:
+        return np.zeros(largo)
+    valores,codigos=np.unique(poblacion,return_inverse=True)
+    codigos=codigos.reshape(tamano,largo)
+    # un solo bincount para todas las posiciones, desplazando los códigos de cada una
+    conteos=np.bincount((codigos+np.arange(largo)*len(valores)).ravel(),
+                        minlength=largo*len(valores)).reshape(largo,len(valores))
+    p=conteos/tamano
+    with np.errstate(divide="ignore",invalid="ignore"):
+        entropia=-np.where(p>0,p*np.log(p),0.0).sum(axis=1)
+    return entropia/np.log(min(tamano,len(valores))) if len(valores)>1 else entropia
+
+def distancia_hamming(poblacion:np.ndarray,muestra:int=64,
+                      rng:'np.random.Generator | None'=None)->float:
+    '''
+    Función encargada de calcular la distancia de Hamming promedio entre pares de genes
+    de una muestra de la población, como proporción de posiciones distintas
+    ---------------------------------
+    poblacion: array 2d con los genes
+    muestra: cantidad máxima de genes usados, la memoria usada crece con su cuadrado
+    rng: generador de números aleatorios para tomar la muestra
+    ---------------------------------
+    RETURN
+    distancia: valor entre 0 (genes idénticos) y 1 (ninguna posición en común)
+    '''
+    poblacion=np.asarray(poblacion)
+    tamano=len(poblacion)
+    if tamano<2:
+        return 0.0
+    if tamano>muestra:
+        rng=np.random.default_rng(rng)
+        poblacion=poblacion[rng.choice(tamano,muestra,replace=False)]
+        tamano=muestra
+    distintas=(poblacion[:,None,:]!=poblacion[None,:,:]).mean(axis=2)
+    return float(distintas.sum()/(tamano*(tamano-1)))
+
+class ControlDiversidad:
+    '''
+    Clase encargada de medir la diversidad de la población en cada generación, ajustar
+    la probabilidad de mutación según esta y detener la búsqueda cuando la población
+    converge. Mientras la diversidad está sobre objetivo se usa la probabilidad base;
+    bajo objetivo la probabilidad sube en forma lineal hasta prob_maxima cuando la
+    diversidad llega a 0. Si la diversidad queda bajo umbral_convergencia durante
+    paciencia generaciones seguidas se indica que se detenga
+    ---------------------------------
+    prob_maxima: probabilidad de mutación cuando la población no tiene diversidad
+    objetivo: diversidad bajo la cual se empieza a subir la probabilidad de mutación
+    umbral_convergencia: diversidad bajo la cual se considera que la población convergió,
+    0 para no detener por convergencia
+    paciencia: cantidad de generaciones seguidas bajo umbral_convergencia antes de parar
+    medida: "entropia" (promedio de entropia_posiciones) o "hamming"
+    (distancia_hamming)
+    muestra: cantidad de genes usados en distancia_hamming
+    semilla: semilla o generador para las muestras de distancia_hamming
+    '''
+    def __init__(self,prob_maxima:float=0.2,objetivo:float=0.3,
+                 umbral_convergencia:float=0.02,paciencia:int=3,
+                 medida:str="entropia",muestra:int=64,
+                 semilla:'int | np.random.Generator | None'=None):
+        if medida not in ("entropia","hamming"):
+            raise ValueError(f"Medida desconocida {medida}, opciones: entropia, hamming")
+        self.prob_maxima=prob_maxima
+        self.objetivo=objetivo
+        self.umbral_convergencia=umbral_convergencia
+        self.paciencia=paciencia
+        self.medida=medida
+        self.muestra=muestra
+        self.rng=np.random.default_rng(semilla)
+        self.generaciones_convergidas=0
+        self.historial=[]
+
+    def medir(self,poblacion:np.ndarray)->dict:
+        '''
+        Función encargada de calcular las medidas de diversidad de una población
+        ---------------------------------
+        poblacion: array 2d con los genes
+        ---------------------------------
+        RETURN
+        medidas: diccionario con entropia y hamming
+        '''
+        return {"entropia":float(entropia_posiciones(poblacion).mean()),
+                "hamming":distancia_hamming(poblacion,self.muestra,self.rng)}
+
+    def actualizar(self,poblacion:np.ndarray,prob:float)->dict:
+        '''
+        Función encargada de registrar la diversidad de una generación
+        ---------------------------------
+        poblacion: array 2d con los genes de la generación
+        prob: probabilidad de mutación base
+        ---------------------------------
+        RETURN
+        registro: diccionario con entropia, hamming, prob_mutacion a usar en la
+        generación y detener, True si la población convergió
+        '''
+        registro=self.medir(poblacion)
+        valor=registro[self.medida]
+        if valor<self.objetivo and self.objetivo>0:
+            prob=prob+max(self.prob_maxima-prob,0.0)*(1-valor/self.objetivo)
+        registro["prob_mutacion"]=max(prob,0.0)
+        if valor<self.umbral_convergencia:
+            self.generaciones_convergidas+=1
+        else:
+            self.generaciones_convergidas=0
+        registro["detener"]=self.generaciones_convergidas>=self.paciencia
+        self.historial.append(registro)
+        return registro
@@ -52,29 +52,30 @@ social=array_redes(data=data2,
                   excluir=["NDI"],
                   identificador="NDI")
 
-params={"w01":1.91836735,"w11":-0.85714286,"b11":1.18367347,
-        "w02":0.44897959,"w12":0.53061224,"b12":1.75510204,
-        "w03":-0.44897959,"w13":0.36734694,"b13":-0.36734694,
-        "w04":-1.42857143,"w14":0.12244898,"b14":1.67346939}
+params={"w01":0.28571429,"w11":-0.20408163,"b11":-2.0,
+        "w02":0.20408163,"w12":1.10204082,"b12":1.02040816,
+        "w03":1.91836735,"w13":0.12244898,"b13":0.36734694,
+        "w04":1.91836735,"w14":-0.7755102,"b14":1.18367347}
 
 param_vars={"var1":params}
 
-params_cate={"var1":1.10204082,"var2":1.10204082,
-             "var3":-0.20408163, "var4":-1.83673469, 
-             "bcat":-0.36734694}
+params_cate={"var1":-1.26530612,"var2":-0.53061224,
+             "var3":0.69387755, "var4":0.28571429, 
+             "bcat":-1.26530612}
 
-# (0.898989898989899, array([ 1.91836735, -0.85714286,  1.18367347,  0.44897959,  0.53061224,
-#         1.75510204, -0.44897959,  0.36734694, -0.36734694, -1.42857143,
-#         0.12244898,  1.67346939,  1.10204082,  1.10204082, -0.20408163,
-#        -1.83673469, -0.36734694]))
-# encontrado con algoritmo genetico
+# (0.8, array([ 0.28571429, -0.20408163, -2.        ,  0.20408163,  1.10204082,
+#         1.02040816,  1.91836735,  0.12244898,  0.36734694,  1.91836735,
+#        -0.7755102 ,  1.18367347, -1.26530612, -0.53061224,  0.69387755,
+#         0.28571429, -1.26530612]))
+# encontrado con algoritmo genetico (llamada comentada abajo, semilla=0), cada individuo
+# usa su propia fila de social y el bias de la red categorica siempre se suma
 
 
 verdad=np.array([0,1,0,1,1,0,1,0,0,0])
 print(verdad)
 
 
-# print(optimizar_gen(np.linspace(-2,2,50),1,3,5,
-#                     company,social,verdad, 0.0005, 100, 0.0001, 10))
+# print(optimizar_gen(np.linspace(-2,2,50),1,3,50,
+#                     company,social,verdad, 0.0005, 100, 0.0001, 10, semilla=0))
 
 print(red_completa(company,social,param_vars,params_cate))
\ No newline at end of file
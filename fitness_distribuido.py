@@ -0,0 +1,344 @@
+from multiprocessing.managers import BaseManager, DictProxy
+import argparse
+import hashlib
+import os
+import queue
+import socket
+import threading
+import time
+import numpy as np
+
+# objetos que viven en el proceso servidor del coordinador
+_SERVIDOR={}
+
+def _objeto(nombre:str,fabrica:callable):
+    if nombre not in _SERVIDOR:
+        _SERVIDOR[nombre]=fabrica()
+    return _SERVIDOR[nombre]
+
+def _cola_tareas():
+    return _objeto("tareas",queue.Queue)
+
+def _cola_resultados():
+    return _objeto("resultados",queue.Queue)
+
+def _configuracion():
+    return _objeto("configuracion",dict)
+
+class _Gestor(BaseManager):
+    pass
+
+_Gestor.register("cola_tareas",callable=_cola_tareas)
+_Gestor.register("cola_resultados",callable=_cola_resultados)
+_Gestor.register("configuracion",callable=_configuracion,proxytype=DictProxy)
+
+def huella_dataset(ruta:str)->str:
+    '''
+    Función encargada de calcular la huella del contenido de un conjunto de datos escrito
+    con dataset_mmap.escribir_dataset, se lee cada archivo una vez
+    ---------------------------------
+    ruta: carpeta del conjunto de datos
+    ---------------------------------
+    RETURN
+    huella: texto hexadecimal, igual para conjuntos con el mismo contenido
+    '''
+    from dataset_mmap import ARCHIVO_METADATOS
+    huella=hashlib.blake2b(digest_size=16)
+    archivos=sorted(archivo for archivo in os.listdir(ruta) if archivo.endswith(".npy"))
+    for nombre in [ARCHIVO_METADATOS]+archivos:
+        huella.update(nombre.encode()+b"\0")
+        with open(os.path.join(ruta,nombre),"rb") as archivo:
+            for parte in iter(lambda:archivo.read(1<<20),b""):
+                huella.update(parte)
+    return huella.hexdigest()
+
+class CoordinadorFitness:
+    '''
+    Clase encargada de evaluar el fitness de poblaciones en trabajadores de otros procesos
+    o máquinas (ver TrabajadorFitness), con la misma interfaz que EvaluadorParalelo, por
+    lo que se entrega a optimizar_gen como evaluador. El coordinador publica con
+    multiprocessing.managers una cola de tareas con bloques de genes y una cola de
+    resultados; los trabajadores ya tienen el conjunto de datos y solo reciben genes.
+    Los trabajadores envian latidos; los bloques de un trabajador sin latidos se vuelven
+    a enviar, y los bloques que tardan más de factor_rezagado veces la mediana de los
+    bloques ya terminados también se envian de nuevo (se usa el primer resultado). Si
+    todas las copias de un bloque enviado max_envios veces se pierden se levanta
+    RuntimeError.
+    multiprocessing.managers intercambia objetos con pickle, por lo que quien conozca la
+    clave puede ejecutar código en el coordinador: por defecto solo se escucha en la
+    máquina local, para otras máquinas se debe elegir el host de una red de confianza y
+    una clave secreta
+    ---------------------------------
+    ruta_dataset: carpeta escrita con dataset_mmap.escribir_dataset, los trabajadores
+    deben tener una copia con el mismo contenido (se compara su huella)
+    clave: bytes de autenticación secretos que deben usar los trabajadores
+    direccion: tupla (host, puerto) en la que escucha el coordinador, puerto 0 para
+    elegir uno libre (ver atributo direccion)
+    tamano_bloque: cantidad de genes por tarea
+    metrica: nombre de la métrica (ver metricas.METRICAS) que usan los trabajadores
+    tiempo_latido: segundos entre latidos de los trabajadores
+    latidos_perdidos: cantidad de latidos sin recibir para dar por perdido un trabajador
+    factor_rezagado: veces la mediana de duración de los bloques tras la cual un bloque
+    se vuelve a enviar
+    tiempo_minimo: segundos mínimos antes de volver a enviar un bloque rezagado
+    max_envios: cantidad máxima de veces que se envia un mismo bloque
+    tiempo_espera: segundos máximos sin latidos de ningún trabajador antes de levantar
+    TimeoutError
+    '''
+    def __init__(self,ruta_dataset:str,clave:bytes,direccion:tuple=("127.0.0.1",0),
+                 tamano_bloque:int=8,
+                 metrica:str="f1_macro",tiempo_latido:float=1.0,
+                 latidos_perdidos:int=3,factor_rezagado:float=3.0,
+                 tiempo_minimo:float=2.0,max_envios:int=3,
+                 tiempo_espera:float=60.0):
+        from dataset_mmap import abrir_dataset
+        if not clave:
+            raise ValueError("Se necesita una clave de autenticación")
+        metadatos=abrir_dataset(ruta_dataset)["metadatos"]
+        self.tamano_bloque=tamano_bloque
+        self.tiempo_latido=tiempo_latido
+        self.latidos_perdidos=latidos_perdidos
+        self.factor_rezagado=factor_rezagado
+        self.tiempo_minimo=tiempo_minimo
+        self.max_envios=max_envios
+        self.tiempo_espera=tiempo_espera
+        self.latidos={}
+        self.perdidos=set()
+        self.duraciones=[]
+        self.reenvios=0
+        self.duplicados=0
+        self._llamada=0
+        self._gestor=_Gestor(address=direccion,authkey=clave)
+        self._gestor.start()
+        self.direccion=self._gestor.address
+        self._tareas=self._gestor.cola_tareas()
+        self._resultados=self._gestor.cola_resultados()
+        self._configuracion=self._gestor.configuracion()
+        self._configuracion.update({"huella":huella_dataset(ruta_dataset),
+                                    "var_redes":metadatos["variables_redes"],
+                                    "var_const":metadatos["variables_const"],
+                                    "metrica":metrica,
+                                    "tiempo_latido":tiempo_latido,
+                                    "llamada":0,"activo":True})
+
+    def trabajadores_activos(self)->list:
+        '''
+        RETURN
+        trabajadores: nombres de los trabajadores con latidos recientes
+        '''
+        limite=time.monotonic()-self.tiempo_latido*self.latidos_perdidos
+        return [nombre for nombre,ultimo in self.latidos.items() if ultimo>=limite]
+
+    def _enviar(self,pendientes:dict,lote:tuple):
+        pendiente=pendientes[lote]
+        pendiente["envios"]+=1
+        pendiente["enviado"]=time.monotonic()
+        self._tareas.put((lote,pendiente["genes"]))
+
+    def evaluar(self,poblacion:'list | np.ndarray')->np.ndarray:
+        '''
+        Función encargada de calcular el fitness de cada gen de una población
+        ---------------------------------
+        poblacion: lista o array 2d con los genes a ser puestos a prueba
+        ---------------------------------
+        RETURN
+        fitness: array con la métrica de cada gen, en el orden de la población
+        '''
+        poblacion=np.asarray(poblacion,dtype=float)
+        self._llamada+=1
+        # los trabajadores descartan las tareas de llamadas anteriores
+        self._configuracion["llamada"]=self._llamada
+        fitness=np.empty(len(poblacion))
+        pendientes={}
+        for inicio in range(0,len(poblacion),self.tamano_bloque):
+            lote=(self._llamada,inicio)
+            pendientes[lote]={"genes":poblacion[inicio:inicio+self.tamano_bloque],
+                              "envios":0,"trabajadores":[]}
+            self._enviar(pendientes,lote)
+        ultimo_latido=time.monotonic()
+        while pendientes:
+            try:
+                mensaje=self._resultados.get(timeout=self.tiempo_latido)
+            except queue.Empty:
+                mensaje=None
+            ahora=time.monotonic()
+            if mensaje is not None:
+                tipo,trabajador=mensaje[:2]
+                self.latidos[trabajador]=ahora
+                self.perdidos.discard(trabajador)
+                ultimo_latido=ahora
+                if tipo=="inicio" and mensaje[2] in pendientes:
+                    pendientes[mensaje[2]]["trabajadores"].append(trabajador)
+                elif tipo=="resultado":
+                    lote,valores=mensaje[2:]
+                    if lote in pendientes:
+                        inicio=lote[1]
+                        fitness[inicio:inicio+len(valores)]=valores
+                        self.duraciones.append(ahora-pendientes.pop(lote)["enviado"])
+                    else:
+                        self.duplicados+=1
+                elif tipo=="error":
+                    raise RuntimeError(f"Error en el trabajador {trabajador}: "
+                                       f"{mensaje[2]}")
+            if ahora-ultimo_latido>self.tiempo_espera:
+                raise TimeoutError(f"Sin trabajadores durante {self.tiempo_espera} seg")
+            activos=set(self.trabajadores_activos())
+            self.perdidos.update(set(self.latidos)-activos)
+            limite=self.tiempo_minimo
+            if self.duraciones:
+                limite=max(limite,self.factor_rezagado*np.median(self.duraciones[-100:]))
+            cola_vacia=None
+            for lote,pendiente in pendientes.items():
+                rezagado=ahora-pendiente["enviado"]>limite
+                en_cola=pendiente["envios"]-len(pendiente["trabajadores"])
+                perdido=False
+                if not set(pendiente["trabajadores"])-self.perdidos:
+                    # sin copias en trabajadores vivos: se perdió si no quedan copias en
+                    # la cola, o si la cola se vació hace rato sin que nadie avisara
+                    # inicio (el trabajador que la tomó murió antes)
+                    if en_cola>0 and rezagado and cola_vacia is None:
+                        cola_vacia=self._tareas.qsize()==0
+                    perdido=en_cola==0 or (rezagado and bool(cola_vacia))
+                if pendiente["envios"]>=self.max_envios:
+                    if perdido:
+                        raise RuntimeError(f"El bloque {lote} (genes {lote[1]} a "
+                                           f"{lote[1]+len(pendiente['genes'])-1}) se "
+                                           f"perdió en sus {pendiente['envios']} envios")
+                    continue
+                if perdido or rezagado:
+                    self.reenvios+=1
+                    self._enviar(pendientes,lote)
+        return fitness
+
+    def cerrar(self):
+        '''
+        Función encargada de avisar a los trabajadores que terminen y detener el servidor
+        '''
+        if getattr(self,"_gestor",None) is None:
+            return
+        try:
+            self._configuracion["activo"]=False
+            # se da tiempo a los trabajadores para leer el aviso antes de cerrar
+            time.sleep(min(self.tiempo_latido,1.0))
+        finally:
+            self._gestor.shutdown()
+            self._gestor=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.cerrar()
+
+class TrabajadorFitness:
+    '''
+    Clase encargada de conectarse a un CoordinadorFitness y evaluar los bloques de genes
+    que este publica. El conjunto de datos se abre una sola vez con np.memmap
+    ---------------------------------
+    direccion: tupla (host, puerto) del coordinador
+    rutas: carpeta de un conjunto de datos o lista de carpetas, se usa la que tiene la
+    misma huella que el conjunto del coordinador
+    clave: bytes de autenticación secretos del coordinador
+    nombre: nombre del trabajador en los latidos, por defecto host y número de proceso
+    '''
+    def __init__(self,direccion:tuple,rutas:'str | list',clave:bytes,
+                 nombre:'str | None'=None):
+        self.direccion=tuple(direccion)
+        self.rutas=[rutas] if isinstance(rutas,str) else list(rutas)
+        self.clave=clave
+        self.nombre=nombre or f"{socket.gethostname()}-{os.getpid()}"
+        self.evaluados=0
+
+    def _conectar(self)->_Gestor:
+        gestor=_Gestor(address=self.direccion,authkey=self.clave)
+        gestor.connect()
+        return gestor
+
+    def _abrir_datos(self,huella:str)->dict:
+        from dataset_mmap import abrir_dataset
+        for ruta in self.rutas:
+            if huella_dataset(ruta)==huella:
+                dataset=abrir_dataset(ruta)
+                dataset["data_red"]={llave:dataset[llave] for llave in
+                                     ("valores","offsets","longitudes","identificadores")}
+                return dataset
+        raise FileNotFoundError(f"Ninguna de las rutas {self.rutas} tiene la huella "
+                                f"{huella}")
+
+    def _latir(self,detener:threading.Event,tiempo_latido:float):
+        # cada hilo usa su propia conexión al coordinador
+        try:
+            resultados=self._conectar().cola_resultados()
+            while not detener.wait(tiempo_latido):
+                resultados.put(("latido",self.nombre))
+        except (EOFError,OSError):
+            pass
+
+    def ejecutar(self,max_tareas:'int | None'=None)->int:
+        '''
+        Función encargada de evaluar tareas hasta que el coordinador termine
+        ---------------------------------
+        max_tareas: cantidad de tareas tras la cual el trabajador se detiene, si es None
+        sigue hasta que el coordinador se cierre
+        ---------------------------------
+        RETURN
+        tareas: cantidad de tareas evaluadas
+        '''
+        from algoritmo_gen import calcular_fitness
+        gestor=self._conectar()
+        tareas=gestor.cola_tareas()
+        resultados=gestor.cola_resultados()
+        configuracion=gestor.configuracion()
+        datos=configuracion.copy()
+        dataset=self._abrir_datos(datos["huella"])
+        detener=threading.Event()
+        latidos=threading.Thread(target=self._latir,args=(detener,datos["tiempo_latido"]),
+                                 daemon=True)
+        latidos.start()
+        realizadas=0
+        try:
+            resultados.put(("latido",self.nombre))
+            while max_tareas is None or realizadas<max_tareas:
+                try:
+                    lote,genes=tareas.get(timeout=datos["tiempo_latido"])
+                except queue.Empty:
+                    if not configuracion.get("activo",False):
+                        break
+                    continue
+                if lote[0]<configuracion.get("llamada",0):
+                    continue
+                resultados.put(("inicio",self.nombre,lote))
+                try:
+                    fitness=calcular_fitness(genes,dataset["data_red"],dataset["const"],
+                                             datos["var_redes"],datos["var_const"],
+                                             dataset["verdadero"],None,datos["metrica"])
+                except Exception as error:
+                    resultados.put(("error",self.nombre,repr(error)))
+                    raise
+                resultados.put(("resultado",self.nombre,lote,fitness))
+                realizadas+=1
+                self.evaluados+=len(genes)
+        except (EOFError,ConnectionError,BrokenPipeError):
+            # el coordinador se cerró
+            pass
+        finally:
+            detener.set()
+        return realizadas
+
+def ejecutar_trabajador(direccion:tuple,rutas:'str | list',clave:bytes,
+                        nombre:'str | None'=None,max_tareas:'int | None'=None)->int:
+    '''
+    Función para lanzar un TrabajadorFitness como destino de un multiprocessing.Process
+    '''
+    return TrabajadorFitness(direccion,rutas,clave,nombre).ejecutar(max_tareas)
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Trabajador de fitness distribuido")
+    parser.add_argument("--host",default="localhost")
+    parser.add_argument("--puerto",type=int,required=True)
+    parser.add_argument("--clave",required=True,
+                        help="clave de autenticación secreta del coordinador")
+    parser.add_argument("--datos",nargs="+",required=True,
+                        help="carpetas de conjuntos de datos escritos con dataset_mmap")
+    args=parser.parse_args()
+    ejecutar_trabajador((args.host,args.puerto),args.datos,args.clave.encode())
@@ -0,0 +1,138 @@
+import json
+import numpy as np
+
+def muestras_estratificadas(verdadero:np.ndarray,fracciones:'list | tuple',
+                            rng:'np.random.Generator | None'=None)->list:
+    '''
+    Función encargada de generar muestras anidadas de individuos que conservan la
+    proporción de cada categoria de verdadero, cada muestra contiene a la anterior
+    ---------------------------------
+    verdadero: array con los valores verdaderos de cada individuo
+    fracciones: fracción de los individuos de cada muestra, de menor a mayor
+    rng: generador de números aleatorios de numpy
+    ---------------------------------
+    RETURN
+    muestras: lista de arrays ordenados con las posiciones de los individuos de cada
+    muestra, None cuando la fracción es 1 (todos los individuos)
+    '''
+    rng=np.random.default_rng(rng)
+    verdadero=np.asarray(verdadero)
+    # una permutación por categoria, cada muestra toma el inicio de cada permutación
+    permutaciones=[rng.permutation(np.flatnonzero(verdadero==categoria))
+                   for categoria in np.unique(verdadero)]
+    muestras=[]
+    for fraccion in fracciones:
+        if fraccion>=1:
+            muestras.append(None)
+            continue
+        partes=[i[:max(1,int(round(fraccion*len(i))))] for i in permutaciones]
+        muestras.append(np.sort(np.concatenate(partes)))
+    return muestras
+
+class EvaluacionEscalonada:
+    '''
+    Clase encargada de evaluar una población por niveles (successive halving): todos los
+    genes se evaluan en una muestra estratificada pequeña, solo la fracción con mejor
+    valor pasa a una muestra más grande y así hasta que los mejores se evaluan con todos
+    los individuos. Cada gen queda con el valor del último nivel que alcanzó
+    ---------------------------------
+    fracciones: fracción de individuos de cada nivel, de menor a mayor, el último nivel
+    siempre usa todos los individuos (se agrega 1.0 si no está)
+    promocion: fracción de genes que pasa de un nivel al siguiente, un valor para todos
+    los niveles o una lista con un valor por paso
+    semilla: semilla o generador para las muestras, se toman muestras nuevas en cada
+    evaluación
+    '''
+    def __init__(self,fracciones:'list | tuple'=(0.1,0.3,1.0),
+                 promocion:'float | list'=0.5,
+                 semilla:'int | np.random.Generator | None'=None):
+        fracciones=list(fracciones)
+        if fracciones!=sorted(fracciones) or fracciones[0]<=0:
+            raise ValueError("Las fracciones deben ser positivas y crecientes")
+        if fracciones[-1]<1:
+            fracciones.append(1.0)
+        if np.isscalar(promocion):
+            promocion=[promocion]*(len(fracciones)-1)
+        if len(promocion)!=len(fracciones)-1:
+            raise ValueError("Se necesita un valor de promocion por cada paso de nivel")
+        self.fracciones=fracciones
+        self.promocion=list(promocion)
+        self.rng=np.random.default_rng(semilla)
+        self.evaluaciones_nivel=np.zeros(len(fracciones),dtype=np.int64)
+
+    @property
+    def evaluaciones_completas(self)->int:
+        '''
+        Cantidad de genes evaluados con todos los individuos
+        '''
+        return int(self.evaluaciones_nivel[-1])
+
+    @property
+    def evaluaciones_ahorradas(self)->int:
+        '''
+        Cantidad de genes que no necesitaron evaluación con todos los individuos
+        '''
+        return int(self.evaluaciones_nivel[0]-self.evaluaciones_nivel[-1])
+
+    def costo_relativo(self)->float:
+        '''
+        RETURN
+        costo: costo de las evaluaciones hechas como proporción del costo de evaluar
+        todos los genes con todos los individuos
+        '''
+        if self.evaluaciones_nivel[0]==0:
+            return 0.0
+        costo=(self.evaluaciones_nivel*np.array(self.fracciones)).sum()
+        return float(costo/self.evaluaciones_nivel[0])
+
+    def evaluar(self,poblacion:np.ndarray,funcion:callable,
+                verdadero:np.ndarray)->tuple:
+        '''
+        Función encargada de evaluar una población por niveles
+        ---------------------------------
+        poblacion: array 2d con los genes
+        funcion: función que recibe (genes, posiciones de los individuos o None para
+        todos) y regresa el fitness de cada gen en esos individuos
+        verdadero: array con los valores verdaderos de cada individuo, usado para
+        estratificar las muestras
+        ---------------------------------
+        RETURN
+        fitness: array con el valor del último nivel alcanzado por cada gen
+        completos: array booleano con los genes evaluados con todos los individuos
+        '''
+        muestras=muestras_estratificadas(verdadero,self.fracciones,self.rng)
+        fitness=np.empty(len(poblacion))
+        completos=np.zeros(len(poblacion),dtype=bool)
+        activos=np.arange(len(poblacion))
+        for nivel,muestra in enumerate(muestras):
+            fitness[activos]=funcion(poblacion[activos],muestra)
+            self.evaluaciones_nivel[nivel]+=len(activos)
+            if nivel==len(muestras)-1:
+                completos[activos]=True
+                break
+            promovidos=max(1,int(np.ceil(self.promocion[nivel]*len(activos))))
+            orden=np.argsort(fitness[activos],kind="stable")[::-1]
+            activos=activos[orden[:promovidos]]
+        return fitness, completos
+
+    def estado(self)->dict:
+        '''
+        Función encargada de exportar el generador de las muestras y los contadores, para
+        guardarlos en un checkpoint
+        ---------------------------------
+        RETURN
+        estado: diccionario con rng (estado del generador como JSON) y
+        evaluaciones_nivel
+        '''
+        return {"rng":json.dumps(self.rng.bit_generator.state),
+                "evaluaciones_nivel":self.evaluaciones_nivel.copy()}
+
+    def cargar_estado(self,estado:dict):
+        '''
+        Función encargada de reemplazar el generador y los contadores por los exportados
+        con estado
+        ---------------------------------
+        estado: diccionario generado con estado
+        '''
+        self.rng.bit_generator.state=json.loads(str(estado["rng"]))
+        self.evaluaciones_nivel=np.array(estado["evaluaciones_nivel"],dtype=np.int64)
@@ -0,0 +1,275 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import mmap
+import os
+import numpy as np
+from algoritmo_gen import calcular_fitness
+from tensores import datos_a_tensor
+
+# datos del proceso trabajador, se llenan una sola vez en _iniciar_trabajador
+_DATOS_TRABAJADOR={}
+# arrays de un diccionario empaquetado que necesitan los procesos
+EMPAQUETADO=("valores","offsets","longitudes")
+
+def compartir_array(array:np.ndarray)->tuple:
+    '''
+    Función encargada de copiar un array a un bloque de memoria compartida
+    ---------------------------------
+    array: array de numpy a compartir
+    ---------------------------------
+    RETURN
+    bloque: SharedMemory con la copia del array, se debe cerrar y liberar al terminar
+    descriptor: tupla (nombre, forma, tipo) para reconstruir el array en otro proceso
+    '''
+    array=np.ascontiguousarray(array)
+    bloque=shared_memory.SharedMemory(create=True,size=max(array.nbytes,1))
+    copia=np.ndarray(array.shape,dtype=array.dtype,buffer=bloque.buf)
+    copia[...]=array
+    return bloque, (bloque.name,array.shape,array.dtype.str)
+
+def descriptor_archivo(array:np.ndarray)->'tuple | None':
+    '''
+    Función encargada de describir un array abierto completo con np.memmap (ej. con
+    dataset_mmap.abrir_dataset), para que otro proceso lo abra desde el mismo archivo
+    sin copiarlo
+    ---------------------------------
+    array: array de numpy
+    ---------------------------------
+    RETURN
+    descriptor: tupla (ruta, posición, forma, tipo), None si el array no es un
+    np.memmap completo y contiguo
+    '''
+    if (isinstance(array,np.memmap) and isinstance(array.base,mmap.mmap)
+            and array.filename is not None and array.flags.c_contiguous):
+        return (array.filename,array.offset,array.shape,array.dtype.str)
+    return None
+
+def abrir_array(descriptor:tuple)->tuple:
+    '''
+    Función encargada de reconstruir sin copiar un array guardado en memoria compartida
+    o en un archivo
+    ---------------------------------
+    descriptor: tupla (nombre, forma, tipo) generada por compartir_array o tupla (ruta,
+    posición, forma, tipo) generada por descriptor_archivo
+    ---------------------------------
+    RETURN
+    bloque: SharedMemory abierto, debe mantenerse vivo mientras se use el array, None
+    si el array es de un archivo
+    array: array de numpy sobre la memoria compartida o np.memmap de solo lectura
+    '''
+    if len(descriptor)==4:
+        ruta,posicion,forma,tipo=descriptor
+        return None, np.memmap(ruta,dtype=np.dtype(tipo),mode="r",offset=posicion,
+                               shape=tuple(forma))
+    nombre,forma,tipo=descriptor
+    bloque=shared_memory.SharedMemory(name=nombre)
+    return bloque, np.ndarray(forma,dtype=np.dtype(tipo),buffer=bloque.buf)
+
+def compartir_datos(data_red:'list | np.ndarray | dict | str',
+                    data_const:'np.ndarray | None',verdadero:'np.ndarray | None',
+                    longitudes:'np.ndarray | None'=None)->tuple:
+    '''
+    Función encargada de dejar los datos de la red listos para abrirlos en otros procesos
+    sin enviarlos: los arrays se copian una sola vez a memoria compartida, salvo los
+    abiertos con np.memmap que se describen por su archivo
+    ---------------------------------
+    data_red: tensor, list, diccionario empaquetado (se comparte sin rellenar con ceros)
+    o ruta de un conjunto de datos escrito con dataset_mmap.escribir_dataset (data_const
+    y verdadero se toman del conjunto)
+    data_const: array con información de cada individuo para la predicción binaria
+    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_red es un tensor rellenado con ceros
+    ---------------------------------
+    RETURN
+    descriptores: diccionario para abrir_datos, se puede enviar a los procesos
+    bloques: lista de SharedMemory creados, se deben cerrar y liberar al terminar
+    '''
+    if isinstance(data_red,str):
+        return {"ruta":data_red}, []
+    if isinstance(data_red,dict):
+        # se comparte empaquetado, los procesos rellenan solo cada bloque
+        arrays={"empaquetado_"+llave:data_red[llave] for llave in EMPAQUETADO}
+        longitudes=None
+    else:
+        if not isinstance(data_red,np.ndarray) or data_red.ndim!=3:
+            data_red,longitudes=datos_a_tensor(data_red)
+        arrays={"data_red":data_red}
+    if descriptor_archivo(data_const) is None:
+        data_const=np.asarray(data_const,dtype=float)
+    if descriptor_archivo(verdadero) is None:
+        verdadero=np.asarray(verdadero)
+    arrays.update(data_const=data_const,verdadero=verdadero,longitudes=longitudes)
+    descriptores={}
+    bloques=[]
+    try:
+        for llave,array in arrays.items():
+            if array is None:
+                descriptores[llave]=None
+                continue
+            descriptores[llave]=descriptor_archivo(array)
+            if descriptores[llave] is None:
+                bloque,descriptores[llave]=compartir_array(array)
+                bloques.append(bloque)
+    except Exception:
+        liberar_bloques(bloques)
+        raise
+    return descriptores, bloques
+
+def abrir_datos(descriptores:dict)->tuple:
+    '''
+    Función encargada de abrir sin copiar los datos compartidos con compartir_datos
+    ---------------------------------
+    descriptores: diccionario generado con compartir_datos
+    ---------------------------------
+    RETURN
+    datos: diccionario con data_red (tensor o diccionario empaquetado), data_const,
+    verdadero y longitudes
+    bloques: lista de SharedMemory abiertos, deben mantenerse vivos mientras se usen los
+    datos y cerrarse (sin liberar) al terminar
+    '''
+    if "ruta" in descriptores:
+        from dataset_mmap import abrir_dataset
+        dataset=abrir_dataset(descriptores["ruta"])
+        return {"data_red":dataset,"data_const":dataset["const"],
+                "verdadero":dataset["verdadero"],"longitudes":None}, []
+    datos={}
+    bloques=[]
+    for llave,descriptor in descriptores.items():
+        if descriptor is None:
+            datos[llave]=None
+            continue
+        bloque,datos[llave]=abrir_array(descriptor)
+        if bloque is not None:
+            bloques.append(bloque)
+    if "empaquetado_valores" in datos:
+        datos["data_red"]={llave:datos.pop("empaquetado_"+llave) for llave in EMPAQUETADO}
+    return datos, bloques
+
+def liberar_bloques(bloques:list,crear:bool=True):
+    '''
+    Función encargada de cerrar bloques de memoria compartida
+    ---------------------------------
+    bloques: lista de SharedMemory
+    crear: True si los bloques se crearon en este proceso, en ese caso también se liberan
+    '''
+    for bloque in bloques:
+        bloque.close()
+        if crear:
+            bloque.unlink()
+
+def _iniciar_trabajador(descriptores:dict,var_redes:int,var_const:int,
+                        metrica:'str | callable',tamano_bloque_red:'int | None'=None):
+    '''
+    Inicializador de cada proceso del pool, abre los datos en memoria compartida o el
+    conjunto de datos en disco
+    '''
+    datos,bloques=abrir_datos(descriptores)
+    _DATOS_TRABAJADOR.update(datos)
+    _DATOS_TRABAJADOR["_bloques"]=bloques
+    _DATOS_TRABAJADOR["var_redes"]=var_redes
+    _DATOS_TRABAJADOR["var_const"]=var_const
+    _DATOS_TRABAJADOR["metrica"]=metrica
+    _DATOS_TRABAJADOR["tamano_bloque_red"]=tamano_bloque_red
+
+def _evaluar_bloque(genes:np.ndarray)->np.ndarray:
+    '''
+    Tarea de cada proceso del pool, calcula el fitness de un bloque de genes
+    '''
+    return calcular_fitness(genes,_DATOS_TRABAJADOR["data_red"],
+                            _DATOS_TRABAJADOR["data_const"],
+                            _DATOS_TRABAJADOR["var_redes"],
+                            _DATOS_TRABAJADOR["var_const"],
+                            _DATOS_TRABAJADOR["verdadero"],
+                            _DATOS_TRABAJADOR["longitudes"],
+                            _DATOS_TRABAJADOR["metrica"],
+                            tamano_bloque_red=_DATOS_TRABAJADOR["tamano_bloque_red"])
+
+class EvaluadorParalelo:
+    '''
+    Clase encargada de evaluar el fitness de poblaciones repartiendo los genes en un
+    ProcessPoolExecutor. data_red, data_const y verdadero se copian una sola vez a memoria
+    compartida, de forma que en cada generación solo se envian los genes a los procesos.
+    Los procesos se mantienen vivos hasta llamar cerrar (o salir del bloque with), por lo
+    que el mismo evaluador puede usarse en varias generaciones y varias llamadas de
+    optimizar_gen. El resultado es igual al de calcular_fitness en un solo proceso
+    ---------------------------------
+    data_red: array 3d de forma (individuos, pasos de tiempo, variables) o list con la
+    información de cada individuo para realizar la red LSTM. También puede ser un
+    diccionario empaquetado (ver funciones_data.empaquetar_info_redes), que se comparte
+    sin rellenar con ceros, o la ruta de un conjunto de datos escrito con
+    dataset_mmap.escribir_dataset: en ese caso cada proceso lo abre con np.memmap sin
+    copiarlo, y data_const y verdadero se toman del conjunto (se pueden entregar como
+    None). Los arrays abiertos con np.memmap (ej. con dataset_mmap.abrir_dataset) no se
+    copian a memoria compartida, cada proceso los abre desde su archivo
+    data_const: array con información de cada individuo para la predicción binaria
+    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las
+    estimadas en la red LSTM
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_red es un tensor rellenado con ceros
+    trabajadores: cantidad de procesos, si es None se usa la cantidad de CPUs
+    tamano_bloque: cantidad de genes por tarea, si es None se reparte la población en
+    partes iguales entre los procesos
+    metrica: nombre de la métrica (ver metricas.METRICAS) o función vectorizada, debe
+    poder enviarse a los procesos (definida a nivel de módulo)
+    tamano_bloque_red: cantidad de individuos que pasan a la vez por la red en cada
+    proceso, si es None se elige según la cantidad de genes de cada tarea
+    '''
+    def __init__(self,data_red:'list | np.ndarray | dict | str',
+                 data_const:'np.ndarray | None',verdadero:'np.ndarray | None',
+                 var_redes:int,var_const:int,
+                 longitudes:'np.ndarray | None'=None,
+                 trabajadores:'int | None'=None,tamano_bloque:'int | None'=None,
+                 metrica:'str | callable'="f1_macro",
+                 tamano_bloque_red:'int | None'=None):
+        self.trabajadores=trabajadores or os.cpu_count() or 1
+        self.tamano_bloque=tamano_bloque
+        descriptores,self._bloques=compartir_datos(data_red,data_const,verdadero,
+                                                   longitudes)
+        try:
+            self._pool=ProcessPoolExecutor(max_workers=self.trabajadores,
+                                           initializer=_iniciar_trabajador,
+                                           initargs=(descriptores,var_redes,var_const,
+                                                     metrica,tamano_bloque_red))
+        except Exception:
+            self._liberar_memoria()
+            raise
+
+    def evaluar(self,poblacion:'list | np.ndarray')->np.ndarray:
+        '''
+        Función encargada de calcular el fitness de cada gen de una población
+        ---------------------------------
+        poblacion: lista o array 2d con los genes a ser puestos a prueba
+        ---------------------------------
+        RETURN
+        fitness: array con la métrica de cada gen, en el orden de la población
+        '''
+        poblacion=np.asarray(poblacion,dtype=float)
+        if len(poblacion)==0:
+            return np.empty(0)
+        tamano=self.tamano_bloque
+        if tamano is None:
+            tamano=-(-len(poblacion)//self.trabajadores)
+        bloques=[poblacion[i:i+tamano] for i in range(0,len(poblacion),max(tamano,1))]
+        return np.concatenate(list(self._pool.map(_evaluar_bloque,bloques)))
+
+    def _liberar_memoria(self):
+        liberar_bloques(self._bloques)
+        self._bloques=[]
+
+    def cerrar(self):
+        '''
+        Función encargada de terminar los procesos y liberar la memoria compartida
+        '''
+        if getattr(self,"_pool",None) is not None:
+            self._pool.shutdown()
+            self._pool=None
+        self._liberar_memoria()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.cerrar()
@@ -1,28 +1,164 @@
 import pandas as pd
 import numpy as np
+from tensores import datos_a_tensor
 
 
 
+def orden_identificadores(data:pd.DataFrame,identificador:str,
+                          orden:'list | np.ndarray | None'=None)->tuple:
+    '''
+    Función encargada de asignar a cada fila de un DataFrame la posición de su
+    identificador dentro de un orden común, de forma que la información temporal y la
+    información constante de los individuos queden alineadas.
+    Si no se entrega un orden se usan los identificadores ordenados de menor a mayor.
+    Las filas cuyo identificador no está en el orden reciben la posición -1
+    ---------------------------------
+    data: DataFrame con la columna identificador
+    identificador: nombre de la columna que identifica a cada individuo
+    orden: lista o array con el orden de los identificadores a usar
+    ---------------------------------
+    RETURN
+    codigos: array con la posición del identificador de cada fila
+    identificadores: array con los identificadores en el orden usado
+    '''
+    if orden is None:
+        codigos,identificadores=pd.factorize(data[identificador],sort=True)
+        return codigos, np.asarray(identificadores)
+    identificadores=pd.Index(orden)
+    if not identificadores.is_unique:
+        raise ValueError("El orden de identificadores tiene valores repetidos")
+    codigos=identificadores.get_indexer(data[identificador])
+    return codigos, np.asarray(identificadores)
+
+def empaquetar_info_redes(data:pd.DataFrame,excluir:list,identificador:str,
+                          orden:'list | np.ndarray | None'=None,
+                          dtype:type=np.float32)->dict:
+    '''
+    Función generada para pasar la información de un DataFrame de pandas a una
+    estructura empaquetada para la red LSTM, solo se reciben variables numericas.
+    Se ordena una única vez por identificador (manteniendo el orden original de las
+    observaciones de cada individuo) y se guardan todas las observaciones en un solo
+    array contiguo junto a la posición donde empieza cada individuo. Cada individuo
+    puede tener diferente número de observaciones pero debe contar con el mismo número
+    de variables
+    ---------------------------------
+    data: DataFrame con la información temporal de los individuos
+    excluir: columnas que no se usan en la red LSTM (incluyendo el identificador)
+    identificador: nombre de la columna que identifica a cada individuo
+    orden: lista o array con el orden de los identificadores, si es None se usan los
+    identificadores ordenados. Las filas de identificadores fuera del orden se descartan
+    y los identificadores del orden sin filas quedan con 0 observaciones
+    dtype: tipo de dato del array de valores
+    ---------------------------------
+    RETURN
+    empaquetado: diccionario con
+        valores: array 2d (observaciones, variables) con las observaciones de todos
+        los individuos seguidas
+        offsets: array con la posición de inicio de cada individuo en valores, el
+        último elemento es el total de observaciones
+        longitudes: array con la cantidad de observaciones de cada individuo
+        identificadores: array con el identificador de cada individuo
+    '''
+    codigos,identificadores=orden_identificadores(data,identificador,orden)
+    columnas=[i for i in data.columns if i not in excluir]
+    valores=data[columnas].to_numpy(dtype=dtype)
+    validos=codigos>=0
+    if not validos.all():
+        codigos=codigos[validos]
+        valores=valores[validos]
+    # orden estable para no alterar el orden de las observaciones de cada individuo
+    posiciones=np.argsort(codigos,kind="stable")
+    valores=np.ascontiguousarray(valores[posiciones])
+    longitudes=np.bincount(codigos,minlength=len(identificadores))
+    offsets=np.zeros(len(identificadores)+1,dtype=np.int64)
+    np.cumsum(longitudes,out=offsets[1:])
+    return {"valores":valores,
+            "offsets":offsets,
+            "longitudes":longitudes,
+            "identificadores":identificadores}
+
+def tensor_empaquetado(empaquetado:dict)->tuple:
+    '''
+    Función encargada de obtener una copia rellenada con ceros de una estructura
+    empaquetada, con forma (individuos, pasos de tiempo, variables). Como los individuos
+    tienen distinta cantidad de observaciones no puede ser una vista de valores
+    ---------------------------------
+    empaquetado: diccionario generado con empaquetar_info_redes
+    ---------------------------------
+    RETURN
+    tensor: array 3d con la información de cada individuo, rellenado al final, con el
+    mismo tipo de dato de valores
+    mascara: array booleano (individuos, pasos de tiempo) que indica las observaciones
+    reales
+    '''
+    tensor,longitudes=datos_a_tensor(empaquetado,dtype=empaquetado["valores"].dtype)
+    mascara=np.arange(tensor.shape[1])[None,:]<longitudes[:,None]
+    return tensor, mascara
+
+def array_const(data:pd.DataFrame,excluir:list,identificador:str,
+                identificadores:'list | np.ndarray',dtype:type=np.float32)->np.ndarray:
+    '''
+    Función encargada de pasar la información constante de los individuos (una fila por
+    individuo) a un array alineado con un orden de identificadores dado
+    ---------------------------------
+    data: DataFrame con una fila por individuo
+    excluir: columnas que no se usan en la red categorica (incluyendo el identificador)
+    identificador: nombre de la columna que identifica a cada individuo
+    identificadores: orden de los individuos, normalmente el de empaquetar_info_redes
+    dtype: tipo de dato del array
+    ---------------------------------
+    RETURN
+    array_data: array 2d (individuos, variables) en el orden de identificadores
+    '''
+    indice=pd.Index(data[identificador])
+    if not indice.is_unique:
+        raise ValueError("La información constante tiene identificadores repetidos")
+    posiciones=indice.get_indexer(identificadores)
+    if (posiciones<0).any():
+        raise ValueError("Faltan identificadores en la información constante")
+    columnas=[i for i in data.columns if i not in excluir]
+    return data[columnas].to_numpy(dtype=dtype)[posiciones]
+
+def construir_datos_redes(data_temp:pd.DataFrame,data_const:pd.DataFrame,
+                          excluir_temp:list,excluir_const:list,
+                          identificador:str,dtype:type=np.float32)->tuple:
+    '''
+    Función encargada de construir en una sola pasada la información temporal y la
+    información constante de los individuos con un orden de identificadores común.
+    Solo se usan los individuos presentes en ambas tablas
+    ---------------------------------
+    data_temp: DataFrame con la información temporal de los individuos
+    data_const: DataFrame con una fila por individuo
+    excluir_temp: columnas de data_temp que no se usan en la red LSTM
+    excluir_const: columnas de data_const que no se usan en la red categorica
+    identificador: nombre de la columna que identifica a cada individuo en ambas tablas
+    dtype: tipo de dato de los arrays
+    ---------------------------------
+    RETURN
+    empaquetado: diccionario generado con empaquetar_info_redes
+    const: array 2d con la información constante en el mismo orden
+    '''
+    orden=np.intersect1d(data_temp[identificador].unique(),
+                         data_const[identificador].unique())
+    empaquetado=empaquetar_info_redes(data_temp,excluir_temp,identificador,
+                                      orden=orden,dtype=dtype)
+    const=array_const(data_const,excluir_const,identificador,
+                      empaquetado["identificadores"],dtype=dtype)
+    return empaquetado, const
+
 def agregar_info_redes(data:pd.DataFrame,excluir:list,identificador:str)->list:
     '''
     Función generada para pasar la información de un DataFrame de pandas a una
-    estructura que pueda usarse en una red neuronal tipo lstm, solo se reciben 
+    estructura que pueda usarse en una red neuronal tipo lstm, solo se reciben
     variables numericas.
     En esta función se necesita tener un identificador de individuo, con el cual
     se va a obtener la matriz de variables de éste. Cada individuo puede tener
-    diferente número de observaciones pero debe contar con el mismo número de 
-    variables
-    '''
-    # lista donde se almacena la información
-    lista_data=[]
-    # ciclo basado en los identificadores para obtener las observaciones  y vars
-    for i in data[identificador].value_counts().index:
-        # Se filtran las observaciones del identificador i
-        dataFil=data.loc[data[identificador]==i,:]
-        # Se convierte el DataFrame excluyendo variables no necesarias
-        arreglo=np.asarray(dataFil.drop(columns=excluir))
-        # Agregar el array a la lista_data
-        lista_data.append(arreglo)
+    diferente número de observaciones pero debe contar con el mismo número de
+    variables. Los individuos quedan ordenados por identificador
+    '''
+    empaquetado=empaquetar_info_redes(data,excluir,identificador,dtype=float)
+    # vistas del array empaquetado, sin filtrar el DataFrame por cada individuo
+    lista_data=np.split(empaquetado["valores"],empaquetado["offsets"][1:-1])
     return lista_data
 
 
@@ -30,22 +166,24 @@ def agregar_info_redes(data:pd.DataFrame,excluir:list,identificador:str)->list:
 def array_redes(data:pd.DataFrame,excluir:list, identificador:str)->np.ndarray:
     '''
     Función generada para pasar la información de un DataFrame de pandas a una
-    estructura que pueda usarse en una red neuronal tipo lstm, solo se reciben 
+    estructura que pueda usarse en una red neuronal tipo lstm, solo se reciben
     variables numericas.
     En esta función se necesita tener un identificador de individuo, con el cual
     se va a obtener la matriz de variables de éste. Cada individuo debe tener
     el mismo número de observaciones y contar con el mismo número de variables.
+    Los individuos quedan ordenados por identificador, igual que en agregar_info_redes,
+    sin importar el orden de las filas del DataFrame
     '''
-    # Convertir a array para mejor manejo
-    datanumpy=np.asarray(data.drop(columns=excluir))
-    # Cuantos individuos tengo
-    individuos=len(np.unique(data[identificador]))
+    codigos,identificadores=orden_identificadores(data,identificador)
+    longitudes=np.bincount(codigos,minlength=len(identificadores))
+    if (longitudes!=longitudes[0]).any():
+        raise ValueError("Los individuos no tienen el mismo número de observaciones, "
+                         "usar empaquetar_info_redes")
+    # Convertir a array para mejor manejo, con las filas agrupadas por identificador
+    datanumpy=np.asarray(data.drop(columns=excluir))[np.argsort(codigos,kind="stable")]
     # Estructura de array 3d
-    array_data=datanumpy.reshape((individuos,
-                                  int(data.shape[0]/individuos),
-                                  data.drop(columns=excluir).shape[1]
+    array_data=datanumpy.reshape((len(identificadores),
+                                  longitudes[0],
+                                  datanumpy.shape[1]
                                   ))
     return array_data
-
-
-
@@ -1,5 +1,27 @@
 from math import exp, tanh
 import numpy as np
+from tensores import (datos_a_tensor, cantidad_individuos, bloque_datos,
+                      seleccionar_individuos)
+
+# individuos máximos por bloque al evaluar sin tamano_bloque
+TAMANO_BLOQUE_EMPAQUETADO=65536
+# elementos de cada array intermedio (población, individuos, variables) de la red LSTM
+# al elegir el bloque sin tamano_bloque, unos 32 MB en float64
+ELEMENTOS_POR_BLOQUE=2**22
+
+def tamano_bloque_red(poblacion:int,variables:int)->int:
+    '''
+    Función encargada de elegir cuántos individuos pasan a la vez por la red para que
+    los arrays intermedios de la población no superen ELEMENTOS_POR_BLOQUE
+    ---------------------------------
+    poblacion: cantidad de genes evaluados a la vez
+    variables: cantidad de variables de la red LSTM
+    ---------------------------------
+    RETURN
+    tamano_bloque: cantidad de individuos por bloque, entre 1 y TAMANO_BLOQUE_EMPAQUETADO
+    '''
+    tamano=ELEMENTOS_POR_BLOQUE//max(poblacion*variables,1)
+    return int(min(max(tamano,1),TAMANO_BLOQUE_EMPAQUETADO))
 
 def suma_ponderada(valor0:float,
                     w0:float,
@@ -148,19 +170,18 @@ def red_categorica(data:np.ndarray,**kwargs)->int:
     Función encargada de realizar la predicción binaria para unas variables
     --------------------------
     data: array con información de un individuo y las variables asociadas a este
-    **kwargs: diccionario con pesos asociados a cada una de las variables
+    **kwargs: diccionario con pesos asociados a cada una de las variables, el último
+    elemento corresponde al bias de la red
     --------------------------
     RETURN
     Regresa 1 o 0 dependiendo el valor de la función signoideal exponencial
     '''
+    pesos=list(kwargs.values())
     parcial=[]
-    contador=1
-    for i,j in zip(data,kwargs.values()):
-        if contador>=len(kwargs):
-            parcial.append(1*j)
+    for i,j in zip(data,pesos[:-1]):
         multiplicacion=i*j
         parcial.append(multiplicacion)
-        contador+=1
+    parcial.append(pesos[-1])
     parcial=np.array(parcial)
     salida=1/(1+exp(-parcial.sum()))
     if salida>0.5:
@@ -203,20 +224,188 @@ def red_completa(data_temp:'list | np.ndarray',
     --------------------------------------------------------
     data_temp: array de numpy o list con la información necesaria de las variables y 
     observaciones de cada individuo para realizar la red LSTM
-    data_const: array con información de un individuo y las variables asociadas a este para
-    la predicción binaria
+    data_const: array con una fila por individuo, en el mismo orden de data_temp, con las
+    variables asociadas a este para la predicción binaria. Cada individuo usa su propia
+    fila (antes todos usaban los primeros valores de la tabla completa, por lo que los
+    parámetros guardados antes de este cambio no reproducen sus predicciones)
     pesos_lstm: diccionario con los pesos y bias de cada una de las variables asociadas a
     la red LSTM
     pesos_const: diccionario con pesos asociados a cada una de las variables para la 
-    predicción binaria
+    predicción binaria, el último elemento es el bias y siempre se suma
     ---------------------------------------
     RETURN
     resultado: Array con las predicciones finales de las observaciones, que permite saber
     si el individuo pertenece a 1 o 0
     '''
+    data_const=np.asarray(data_const).reshape(len(data_temp),-1)
     resultados=[]
-    for i in data_temp:
-        resultados_ind=red_completa_ind(data_lstm=i, data_const=data_const,
+    for i,j in zip(data_temp,data_const):
+        resultados_ind=red_completa_ind(data_lstm=i, data_const=j,
                                         pesos_lstm=pesos_lstm, pesos_const=pesos_const)
         resultados.append(resultados_ind)
-    return np.asarray(resultados)
\ No newline at end of file
+    return np.asarray(resultados)
+
+def sigmoide(entrada:np.ndarray)->np.ndarray:
+    '''
+    Versión vectorizada de la función sigmoidea exponencial usada en suma_ponderada
+    ---------------
+    entrada: array con las sumas ponderadas
+    ---------------------
+    RETURN
+    salida: array con la transformación sigmoidea de cada elemento
+    '''
+    with np.errstate(over='ignore'):
+        return 1/(1+np.exp(-entrada))
+
+def red_lstm_memorias(data_temp:np.ndarray, pesos_lstm:np.ndarray,
+                      longitudes:'np.ndarray | None'=None,
+                      short_memory:'np.ndarray | None'=None,
+                      long_memory:'np.ndarray | None'=None,
+                      inicios:'np.ndarray | None'=None)->tuple:
+    '''
+    Función encargada de avanzar la red LSTM de todos los genes, individuos y variables
+    desde unas memorias iniciales, en cada paso de tiempo se calculan todas las
+    compuertas de un_paso_red como operaciones de arrays
+    ----------------------------------------
+    data_temp: array 3d de forma (individuos, pasos de tiempo, variables)
+    pesos_lstm: array de forma (población, variables, 12) con los pesos y bias en el
+    orden w01, w11, b11, w02, w12, b12, w03, w13, b13, w04, w14, b14
+    longitudes: array con la cantidad de observaciones reales de cada individuo, los
+    pasos posteriores no modifican las memorias. Si es None se usan todos los pasos
+    short_memory: array de forma (población, individuos, variables) con la memoria a
+    corto plazo inicial, si es None se parte de 0
+    long_memory: array de la misma forma con la memoria a largo plazo inicial, si es
+    None se parte de 0
+    inicios: array con la cantidad de primeras observaciones de cada individuo que se
+    saltan sin modificar las memorias, si es None no se salta ninguna
+    ---------------------
+    RETURN
+    short_memory: array de forma (población, individuos, variables) con la memoria a
+    corto plazo final, que es la predicción de la red para cada variable
+    long_memory: array de la misma forma con la memoria a largo plazo final
+    '''
+    individuos,pasos,variables=data_temp.shape
+    if pesos_lstm.shape[1]!=variables:
+        raise ValueError("ERROR EN DIMENSIONES DE VARIABLES Y PESOS pesos_lstm")
+    # (población, 1, variables) para que se difunda sobre los individuos
+    w=[pesos_lstm[:,None,:,k] for k in range(12)]
+    w01,w11,b11,w02,w12,b12,w03,w13,b13,w04,w14,b14=w
+    forma=(pesos_lstm.shape[0],individuos,variables)
+    if short_memory is None:
+        short_memory=np.zeros(forma)
+    if long_memory is None:
+        long_memory=np.zeros(forma)
+    if inicios is not None and longitudes is None:
+        longitudes=np.full(individuos,pasos)
+    for t in range(pasos):
+        input1=data_temp[None,:,t,:]
+        perc_long_memory=sigmoide(short_memory*w01+input1*w11+b11)
+        perc_to_remember=sigmoide(short_memory*w02+input1*w12+b12)
+        poten_to_remember=np.tanh(short_memory*w03+input1*w13+b13)
+        poten_to_remember_sh=sigmoide(short_memory*w04+input1*w14+b14)
+        nueva_long=long_memory*perc_long_memory+perc_to_remember*poten_to_remember
+        nueva_short=np.tanh(nueva_long)*poten_to_remember_sh
+        if longitudes is None:
+            short_memory,long_memory=nueva_short,nueva_long
+        else:
+            activo=t<longitudes
+            if inicios is not None:
+                activo=activo&(t>=inicios)
+            activo=activo[None,:,None]
+            short_memory=np.where(activo,nueva_short,short_memory)
+            long_memory=np.where(activo,nueva_long,long_memory)
+    return short_memory, long_memory
+
+def red_lstm_poblacion(data_temp:np.ndarray, pesos_lstm:np.ndarray,
+                       longitudes:'np.ndarray | None'=None)->np.ndarray:
+    '''
+    Función encargada de realizar la red LSTM para todos los genes, individuos y
+    variables al mismo tiempo partiendo de memorias en 0 (ver red_lstm_memorias).
+    Equivale a red_lstm aplicado a cada combinación
+    ----------------------------------------
+    data_temp: array 3d de forma (individuos, pasos de tiempo, variables)
+    pesos_lstm: array de forma (población, variables, 12) con los pesos y bias en el
+    orden w01, w11, b11, w02, w12, b12, w03, w13, b13, w04, w14, b14
+    longitudes: array con la cantidad de observaciones reales de cada individuo, los
+    pasos posteriores no modifican las memorias. Si es None se usan todos los pasos
+    ---------------------
+    RETURN
+    short_memory: array de forma (población, individuos, variables) con la predicción
+    de la red para cada variable
+    '''
+    return red_lstm_memorias(data_temp,pesos_lstm,longitudes)[0]
+
+def red_categorica_poblacion(pred:np.ndarray,data_const:np.ndarray,
+                             pesos_const:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de realizar la red categorica para todos los genes e individuos
+    ----------------------------------------
+    pred: array de forma (población, individuos, variables LSTM) con la salida de la
+    red LSTM
+    data_const: array 2d con la información constante de los mismos individuos
+    pesos_const: array de forma (población, variables LSTM + variables const + 1) con los
+    pesos de la red categorica de cada gen, el último es el bias
+    ---------------------
+    RETURN
+    resultado: array de forma (población, individuos) con las predicciones de 1 o 0
+    '''
+    variables=pred.shape[2]
+    entrada=(pred*pesos_const[:,None,:variables]).sum(axis=2)
+    entrada+=(np.asarray(data_const,dtype=float)@pesos_const[:,variables:-1].T).T
+    entrada+=pesos_const[:,-1:]
+    return (sigmoide(entrada)>0.5).astype(int)
+
+def red_completa_poblacion(data_temp:'list | np.ndarray',
+                           data_const:np.ndarray,
+                           pesos_lstm:np.ndarray,
+                           pesos_const:np.ndarray,
+                           longitudes:'np.ndarray | None'=None,
+                           tamano_bloque:'int | None'=None,
+                           cache_lstm=None)->np.ndarray:
+    '''
+    Función encargada de hacer la predicción binaria de todos los individuos para todos
+    los genes de una población en una sola pasada vectorizada
+    --------------------------------------------------------
+    data_temp: array 3d de forma (individuos, pasos de tiempo, variables), list o
+    diccionario empaquetado con la información de cada individuo para realizar la red
+    LSTM. El diccionario se rellena por bloques, sin armar el tensor completo
+    data_const: array con información de cada individuo y las variables asociadas a este
+    para la predicción binaria
+    pesos_lstm: array de forma (población, variables, 12) con los pesos y bias de la red
+    LSTM de cada gen
+    pesos_const: array de forma (población, variables LSTM + variables const + 1) con los
+    pesos de la red categorica de cada gen, el último es el bias
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_temp está rellenado con ceros
+    tamano_bloque: cantidad de individuos procesados a la vez para limitar la memoria, si
+    es None se elige con tamano_bloque_red según el tamaño de la población (o se usa
+    TAMANO_BLOQUE_EMPAQUETADO con cache_lstm, para que los rangos de individuos guardados
+    no cambien entre generaciones)
+    cache_lstm: CacheLSTM (ver cache_lstm) con salidas de la red LSTM por variable ya
+    calculadas para estos individuos, solo se calculan los bloques de pesos nuevos
+    ---------------------------------------
+    RETURN
+    resultado: array de forma (población, individuos) con las predicciones de 1 o 0
+    '''
+    if isinstance(data_temp,dict):
+        longitudes=None
+    elif not isinstance(data_temp,np.ndarray) or data_temp.ndim!=3:
+        data_temp,longitudes=datos_a_tensor(data_temp)
+    individuos=cantidad_individuos(data_temp)
+    data_const=np.asarray(data_const).reshape(individuos,-1)
+    if tamano_bloque is None:
+        if cache_lstm is None:
+            tamano_bloque=tamano_bloque_red(*pesos_lstm.shape[:2])
+        else:
+            tamano_bloque=TAMANO_BLOQUE_EMPAQUETADO
+    resultado=np.empty((pesos_lstm.shape[0],individuos),dtype=int)
+    for inicio in range(0,individuos,tamano_bloque):
+        fin=inicio+tamano_bloque
+        if cache_lstm is None:
+            bloque,long_bloque=bloque_datos(data_temp,longitudes,inicio,fin)
+            pred=red_lstm_poblacion(bloque,pesos_lstm,long_bloque)
+        else:
+            pred=cache_lstm.salidas(data_temp,pesos_lstm,longitudes,inicio,fin)
+        resultado[:,inicio:fin]=red_categorica_poblacion(pred,data_const[inicio:fin],
+                                                         pesos_const)
+    return resultado
@@ -0,0 +1,229 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import queue
+import numpy as np
+from algoritmo_gen import optimizar_gen
+from fitness_paralelo import compartir_datos, abrir_datos, liberar_bloques
+
+TOPOLOGIAS=("anillo","completa")
+# argumentos de optimizar_gen que no se pueden usar en las islas
+OPCIONES_NO_ADMITIDAS=("observadores","evaluador","trabajadores","ruta_checkpoint",
+                       "resume_from","migracion")
+
+def destinos_migracion(isla:int,islas:int,topologia:str)->list:
+    '''
+    Función encargada de indicar a que islas envia sus mejores genes una isla
+    ---------------------------------
+    isla: número de la isla que envia
+    islas: cantidad total de islas
+    topologia: "anillo" (solo a la siguiente isla) o "completa" (a todas las demás)
+    ---------------------------------
+    RETURN
+    destinos: lista con los números de las islas que reciben
+    '''
+    if topologia not in TOPOLOGIAS:
+        raise ValueError(f"Topología desconocida {topologia}, opciones: {TOPOLOGIAS}")
+    if islas==1:
+        return []
+    if topologia=="anillo":
+        return [(isla+1)%islas]
+    return [i for i in range(islas) if i!=isla]
+
+def _recibir_migrantes(cola)->tuple:
+    '''
+    Saca de la cola de una isla todos los genes que han llegado sin esperar
+    '''
+    genes=[]
+    fitness=[]
+    while True:
+        try:
+            gen,valor=cola.get_nowait()
+        except queue.Empty:
+            break
+        genes.append(gen)
+        fitness.append(valor)
+    if not genes:
+        return None, None
+    return np.concatenate(genes), np.concatenate(fitness)
+
+class Migracion:
+    '''
+    Clase encargada de conectar una isla con las demás dentro de optimizar_gen (ver el
+    argumento migracion): cada migracion_cada generaciones envia sus mejores genes a las
+    islas destino y reemplaza a sus peores genes por los que le han llegado, y en cada
+    generación actualiza el mejor valor global para la parada temprana de todas las islas
+    ---------------------------------
+    isla: número de la isla
+    destinos: islas que reciben sus genes (ver destinos_migracion)
+    colas: lista con la cola de entrada de cada isla
+    migracion_cada: cada cuantas generaciones se envian genes, 0 para no migrar
+    migrantes: cantidad de mejores genes que se envian
+    compartido: diccionario compartido con mejor, generacion (la de la isla más
+    avanzada) y generacion_mejora
+    candado: candado que protege compartido
+    detener: evento que detiene todas las islas
+    tol: indica cuanto debe mejorar el valor global para contar como mejora
+    max_intentos: generaciones sin mejorar el valor global antes de detener las islas
+    '''
+    def __init__(self,isla:int,destinos:list,colas:list,migracion_cada:int,migrantes:int,
+                 compartido,candado,detener,tol:float,max_intentos:int):
+        self.isla=isla
+        self.destinos=destinos
+        self.colas=colas
+        self.migracion_cada=migracion_cada
+        self.migrantes=migrantes
+        self.compartido=compartido
+        self.candado=candado
+        self.detener=detener
+        self.tol=tol
+        self.max_intentos=max_intentos
+
+    def intercambiar(self,generacion:int,poblacion:np.ndarray,fitness:np.ndarray,
+                     completos:np.ndarray)->tuple:
+        '''
+        Función encargada de enviar y recibir genes si corresponde a la generación, solo
+        se envian genes evaluados con todos los individuos
+        ---------------------------------
+        generacion: número de la generación recién evaluada (desde 1)
+        poblacion: array 2d con los genes (sus valores, no codificados)
+        fitness: array con el fitness de cada gen
+        completos: array booleano con los genes evaluados con todos los individuos
+        ---------------------------------
+        RETURN
+        peores: posiciones de la población que se reemplazan
+        genes: array 2d con los genes que llegaron, uno por posición de peores
+        valores: array con el fitness de esos genes
+        '''
+        if not self.migracion_cada or generacion%self.migracion_cada:
+            return np.empty(0,dtype=np.int64), None, None
+        candidatos=np.flatnonzero(completos)
+        mejores=candidatos[np.argsort(fitness[candidatos],kind="stable")[::-1]]
+        mejores=mejores[:self.migrantes]
+        for destino in self.destinos:
+            self.colas[destino].put((np.asarray(poblacion[mejores],dtype=float),
+                                     fitness[mejores]))
+        genes,valores=_recibir_migrantes(self.colas[self.isla])
+        if genes is None:
+            return np.empty(0,dtype=np.int64), None, None
+        peores=np.argsort(fitness,kind="stable")[:len(genes)]
+        return peores, genes[:len(peores)], valores[:len(peores)]
+
+    def actualizar(self,generacion:int,mejor:float):
+        '''
+        Función encargada de sumar el mejor valor de la generación al valor global. Las
+        islas no van sincronizadas, la generación global es la de la isla más avanzada y
+        con ella se miden las mejoras de todas
+        ---------------------------------
+        generacion: número de la generación recién evaluada (desde 1)
+        mejor: mejor fitness de la generación en esta isla
+        '''
+        with self.candado:
+            generacion=max(self.compartido["generacion"],generacion)
+            self.compartido["generacion"]=generacion
+            if mejor-self.compartido["mejor"]>=self.tol:
+                self.compartido["mejor"]=float(mejor)
+                self.compartido["generacion_mejora"]=generacion
+            elif generacion-self.compartido["generacion_mejora"]>=self.max_intentos:
+                self.detener.set()
+
+    def detenida(self)->bool:
+        '''
+        RETURN
+        detenida: True si alguna isla alcanzó la parada temprana global
+        '''
+        return self.detener.is_set()
+
+def _isla(descriptores:dict,genetic_pool,var_redes,var_const,tamano_poblacion,prob,
+          generaciones,tol,semilla,migracion,opciones)->tuple:
+    '''
+    Tarea de cada proceso, abre los datos compartidos y ejecuta optimizar_gen con la
+    migración de la isla
+    '''
+    datos,bloques=abrir_datos(descriptores)
+    # la parada temprana es solo la global de migracion, la local nunca se alcanza
+    resultado=optimizar_gen(genetic_pool,var_redes,var_const,tamano_poblacion,
+                            datos["data_red"],datos["data_const"],datos["verdadero"],
+                            prob,generaciones,tol,generaciones+1,semilla=semilla,
+                            observadores=[],migracion=migracion,**opciones)
+    # los arrays deben dejar de usarse antes de cerrar la memoria compartida
+    del datos
+    liberar_bloques(bloques,crear=False)
+    return resultado
+
+def optimizar_islas(genetic_pool:'list | np.ndarray',var_redes:int, var_const:int,
+                    tamano_poblacion:int,data_red:'list | np.ndarray | dict',
+                    data_const:np.ndarray,verdadero:np.ndarray,prob:float,
+                    generaciones:int, tol:float, max_intentos:int,
+                    islas:'int | None'=None, migracion_cada:int=5, migrantes:int=2,
+                    topologia:str="anillo",
+                    semilla:'int | None'=None, **opciones):
+    '''
+    Función para encontrar la mejor configuración de la red con el modelo de islas: varias
+    poblaciones, cada una en su propio proceso, evolucionan de forma independiente y cada
+    migracion_cada generaciones envian sus mejores genes a otras islas, donde reemplazan
+    a los peores. La parada temprana es global: todas las islas se detienen cuando el
+    mejor valor de todas ellas no mejora en tol durante max_intentos generaciones,
+    contadas con la generación de la isla más avanzada.
+    Cada isla ejecuta optimizar_gen (ver su argumento migracion) con las opciones
+    entregadas. Los datos se comparten como en fitness_paralelo.EvaluadorParalelo: se
+    copian una sola vez a memoria compartida (los diccionarios empaquetados sin rellenar
+    con ceros) y los arrays abiertos con np.memmap se abren desde su archivo en cada isla
+    --------------------------------------------------------------
+    genetic_pool: lista o array de la cual se sacaran valores que seran parte del gen de
+    los individuos de la poblacion
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las
+    estimadas en la red LSTM
+    tamano_poblacion: cantidad de individuos de la población de cada isla
+    data_red: array de numpy, list, diccionario empaquetado o ruta de un conjunto de
+    datos escrito con dataset_mmap.escribir_dataset (ver compartir_datos)
+    data_const: array con información de un individuo y las variables asociadas a este para
+    la predicción binaria
+    verdadero: array con los valores verdaderos (categorias 1 ó 0)
+    prob: probabilidad de que se realice una mutación
+    generaciones: número máximo de generaciones de cada isla
+    tol: indica cuanto debe mejorar el valor optimo global para seguir probando
+    max_intentos: maximo de generaciones sin mejorar el valor global antes de parar
+    islas: cantidad de islas (procesos), si es None se usa la cantidad de CPUs
+    migracion_cada: cada cuantas generaciones se envian genes a otras islas, 0 para no
+    migrar
+    migrantes: cantidad de mejores genes que envia cada isla
+    topologia: "anillo" (cada isla envia a la siguiente) o "completa" (a todas)
+    semilla: semilla de la que se derivan las semillas de cada isla
+    opciones: otros argumentos de optimizar_gen para todas las islas (por ejemplo
+    metrica, elite, seleccion, codificar, cache o escalonado), deben poder enviarse a los
+    procesos y cada isla usa su propia copia. No se admiten observadores, evaluador,
+    trabajadores ni checkpoints
+    ---------------------------------------------------------------------------------
+    RETURN
+    valor_opt: float, valor máximo alcanzado entre todas las islas
+    param_opt: array con la configuración optima de genes
+    '''
+    no_admitidas=[nombre for nombre in OPCIONES_NO_ADMITIDAS if nombre in opciones]
+    if no_admitidas:
+        raise ValueError(f"optimizar_islas no admite las opciones {no_admitidas}")
+    islas=islas or os.cpu_count() or 1
+    destinos=[destinos_migracion(i,islas,topologia) for i in range(islas)]
+    semillas=np.random.SeedSequence(semilla).spawn(islas)
+    descriptores,bloques=compartir_datos(data_red,data_const,verdadero)
+    try:
+        with multiprocessing.Manager() as manager, \
+                ProcessPoolExecutor(max_workers=islas) as pool:
+            colas=[manager.Queue() for i in range(islas)]
+            compartido=manager.dict(mejor=0.0,generacion=0,generacion_mejora=0)
+            candado=manager.Lock()
+            detener=manager.Event()
+            futuros=[pool.submit(_isla,descriptores,genetic_pool,var_redes,var_const,
+                                 tamano_poblacion,prob,generaciones,tol,semillas[i],
+                                 Migracion(i,destinos[i],colas,migracion_cada,migrantes,
+                                           compartido,candado,detener,tol,max_intentos),
+                                 opciones)
+                     for i in range(islas)]
+            resultados=[futuro.result() for futuro in futuros]
+            if detener.is_set():
+                print("CRITERIO DE PARADA TEMPRANA ALCANZADO")
+    finally:
+        liberar_bloques(bloques)
+    valor_opt,param_opt=max(resultados,key=lambda resultado:resultado[0])
+    return valor_opt,param_opt
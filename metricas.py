@@ -0,0 +1,125 @@
+import numpy as np
+
+def conteos_poblacion(predicciones:np.ndarray,verdadero:np.ndarray)->tuple:
+    '''
+    Función encargada de calcular para todos los genes a la vez los verdaderos
+    positivos, falsos positivos y falsos negativos de cada categoria
+    ---------------------------------
+    predicciones: array de forma (población, individuos) con las predicciones de cada gen
+    verdadero: array con los valores verdaderos de cada individuo
+    ---------------------------------
+    RETURN
+    tp: array (población, categorias) con los verdaderos positivos
+    fp: array (población, categorias) con los falsos positivos
+    fn: array (población, categorias) con los falsos negativos
+    presentes: array booleano (población, categorias) con las categorias que aparecen
+    en verdadero o en las predicciones del gen, igual que las etiquetas que usa sklearn
+    '''
+    predicciones=np.atleast_2d(predicciones)
+    verdadero=np.asarray(verdadero)
+    etiquetas=np.union1d(np.unique(verdadero),np.unique(predicciones))
+    forma=(predicciones.shape[0],len(etiquetas))
+    tp=np.empty(forma,dtype=np.int64)
+    predichos=np.empty(forma,dtype=np.int64)
+    soporte=np.empty(len(etiquetas),dtype=np.int64)
+    for k,etiqueta in enumerate(etiquetas):
+        es_pred=predicciones==etiqueta
+        es_verdad=verdadero==etiqueta
+        tp[:,k]=(es_pred&es_verdad[None,:]).sum(axis=1)
+        predichos[:,k]=es_pred.sum(axis=1)
+        soporte[k]=es_verdad.sum()
+    fp=predichos-tp
+    fn=soporte[None,:]-tp
+    presentes=(predichos>0)|(soporte[None,:]>0)
+    return tp, fp, fn, presentes
+
+def _f1_categorias(tp:np.ndarray,fp:np.ndarray,fn:np.ndarray)->np.ndarray:
+    '''
+    F1 de cada categoria, 0 cuando no está definido (división por cero)
+    '''
+    denominador=2*tp+fp+fn
+    with np.errstate(divide='ignore',invalid='ignore'):
+        return np.where(denominador>0,2*tp/denominador,0.0)
+
+def f1_macro_poblacion(predicciones:np.ndarray,verdadero:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular el f1 macro de todos los genes en una sola pasada,
+    igual a sklearn.metrics.f1_score(average='macro') con zero_division por defecto
+    ---------------------------------
+    predicciones: array de forma (población, individuos) con las predicciones de cada gen
+    verdadero: array con los valores verdaderos de cada individuo
+    ---------------------------------
+    RETURN
+    fitness: array con el f1 macro de cada gen
+    '''
+    tp,fp,fn,presentes=conteos_poblacion(predicciones,verdadero)
+    f1=_f1_categorias(tp,fp,fn)
+    return (f1*presentes).sum(axis=1)/presentes.sum(axis=1)
+
+def f1_ponderado_poblacion(predicciones:np.ndarray,verdadero:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular el f1 ponderado por el soporte de cada categoria para
+    todos los genes, igual a sklearn.metrics.f1_score(average='weighted')
+    ---------------------------------
+    predicciones: array de forma (población, individuos) con las predicciones de cada gen
+    verdadero: array con los valores verdaderos de cada individuo
+    ---------------------------------
+    RETURN
+    fitness: array con el f1 ponderado de cada gen
+    '''
+    tp,fp,fn,presentes=conteos_poblacion(predicciones,verdadero)
+    soporte=tp+fn
+    f1=_f1_categorias(tp,fp,fn)
+    return (f1*soporte).sum(axis=1)/soporte.sum(axis=1)
+
+def exactitud_poblacion(predicciones:np.ndarray,verdadero:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular la exactitud (accuracy) de todos los genes
+    ---------------------------------
+    predicciones: array de forma (población, individuos) con las predicciones de cada gen
+    verdadero: array con los valores verdaderos de cada individuo
+    ---------------------------------
+    RETURN
+    fitness: array con la proporción de aciertos de cada gen
+    '''
+    predicciones=np.atleast_2d(predicciones)
+    return (predicciones==np.asarray(verdadero)[None,:]).mean(axis=1)
+
+def exactitud_balanceada_poblacion(predicciones:np.ndarray,
+                                   verdadero:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de calcular la exactitud balanceada de todos los genes, es decir
+    el promedio del recall de las categorias que aparecen en verdadero, igual a
+    sklearn.metrics.balanced_accuracy_score
+    ---------------------------------
+    predicciones: array de forma (población, individuos) con las predicciones de cada gen
+    verdadero: array con los valores verdaderos de cada individuo
+    ---------------------------------
+    RETURN
+    fitness: array con la exactitud balanceada de cada gen
+    '''
+    tp,fp,fn,presentes=conteos_poblacion(predicciones,verdadero)
+    soporte=tp+fn
+    con_soporte=soporte[0]>0
+    return (tp[:,con_soporte]/soporte[:,con_soporte]).mean(axis=1)
+
+METRICAS={"f1_macro":f1_macro_poblacion,
+          "f1_ponderado":f1_ponderado_poblacion,
+          "exactitud":exactitud_poblacion,
+          "exactitud_balanceada":exactitud_balanceada_poblacion}
+
+def obtener_metrica(metrica:'str | callable')->callable:
+    '''
+    Función encargada de obtener la función de una métrica por su nombre
+    ---------------------------------
+    metrica: nombre de una métrica de METRICAS o función que recibe (predicciones,
+    verdadero) y regresa un array con el valor de cada gen
+    ---------------------------------
+    RETURN
+    funcion: función vectorizada de la métrica
+    '''
+    if callable(metrica):
+        return metrica
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida {metrica}, opciones: {list(METRICAS)}")
+    return METRICAS[metrica]
@@ -0,0 +1,87 @@
+import json
+import numpy as np
+
+def _a_json(valor):
+    '''
+    Convierte los tipos de numpy del registro a tipos de python para json.dumps
+    '''
+    if isinstance(valor,np.generic):
+        return valor.item()
+    if isinstance(valor,np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"{type(valor)} no se puede escribir como JSON")
+
+class HistorialMemoria:
+    '''
+    Observador que guarda en una lista el registro de cada generación de optimizar_gen
+    '''
+    def __init__(self):
+        self.registros=[]
+
+    def __call__(self,registro:dict):
+        self.registros.append(registro)
+
+    def columna(self,llave:str)->np.ndarray:
+        '''
+        Función encargada de obtener un campo de todos los registros guardados
+        ---------------------------------
+        llave: nombre del campo, por ejemplo "mejor" o "segundos_fitness"
+        ---------------------------------
+        RETURN
+        valores: array con el valor del campo en cada generación
+        '''
+        return np.array([registro.get(llave) for registro in self.registros])
+
+    def __len__(self):
+        return len(self.registros)
+
+class RegistroJSONL:
+    '''
+    Observador que escribe el registro de cada generación como una línea JSON en un
+    archivo, el archivo se cierra al terminar optimizar_gen
+    ---------------------------------
+    ruta: archivo donde se escriben los registros
+    modo: "a" para agregar al final del archivo (por ejemplo al continuar desde un
+    checkpoint) o "w" para reemplazarlo
+    '''
+    def __init__(self,ruta:str,modo:str="a"):
+        self.ruta=ruta
+        self._archivo=open(ruta,modo)
+
+    def __call__(self,registro:dict):
+        self._archivo.write(json.dumps(registro,default=_a_json)+"\n")
+        self._archivo.flush()
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+
+class ImpresionProgreso:
+    '''
+    Observador que imprime un resumen de cada generación
+    '''
+    def __call__(self,registro:dict):
+        print(f"Generación {registro['generacion']} de {registro['generaciones']}: "
+              f"mejor {registro['mejor']:.4f}, media {registro['media']:.4f}, "
+              f"diversidad {registro['diversidad']:.2f}, "
+              f"{registro['evaluaciones_por_segundo']:.0f} evaluaciones/seg, "
+              f"{registro['segundos_total']:.3f} seg")
+
+def notificar(observadores:list,registro:dict):
+    '''
+    Función encargada de entregar el registro de una generación a cada observador
+    ---------------------------------
+    observadores: lista de funciones u objetos invocables que reciben el registro
+    registro: diccionario con la información de la generación
+    '''
+    for observador in observadores:
+        observador(registro)
+
+def cerrar_observadores(observadores:list):
+    '''
+    Función encargada de cerrar los observadores que tienen método cerrar
+    '''
+    for observador in observadores:
+        cerrar=getattr(observador,"cerrar",None)
+        if cerrar is not None:
+            cerrar()
@@ -0,0 +1,234 @@
+import hashlib
+import time
+import numpy as np
+from algoritmo_gen import genes_a_pesos
+from funciones_redes import (red_completa_poblacion, red_lstm_memorias,
+                             red_categorica_poblacion, TAMANO_BLOQUE_EMPAQUETADO)
+from tensores import datos_a_tensor, bloque_datos, cantidad_individuos
+
+def _leer_por_partes(ruta:str,tamano_chunk:int,columnas:'list | None'=None):
+    '''
+    Lee un archivo CSV o Parquet por partes de tamano_chunk filas como DataFrames
+    '''
+    import pandas as pd
+    if ruta.endswith(".parquet") or ruta.endswith(".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Para leer archivos Parquet se necesita pyarrow") from error
+        archivo=pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=tamano_chunk,columns=columnas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta,chunksize=tamano_chunk,usecols=columnas)
+
+class Predictor:
+    '''
+    Clase encargada de hacer predicciones con un gen ya entrenado (por ejemplo param_opt
+    de optimizar_gen). Los pesos se separan una sola vez en arrays, sin diccionarios, y
+    las predicciones usan las funciones vectorizadas de redes
+    ---------------------------------
+    param_opt: array con los pesos y bias del gen
+    var_redes: cantidad de variables que se estiman en la red LSTM
+    var_const: cantidad de variables que se usan en la red categorica sin incluir las
+    estimadas en la red LSTM
+    '''
+    def __init__(self,param_opt:'list | np.ndarray',var_redes:int,var_const:int):
+        self.var_redes=var_redes
+        self.var_const=var_const
+        gen=np.asarray(param_opt,dtype=float)[None,:]
+        pesos_lstm,pesos_const=genes_a_pesos(gen,var_redes,var_const)
+        self.pesos_lstm=np.ascontiguousarray(pesos_lstm)
+        self.pesos_const=np.ascontiguousarray(pesos_const)
+        # identifica al modelo en AlmacenMemorias, cambia si cambia cualquier peso
+        huella=hashlib.blake2b(gen.tobytes(),digest_size=8)
+        huella.update(f"{var_redes},{var_const}".encode())
+        self.version=huella.hexdigest()
+
+    @classmethod
+    def desde_diccionarios(cls,pesos_lstm:dict,pesos_const:dict)->'Predictor':
+        '''
+        Función encargada de crear el predictor a partir de los diccionarios de pesos que
+        usa red_completa (ver gen_a_diccionario)
+        ---------------------------------
+        pesos_lstm: diccionario con los pesos y bias de cada variable de la red LSTM
+        pesos_const: diccionario con pesos de la red categorica, el último es el bias
+        ---------------------------------
+        RETURN
+        predictor: Predictor con esos pesos
+        '''
+        gen=[peso for pesos in pesos_lstm.values() for peso in pesos.values()]
+        gen+=list(pesos_const.values())
+        var_redes=len(pesos_lstm)
+        return cls(gen,var_redes,len(pesos_const)-var_redes-1)
+
+    def predict(self,data_temp:'list | np.ndarray | dict',data_const:np.ndarray,
+                longitudes:'np.ndarray | None'=None,
+                tamano_bloque:'int | None'=None)->np.ndarray:
+        '''
+        Función encargada de predecir la etiqueta de varios individuos
+        ---------------------------------
+        data_temp: array 3d, list o diccionario empaquetado (por ejemplo abierto con
+        dataset_mmap.abrir_dataset, que se lee por bloques) con la información de cada
+        individuo para la red LSTM
+        data_const: array con información constante de cada individuo
+        longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+        data_temp es un tensor rellenado con ceros
+        tamano_bloque: cantidad de individuos procesados a la vez
+        ---------------------------------
+        RETURN
+        resultado: array con la predicción de 1 o 0 de cada individuo
+        '''
+        return red_completa_poblacion(data_temp,data_const,self.pesos_lstm,
+                                      self.pesos_const,longitudes,tamano_bloque)[0]
+
+    def update(self,data_nuevos:'list | np.ndarray | dict',data_const:np.ndarray,
+               almacen,pasos_previos:'int | np.ndarray',
+               identificadores:'list | np.ndarray | None'=None,
+               longitudes:'np.ndarray | None'=None,
+               tamano_bloque:'int | None'=None)->np.ndarray:
+        '''
+        Función encargada de actualizar la predicción de varios individuos con solo sus
+        observaciones nuevas: la red LSTM parte de las memorias guardadas en almacen para
+        esta versión del modelo y avanza solo los pasos nuevos, luego se guardan las
+        memorias finales. Los individuos que no están en almacen parten de memorias en 0,
+        por lo que para ellos data_nuevos debe tener toda su historia. El costo depende
+        de la cantidad de pasos nuevos y no del largo de la historia (más la reescritura
+        del almacén, ver AlmacenMemorias).
+        Con pasos_previos se comparan las observaciones entregadas con las ya guardadas:
+        las que ya se aplicaron (ej. repetir la actualización de un mes) se saltan, y si
+        faltan observaciones entre las guardadas y las nuevas se levanta ValueError
+        ---------------------------------
+        data_nuevos: array 3d, list o diccionario empaquetado con las observaciones
+        nuevas de cada individuo (pueden tener distinta cantidad, incluso 0)
+        data_const: array con información constante de cada individuo
+        almacen: AlmacenMemorias (ver almacen_memorias) donde se leen y guardan las
+        memorias
+        pasos_previos: cantidad de observaciones de la historia de cada individuo
+        anteriores a su primera observación en data_nuevos (0 si se entrega toda la
+        historia), un número para todos o un array
+        identificadores: identificadores de los individuos, si es None se usan los del
+        diccionario empaquetado
+        longitudes: array con la cantidad de observaciones nuevas de cada individuo cuando
+        data_nuevos es un tensor rellenado con ceros
+        tamano_bloque: cantidad de individuos procesados a la vez
+        ---------------------------------
+        RETURN
+        resultado: array con la predicción de 1 o 0 de cada individuo
+        '''
+        if identificadores is None:
+            if not isinstance(data_nuevos,dict):
+                raise ValueError("Se necesitan los identificadores de los individuos")
+            identificadores=data_nuevos["identificadores"]
+        if not isinstance(data_nuevos,(dict,np.ndarray)) or (
+                isinstance(data_nuevos,np.ndarray) and data_nuevos.ndim!=3):
+            data_nuevos,longitudes=datos_a_tensor(data_nuevos)
+        individuos=cantidad_individuos(data_nuevos)
+        if longitudes is None and not isinstance(data_nuevos,dict):
+            longitudes=np.full(individuos,data_nuevos.shape[1])
+        identificadores=np.asarray(identificadores)
+        if len(identificadores)!=individuos:
+            raise ValueError("Se necesita un identificador por individuo")
+        data_const=np.asarray(data_const).reshape(individuos,-1)
+        short_memory,long_memory,pasos,_=almacen.leer(self.version,identificadores,
+                                                     self.var_redes)
+        pasos_previos=np.broadcast_to(np.asarray(pasos_previos,dtype=np.int64),
+                                      (individuos,))
+        huecos=pasos_previos>pasos
+        if huecos.any():
+            raise ValueError(f"Faltan observaciones entre las guardadas y las nuevas de "
+                             f"{huecos.sum()} individuos, por ejemplo "
+                             f"{identificadores[huecos][:5].tolist()}")
+        # observaciones nuevas que ya se aplicaron en una actualización anterior
+        saltar=pasos-pasos_previos
+        if tamano_bloque is None:
+            tamano_bloque=TAMANO_BLOQUE_EMPAQUETADO
+        resultado=np.empty(individuos,dtype=int)
+        for inicio in range(0,individuos,tamano_bloque):
+            fin=inicio+tamano_bloque
+            bloque,long_bloque=bloque_datos(data_nuevos,longitudes,inicio,fin)
+            corto,largo=red_lstm_memorias(bloque,self.pesos_lstm,long_bloque,
+                                          short_memory[None,inicio:fin],
+                                          long_memory[None,inicio:fin],
+                                          saltar[inicio:fin])
+            short_memory[inicio:fin]=corto[0]
+            long_memory[inicio:fin]=largo[0]
+            pasos[inicio:fin]=np.maximum(pasos[inicio:fin],
+                                         pasos_previos[inicio:fin]+long_bloque)
+            resultado[inicio:fin]=red_categorica_poblacion(corto,data_const[inicio:fin],
+                                                           self.pesos_const)[0]
+        almacen.escribir(self.version,identificadores,short_memory,long_memory,pasos,
+                         {"var_redes":self.var_redes,"var_const":self.var_const})
+        return resultado
+
+    def predict_stream(self,ruta_temp:str,salida:str,identificador:str,
+                       excluir_temp:list,columnas_const:'list | None'=None,
+                       data_const=None,excluir_const:'list | None'=None,
+                       tamano_chunk:int=100000)->dict:
+        '''
+        Función encargada de predecir por partes los individuos de un archivo CSV o
+        Parquet y escribir las predicciones en un CSV a medida que se calculan, de forma
+        que la memoria usada depende de tamano_chunk y no del tamaño del archivo.
+        Las filas de cada individuo deben estar seguidas en el archivo (por ejemplo
+        ordenado por identificador y fecha); las filas de un individuo que queda cortado
+        al final de una parte se pasan a la siguiente
+        ---------------------------------
+        ruta_temp: archivo CSV o Parquet con la información temporal de los individuos
+        salida: archivo CSV donde se escriben el identificador y la predicción
+        identificador: nombre de la columna que identifica a cada individuo
+        excluir_temp: columnas del archivo que no se usan en la red LSTM, incluyendo el
+        identificador y las columnas_const
+        columnas_const: columnas del mismo archivo con la información constante, se toma
+        la última fila de cada individuo
+        data_const: DataFrame con una fila por individuo con la información constante,
+        se usa si columnas_const es None
+        excluir_const: columnas de data_const que no se usan en la red categorica
+        tamano_chunk: cantidad de filas leídas por parte
+        ---------------------------------
+        RETURN
+        resumen: diccionario con filas, individuos, segundos y filas_por_segundo
+        '''
+        import pandas as pd
+        from funciones_data import empaquetar_info_redes, array_const
+        if columnas_const is None and data_const is None:
+            raise ValueError("Se necesita columnas_const o data_const")
+        inicio=time.perf_counter()
+        resumen={"filas":0,"individuos":0}
+        primero=True
+        def procesar(parte):
+            nonlocal primero
+            orden=pd.unique(parte[identificador])
+            empaquetado=empaquetar_info_redes(parte,excluir_temp,identificador,
+                                              orden=orden)
+            if columnas_const is not None:
+                const=parte.groupby(identificador,sort=False)[columnas_const].last()
+                const=const.loc[orden].to_numpy(dtype=float)
+            else:
+                const=array_const(data_const,excluir_const or [identificador],
+                                  identificador,orden)
+            prediccion=self.predict(empaquetado,const)
+            pd.DataFrame({identificador:orden,"prediccion":prediccion}).to_csv(
+                salida,mode="w" if primero else "a",header=primero,index=False)
+            primero=False
+            resumen["filas"]+=len(parte)
+            resumen["individuos"]+=len(orden)
+        resto=None
+        for parte in _leer_por_partes(ruta_temp,tamano_chunk):
+            if len(parte)==0:
+                continue
+            if resto is not None:
+                parte=pd.concat([resto,parte],ignore_index=True)
+            ultimo=parte[identificador].iloc[-1]
+            es_ultimo=(parte[identificador]==ultimo).to_numpy()
+            resto=parte[es_ultimo]
+            if not es_ultimo.all():
+                procesar(parte[~es_ultimo])
+        if resto is not None and len(resto):
+            procesar(resto)
+        if primero:
+            pd.DataFrame({identificador:[],"prediccion":[]}).to_csv(salida,index=False)
+        resumen["segundos"]=time.perf_counter()-inicio
+        resumen["filas_por_segundo"]=resumen["filas"]/max(resumen["segundos"],1e-12)
+        print(f"{resumen['filas']} filas, {resumen['individuos']} individuos, "
+              f"{resumen['filas_por_segundo']:.0f} filas/seg")
+        return resumen
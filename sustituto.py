@@ -0,0 +1,190 @@
+import numpy as np
+
+def caracteristicas(poblacion:np.ndarray)->np.ndarray:
+    '''
+    Función encargada de generar las características del modelo sustituto de cada gen:
+    una constante, los pesos y los pesos al cuadrado
+    ---------------------------------
+    poblacion: array 2d con los genes
+    ---------------------------------
+    RETURN
+    phi: array 2d de forma (genes, 1 + 2*largo del gen)
+    '''
+    poblacion=np.asarray(poblacion,dtype=float)
+    return np.hstack([np.ones((len(poblacion),1)),poblacion,poblacion**2])
+
+class ModeloSustituto:
+    '''
+    Clase encargada de estimar el fitness de los genes sin pasar por la red, con una
+    regresión lineal bayesiana sobre los pesos y sus cuadrados que se entrena en línea
+    con los genes que sí se evaluan. En cada generación solo se evaluan de verdad la
+    fracción de genes con mejor fitness estimado y los de mayor incertidumbre, el resto
+    queda con el valor estimado. Cada revalidar_cada generaciones se evalua toda la
+    población para medir el error del modelo y corregirlo
+    ---------------------------------
+    fraccion: fracción de genes con mejor fitness estimado que se evaluan
+    fraccion_incierta: fracción de genes, entre los restantes, con mayor desviación
+    estimada que se evaluan
+    revalidar_cada: cada cuantas generaciones se evalua toda la población
+    minimo_entrenamiento: cantidad de genes evaluados antes de empezar a estimar, si es
+    None se usa la cantidad de características
+    regularizacion: peso de la penalización ridge de la regresión
+    olvido: factor por el que se multiplican los datos de entrenamiento anteriores en cada
+    generación, menor a 1 da más peso a las generaciones recientes
+    '''
+    def __init__(self,fraccion:float=0.3,fraccion_incierta:float=0.1,
+                 revalidar_cada:int=5,minimo_entrenamiento:'int | None'=None,
+                 regularizacion:float=1.0,olvido:float=0.9):
+        if not 0<fraccion<=1 or not 0<=fraccion_incierta<=1:
+            raise ValueError("Las fracciones deben estar entre 0 y 1")
+        self.fraccion=fraccion
+        self.fraccion_incierta=fraccion_incierta
+        self.revalidar_cada=revalidar_cada
+        self.minimo_entrenamiento=minimo_entrenamiento
+        self.regularizacion=regularizacion
+        self.olvido=olvido
+        self.generacion=0
+        self.entrenados=0
+        self.evaluaciones_reales=0
+        self.evaluaciones_evitadas=0
+        self.errores_revalidacion=[]
+        self._xtx=None
+        self._xty=None
+        self._yty=0.0
+        self._peso=0.0
+
+    def entrenado(self)->bool:
+        '''
+        RETURN
+        entrenado: True si el modelo ya tiene suficientes genes para estimar
+        '''
+        if self._xtx is None:
+            return False
+        minimo=self.minimo_entrenamiento
+        if minimo is None:
+            minimo=len(self._xtx)
+        return self.entrenados>=minimo
+
+    def agregar(self,poblacion:np.ndarray,fitness:np.ndarray):
+        '''
+        Función encargada de agregar genes evaluados a los datos de entrenamiento
+        ---------------------------------
+        poblacion: array 2d con los genes evaluados
+        fitness: array con el fitness real de cada gen
+        '''
+        phi=caracteristicas(poblacion)
+        if self._xtx is None:
+            self._xtx=np.zeros((phi.shape[1],phi.shape[1]))
+            self._xty=np.zeros(phi.shape[1])
+        self._xtx+=phi.T@phi
+        self._xty+=phi.T@fitness
+        self._yty+=float(fitness@fitness)
+        self._peso+=len(fitness)
+        self.entrenados+=len(fitness)
+
+    def predecir(self,poblacion:np.ndarray)->tuple:
+        '''
+        Función encargada de estimar el fitness de los genes
+        ---------------------------------
+        poblacion: array 2d con los genes
+        ---------------------------------
+        RETURN
+        media: array con el fitness estimado de cada gen
+        desviacion: array con la desviación estándar de la estimación
+        '''
+        phi=caracteristicas(poblacion)
+        matriz=self._xtx+self.regularizacion*np.eye(len(self._xtx))
+        coeficientes=np.linalg.solve(matriz,self._xty)
+        # varianza del ruido con los residuos de los datos de entrenamiento
+        residuo=self._yty-2*coeficientes@self._xty+coeficientes@self._xtx@coeficientes
+        ruido=max(residuo,0.0)/max(self._peso,1.0)
+        varianza=ruido*(1+np.einsum("ij,ji->i",phi,np.linalg.solve(matriz,phi.T)))
+        return phi@coeficientes, np.sqrt(np.maximum(varianza,0.0))
+
+    def evaluar(self,poblacion:np.ndarray,funcion:callable)->tuple:
+        '''
+        Función encargada de obtener el fitness de una población evaluando de verdad
+        solo los genes elegidos con el modelo
+        ---------------------------------
+        poblacion: array 2d con los genes
+        funcion: función que recibe un array 2d de genes y regresa su fitness real
+        ---------------------------------
+        RETURN
+        fitness: array con el fitness real o estimado (no negativo) de cada gen
+        completos: array booleano con los genes evaluados de verdad
+        '''
+        self.generacion+=1
+        if self._xtx is not None:
+            self._xtx*=self.olvido
+            self._xty*=self.olvido
+            self._yty*=self.olvido
+            self._peso*=self.olvido
+        completos=np.ones(len(poblacion),dtype=bool)
+        if not self.entrenado():
+            fitness=funcion(poblacion)
+        elif self.revalidar_cada and self.generacion%self.revalidar_cada==0:
+            estimado,_=self.predecir(poblacion)
+            fitness=funcion(poblacion)
+            self.errores_revalidacion.append(float(np.abs(estimado-fitness).mean()))
+        else:
+            estimado,desviacion=self.predecir(poblacion)
+            cantidad=len(poblacion)
+            orden=np.argsort(estimado,kind="stable")[::-1]
+            mejores=orden[:int(np.ceil(self.fraccion*cantidad))]
+            restantes=orden[len(mejores):]
+            inciertos=restantes[np.argsort(desviacion[restantes],kind="stable")[::-1]]
+            inciertos=inciertos[:int(np.ceil(self.fraccion_incierta*cantidad))]
+            completos[:]=False
+            completos[mejores]=True
+            completos[inciertos]=True
+            fitness=np.maximum(estimado,0.0)
+            fitness[completos]=funcion(poblacion[completos])
+            self.evaluaciones_evitadas+=int((~completos).sum())
+        self.evaluaciones_reales+=int(completos.sum())
+        self.agregar(poblacion[completos],fitness[completos])
+        return fitness, completos
+
+    def estado(self)->dict:
+        '''
+        Función encargada de exportar los datos de entrenamiento y los contadores del
+        modelo, para guardarlos en un checkpoint
+        ---------------------------------
+        RETURN
+        estado: diccionario con los contadores, los errores de revalidación y las sumas
+        de la regresión (xtx vacío si aún no se entrena)
+        '''
+        return {"generacion":self.generacion,
+                "entrenados":self.entrenados,
+                "evaluaciones_reales":self.evaluaciones_reales,
+                "evaluaciones_evitadas":self.evaluaciones_evitadas,
+                "errores_revalidacion":np.array(self.errores_revalidacion,dtype=float),
+                "xtx":np.zeros((0,0)) if self._xtx is None else self._xtx.copy(),
+                "xty":np.zeros(0) if self._xty is None else self._xty.copy(),
+                "yty":self._yty,
+                "peso":self._peso}
+
+    def cargar_estado(self,estado:dict):
+        '''
+        Función encargada de reemplazar los datos de entrenamiento y los contadores por
+        los exportados con estado
+        ---------------------------------
+        estado: diccionario generado con estado
+        '''
+        self.generacion=int(estado["generacion"])
+        self.entrenados=int(estado["entrenados"])
+        self.evaluaciones_reales=int(estado["evaluaciones_reales"])
+        self.evaluaciones_evitadas=int(estado["evaluaciones_evitadas"])
+        self.errores_revalidacion=[float(i) for i in estado["errores_revalidacion"]]
+        xtx=np.array(estado["xtx"],dtype=float)
+        self._xtx=xtx if xtx.size else None
+        self._xty=np.array(estado["xty"],dtype=float) if xtx.size else None
+        self._yty=float(estado["yty"])
+        self._peso=float(estado["peso"])
+
+    def tasa_evitadas(self)->float:
+        '''
+        RETURN
+        tasa: proporción de las evaluaciones pedidas que se reemplazaron por la estimación
+        '''
+        total=self.evaluaciones_reales+self.evaluaciones_evitadas
+        return self.evaluaciones_evitadas/total if total else 0.0
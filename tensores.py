@@ -0,0 +1,103 @@
+import numpy as np
+
+def datos_a_tensor(data_temp:'list | np.ndarray | dict',dtype:type=float)->tuple:
+    '''
+    Función encargada de pasar la información de la red LSTM a un tensor rellenado con
+    ceros de forma (individuos, pasos de tiempo, variables), los individuos con menos
+    observaciones se rellenan al final
+    ----------------------------------------
+    data_temp: array de numpy, list o diccionario empaquetado (ver 
+    funciones_data.empaquetar_info_redes) con la información necesaria de las variables
+    y observaciones de cada individuo para realizar la red LSTM
+    dtype: tipo de dato del tensor
+    ----------------------------------------
+    RETURN
+    tensor: array 3d con la información de cada individuo, es una copia salvo cuando
+    data_temp ya es un array 3d del tipo dtype
+    longitudes: array con la cantidad de observaciones reales de cada individuo
+    '''
+    if isinstance(data_temp,dict):
+        longitudes=np.asarray(data_temp["longitudes"])
+        valores=data_temp["valores"]
+        tensor=np.zeros((len(longitudes),longitudes.max(initial=0),valores.shape[1]),
+                        dtype=dtype)
+        fila=np.repeat(np.arange(len(longitudes)),longitudes)
+        paso=np.arange(len(valores))-np.repeat(data_temp["offsets"][:-1],longitudes)
+        tensor[fila,paso]=valores
+        return tensor, longitudes
+    if isinstance(data_temp,np.ndarray) and data_temp.ndim==3:
+        longitudes=np.full(data_temp.shape[0],data_temp.shape[1])
+        return np.asarray(data_temp,dtype=dtype), longitudes
+    longitudes=np.array([len(i) for i in data_temp])
+    variables=np.asarray(data_temp[0]).shape[1]
+    tensor=np.zeros((len(data_temp),longitudes.max(initial=0),variables),dtype=dtype)
+    for k,i in enumerate(data_temp):
+        tensor[k,:longitudes[k]]=i
+    return tensor, longitudes
+
+def cantidad_individuos(data_temp:'list | np.ndarray | dict')->int:
+    '''
+    Función encargada de contar los individuos de la información de la red LSTM
+    ----------------------------------------
+    data_temp: array 3d, list o diccionario empaquetado
+    ----------------------------------------
+    RETURN
+    individuos: cantidad de individuos
+    '''
+    if isinstance(data_temp,dict):
+        return len(data_temp["longitudes"])
+    return len(data_temp)
+
+def bloque_datos(data_temp:'np.ndarray | dict',longitudes:'np.ndarray | None',
+                 inicio:int,fin:int)->tuple:
+    '''
+    Función encargada de obtener el tensor de los individuos inicio:fin, si data_temp es
+    un diccionario empaquetado solo se leen (y rellenan) las observaciones de ese bloque,
+    lo que permite usar arrays en disco (np.memmap) más grandes que la memoria
+    ----------------------------------------
+    data_temp: array 3d o diccionario empaquetado
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_temp es un tensor rellenado con ceros
+    inicio: posición del primer individuo del bloque
+    fin: posición siguiente al último individuo del bloque
+    ----------------------------------------
+    RETURN
+    tensor: array 3d con la información de los individuos del bloque
+    longitudes: array con la cantidad de observaciones de cada individuo del bloque
+    '''
+    if isinstance(data_temp,dict):
+        offsets=np.asarray(data_temp["offsets"][inicio:fin+1])
+        bloque={"valores":data_temp["valores"][offsets[0]:offsets[-1]],
+                "offsets":offsets-offsets[0],
+                "longitudes":data_temp["longitudes"][inicio:fin]}
+        return datos_a_tensor(bloque)
+    long_bloque=None if longitudes is None else longitudes[inicio:fin]
+    return data_temp[inicio:fin], long_bloque
+
+def seleccionar_individuos(data_temp:'list | np.ndarray | dict',
+                           longitudes:'np.ndarray | None',
+                           posiciones:np.ndarray)->tuple:
+    '''
+    Función encargada de obtener el tensor de algunos individuos
+    ----------------------------------------
+    data_temp: array 3d, list o diccionario empaquetado
+    longitudes: array con la cantidad de observaciones reales de cada individuo cuando
+    data_temp es un tensor rellenado con ceros
+    posiciones: array ordenado con las posiciones de los individuos
+    ----------------------------------------
+    RETURN
+    tensor: array 3d con la información de los individuos elegidos
+    longitudes: array con la cantidad de observaciones de esos individuos
+    '''
+    if isinstance(data_temp,dict):
+        long_sel=np.asarray(data_temp["longitudes"])[posiciones]
+        inicios=np.asarray(data_temp["offsets"])[posiciones]
+        acumulado=np.cumsum(long_sel)
+        filas=np.repeat(inicios-(acumulado-long_sel),long_sel)+np.arange(acumulado[-1])
+        seleccion={"valores":data_temp["valores"][filas],
+                   "offsets":np.concatenate([[0],acumulado]),
+                   "longitudes":long_sel}
+        return datos_a_tensor(seleccion)
+    if not isinstance(data_temp,np.ndarray) or data_temp.ndim!=3:
+        data_temp,longitudes=datos_a_tensor(data_temp)
+    return data_temp[posiciones], None if longitudes is None else longitudes[posiciones]
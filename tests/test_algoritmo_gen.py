@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from algoritmo_gen import (codificar_poblacion, crear_poblacion, cruzar,
+                           decodificar_poblacion, elegir_elite, mutar, optimizar_gen,
+                           reproduccion)
+
+def test_elite_prefiere_genes_completos():
+    fitness=np.array([0.9,0.5,0.7,0.95,0.6])
+    completos=np.array([False,True,True,False,True])
+    assert elegir_elite(fitness,completos,2).tolist()==[2,4]
+    assert elegir_elite(fitness,completos,4).tolist()==[2,4,1,3]
+    assert elegir_elite(fitness,np.ones(5,dtype=bool),2).tolist()==[3,0]
+
+V,C=2,3
+LARGO=12*V+V+C+1
+
+def poblacion_distinta(tamano):
+    # cada gen tiene valores propios para saber de que padre viene cada posición
+    return np.arange(tamano)[:,None]*1000.0+np.arange(LARGO)[None,:]
+
+def test_cruzar_toma_cada_posicion_de_un_padre():
+    rng=np.random.default_rng(0)
+    poblacion=poblacion_distinta(10)
+    padres=rng.integers(10,size=(7,2))
+    hijos=cruzar(poblacion,padres,V,C,rng)
+    assert hijos.shape==(14,LARGO)
+    for k,(a,b) in enumerate(padres):
+        del_primero=hijos[2*k]==poblacion[a]
+        assert (del_primero|(hijos[2*k]==poblacion[b])).all()
+        # el segundo hijo toma cada posición del otro padre
+        assert (hijos[2*k+1]==np.where(del_primero,poblacion[b],poblacion[a])).all()
+
+def test_reproduccion_forma_y_origen():
+    rng=np.random.default_rng(1)
+    poblacion=poblacion_distinta(9)
+    hijos=reproduccion(poblacion,np.full(9,1/9),V,C,rng)
+    assert hijos.shape==(8,LARGO)
+    # cada posición viene de la misma posición de algún gen de la población
+    assert ((hijos[:,None,:]==poblacion[None,:,:]).any(axis=1)).all()
+
+def test_mutar_dentro_del_pool():
+    rng=np.random.default_rng(2)
+    pool=np.linspace(-2,2,50)
+    poblacion=poblacion_distinta(40)
+    assert (mutar(poblacion,0.0,pool,rng)==poblacion).all()
+    mutada=mutar(poblacion,0.3,pool,rng)
+    assert mutada.shape==poblacion.shape
+    cambiados=mutada!=poblacion
+    assert np.isin(mutada[cambiados],pool).all()
+    assert 0<cambiados.mean()<0.6
+    # todas las posiciones pueden mutar, incluida la última
+    assert cambiados.any(axis=0).all()
+    assert np.isin(mutar(poblacion,1.0,pool,rng),pool).all()
+
+def test_codificar_y_decodificar():
+    pool=np.linspace(-2,2,300)[::-1]
+    poblacion=crear_poblacion(pool,V,C,20,np.random.default_rng(3))
+    indices=codificar_poblacion(poblacion,pool)
+    assert indices.dtype==np.uint16 and indices.flags.c_contiguous
+    assert (decodificar_poblacion(indices,pool)==poblacion).all()
+    with pytest.raises(ValueError):
+        codificar_poblacion(poblacion+1e-3,pool)
+
+def test_optimizar_gen_codificado_igual():
+    rng=np.random.default_rng(0)
+    datos=([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+           rng.integers(0,2,60))
+    pool=np.linspace(-2,2,50)
+    normal,codificado=[optimizar_gen(pool,V,C,20,*datos,0.05,10,1e-4,30,semilla=4,
+                                     codificar=codificar,elite=2,observadores=[])
+                       for codificar in (False,True)]
+    assert normal[0]==codificado[0]
+    assert (normal[1]==codificado[1]).all()
@@ -0,0 +1,43 @@
+import json
+import pytest
+from barrido import ejecutar_barrido
+from benchmarks.sintetico import generar_panel
+from dataset_mmap import escribir_dataset
+from funciones_data import construir_datos_redes
+from observadores import HistorialMemoria, RegistroJSONL
+
+def escribir_datos(carpeta):
+    temporal,constante,verdadero=generar_panel(60,4,2,3,2,0)
+    empaquetado,const=construir_datos_redes(temporal,constante,["NDI","fecha"],["NDI"],
+                                            "NDI")
+    escribir_dataset(str(carpeta),empaquetado,const,verdadero)
+
+def configuraciones(cantidad):
+    return [{"prob":0.05,"tamano_poblacion":8,"resolucion_pool":20,"tol":1e-4,
+             "max_intentos":10,"semilla":semilla} for semilla in range(cantidad)]
+
+def test_observadores_reciben_cada_generacion(tmp_path):
+    escribir_datos(tmp_path/"datos")
+    historial=HistorialMemoria()
+    registro=RegistroJSONL(str(tmp_path/"registro.jsonl"),"w")
+    resultados=ejecutar_barrido(str(tmp_path/"datos"),configuraciones(3),4,
+                                generaciones_minimas=2,trabajadores=1,
+                                observadores=[historial,registro],
+                                carpeta=str(tmp_path/"checkpoints"))
+    assert len(resultados)==3
+    assert resultados["generaciones"].max()==4
+    assert len(historial)==resultados["generaciones"].sum()
+    for k in range(3):
+        generaciones=[r["generacion"] for r in historial.registros
+                      if r["configuracion"]==k]
+        assert generaciones==list(range(1,len(generaciones)+1))
+    with open(tmp_path/"registro.jsonl") as archivo:
+        assert len([json.loads(linea) for linea in archivo])==len(historial)
+    assert registro._archivo.closed
+
+def test_observadores_en_fijos(tmp_path):
+    escribir_datos(tmp_path/"datos")
+    with pytest.raises(ValueError):
+        ejecutar_barrido(str(tmp_path/"datos"),configuraciones(1),2,trabajadores=1,
+                         fijos={"observadores":[HistorialMemoria()]},
+                         carpeta=str(tmp_path/"checkpoints"))
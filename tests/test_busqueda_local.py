@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from busqueda_local import BusquedaLocal, vecinos_pool
+
+POOL=np.linspace(-2,2,21)
+
+def test_vecinos_pool_genera_cada_vecino():
+    rangos=np.array([[0,5,20],[3,3,3]])
+    vecinos,validos=vecinos_pool(rangos,21)
+    assert vecinos.shape==(2,6,3) and validos.shape==(2,6)
+    for gen,(rango,vecinos_gen) in enumerate(zip(rangos,vecinos)):
+        esperados={tuple(rango+signo*np.eye(3,dtype=int)[posicion])
+                   for signo in (1,-1) for posicion in range(3)}
+        assert {tuple(vecino) for vecino in vecinos_gen}==esperados
+        # cada vecino difiere en una sola posición por un paso del pool
+        assert ((vecinos_gen!=rango).sum(axis=1)==1).all()
+        assert (np.abs(vecinos_gen-rango).sum(axis=1)==1).all()
+    # salen del pool el siguiente del último valor y el anterior del primero
+    assert validos[0].tolist()==[True,True,False,False,True,True]
+    assert validos[1].all()
+
+def objetivo(pesos):
+    # máximo en el gen con todos los pesos iguales al valor del pool más cercano a 1
+    return -((np.asarray(pesos)-POOL[15])**2).sum(axis=1)
+
+def test_refinar_nunca_empeora():
+    rng=np.random.default_rng(0)
+    genes=rng.choice(POOL,(5,4))
+    fitness=objetivo(genes)
+    busqueda=BusquedaLocal(max_pasos=3)
+    refinados,nuevo=busqueda.refinar(genes,fitness,objetivo,POOL)
+    assert (nuevo>=fitness).all()
+    assert np.array_equal(nuevo,objetivo(refinados))
+    assert np.isin(refinados,POOL).all()
+    # con pasos suficientes todos llegan al máximo
+    refinados,nuevo=BusquedaLocal(max_pasos=100).refinar(genes,fitness,objetivo,POOL)
+    assert (refinados==POOL[15]).all() and (nuevo==0).all()
+
+def test_refinar_se_detiene_sin_mejora():
+    genes=np.full((2,4),POOL[15])
+    busqueda=BusquedaLocal()
+    refinados,fitness=busqueda.refinar(genes,objetivo(genes),objetivo,POOL)
+    assert (refinados==genes).all() and (fitness==0).all()
+    assert busqueda.pasos==1 and busqueda.refinamientos==1 and busqueda.mejora==0
+    # los dos genes son iguales, sus vecinos se evaluan una sola vez
+    assert busqueda.evaluaciones==8
+    # un gen a dos pasos del máximo se detiene en el paso siguiente a alcanzarlo
+    busqueda=BusquedaLocal()
+    genes=np.full((1,4),POOL[15])
+    genes[0,0]=POOL[13]
+    busqueda.refinar(genes,objetivo(genes),objetivo,POOL)
+    assert busqueda.pasos==3
+
+def test_refinar_rechaza_valores_fuera_del_pool():
+    with pytest.raises(ValueError):
+        BusquedaLocal().refinar(np.full((1,4),0.05),np.zeros(1),objetivo,POOL)
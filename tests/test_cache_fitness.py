@@ -0,0 +1,38 @@
+import numpy as np
+from algoritmo_gen import optimizar_gen
+from cache_fitness import CacheFitness
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+
+def test_lru_y_contadores():
+    cache=CacheFitness(3)
+    genes=np.arange(15,dtype=float).reshape(5,3)
+    cache.guardar(genes[:3],[0.1,0.2,0.3])
+    # buscar el primero lo deja como el más reciente
+    fitness,faltantes=cache.buscar(genes[[0,3]])
+    assert fitness[0]==0.1 and faltantes.tolist()==[False,True]
+    assert (cache.aciertos,cache.fallos)==(1,1)
+    cache.guardar(genes[3:4],[0.4])
+    assert len(cache)==3
+    fitness,faltantes=cache.buscar(genes[:4])
+    # se eliminó el gen 1, el usado hace más tiempo
+    assert faltantes.tolist()==[False,True,False,False]
+    assert np.allclose(fitness[[0,2,3]],[0.1,0.3,0.4])
+    assert (cache.aciertos,cache.fallos)==(4,2)
+    assert np.isclose(cache.tasa_aciertos(),4/6)
+    cache.limpiar()
+    assert len(cache)==0 and cache.tasa_aciertos()==0.0
+
+def test_optimizar_gen_con_cache_igual_sin_cache():
+    rng=np.random.default_rng(0)
+    datos=([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+           rng.integers(0,2,60))
+    sin_cache=optimizar_gen(POOL,V,C,20,*datos,0.05,10,1e-4,30,semilla=2,
+                            observadores=[])
+    cache=CacheFitness(30)
+    con_cache=optimizar_gen(POOL,V,C,20,*datos,0.05,10,1e-4,30,semilla=2,cache=cache,
+                            observadores=[])
+    assert sin_cache[0]==con_cache[0]
+    assert (sin_cache[1]==con_cache[1]).all()
+    assert cache.aciertos>0 and len(cache)<=30
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import checkpoint
+from algoritmo_gen import optimizar_gen
+from cache_fitness import CacheFitness
+from checkpoint import cargar_checkpoint
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+
+@pytest.fixture
+def datos():
+    rng=np.random.default_rng(0)
+    data_red=[rng.random((rng.integers(2,7),V)) for _ in range(60)]
+    return data_red,rng.random((60,C)),rng.integers(0,2,60)
+
+def test_checkpoint_guarda_el_cache_y_reanuda_igual(datos,tmp_path):
+    ruta=str(tmp_path/"ck.npz")
+    completo=optimizar_gen(POOL,V,C,20,*datos,0.05,12,1e-4,30,semilla=3,
+                           cache=CacheFitness(),observadores=[])
+    cache=CacheFitness(100)
+    optimizar_gen(POOL,V,C,20,*datos,0.05,5,1e-4,30,semilla=3,cache=cache,
+                  ruta_checkpoint=ruta,observadores=[])
+    guardado=cargar_checkpoint(ruta)["cache"]
+    esperado=cache.estado()
+    assert (guardado["llaves"]==esperado["llaves"]).all()
+    assert np.array_equal(guardado["valores"],esperado["valores"])
+    assert int(guardado["aciertos"])==esperado["aciertos"]
+    reanudado=optimizar_gen(POOL,V,C,20,*datos,0.05,12,1e-4,30,semilla=3,
+                            cache=CacheFitness(),resume_from=ruta,observadores=[])
+    assert completo[0]==reanudado[0]
+    assert (completo[1]==reanudado[1]).all()
+
+def test_error_del_escritor_cierra_observadores(datos,tmp_path,monkeypatch):
+    def falla(ruta,estado):
+        raise OSError("disco lleno")
+    class Observador:
+        cerrado=False
+        def __call__(self,registro):
+            pass
+        def cerrar(self):
+            self.cerrado=True
+    monkeypatch.setattr(checkpoint,"escribir_checkpoint",falla)
+    observador=Observador()
+    with pytest.raises(OSError):
+        optimizar_gen(POOL,V,C,10,*datos,0.05,2,1e-4,30,semilla=0,
+                      ruta_checkpoint=str(tmp_path/"ck.npz"),observadores=[observador])
+    assert observador.cerrado
+
+def test_registro_de_cambios_acotado(datos,tmp_path):
+    rng=np.random.default_rng(0)
+    cache=CacheFitness(50)
+    copia=CacheFitness(50)
+    cache.registrar_cambios()
+    for _ in range(30):
+        genes=rng.choice(POOL,(20,5))
+        cache.buscar(genes)
+        cache.guardar(genes,rng.random(20))
+        assert len(cache._cambios)<=50
+    copia.aplicar_cambios(cache.tomar_cambios(),cache.aciertos,cache.fallos)
+    assert (copia.estado()["llaves"]==cache.estado()["llaves"]).all()
+    assert np.array_equal(copia.estado()["valores"],cache.estado()["valores"])
+    cache=CacheFitness(50)
+    optimizar_gen(POOL,V,C,20,*datos,0.05,30,1e-4,30,semilla=0,cache=cache,
+                  ruta_checkpoint=str(tmp_path/"ck.npz"),cada_checkpoint=1000,
+                  observadores=[])
+    assert cache._cambios is None
@@ -0,0 +1,39 @@
+import json
+import cli
+from benchmarks.sintetico import generar_panel
+
+def configurar(tmp_path):
+    temporal,constante,verdadero=generar_panel(40,4,2,3,2,0)
+    constante["etiqueta"]=verdadero
+    temporal.to_csv(tmp_path/"temp.csv",index=False)
+    constante.to_csv(tmp_path/"const.csv",index=False)
+    constante.drop(columns="etiqueta").head(10).to_csv(tmp_path/"nuevo.csv",index=False)
+    configuracion={"datos":{"temporal":"temp.csv","constante":"const.csv",
+                            "identificador":"NDI","excluir_temp":["NDI","fecha"],
+                            "excluir_const":["NDI"],"verdadero":"etiqueta",
+                            "cache":"cache"},
+                   "entrenamiento":{"tamano_poblacion":6,"prob":0.05,"generaciones":2,
+                                    "tol":1e-4,"max_intentos":5,"semilla":0,
+                                    "modelo":"modelo.npz","observadores":[]},
+                   "prediccion":{"salida":"pred.csv"}}
+    (tmp_path/"conf.json").write_text(json.dumps(configuracion))
+    return str(tmp_path/"conf.json")
+
+def test_train_y_predict_no_leen_el_contenido(tmp_path,monkeypatch):
+    ruta=configurar(tmp_path)
+    cli.main(["prepare","--config",ruta])
+    def leer_todo(datos):
+        raise AssertionError("no se debe leer el contenido de los archivos")
+    monkeypatch.setattr(cli,"huella_contenido",leer_todo)
+    cli.main(["train","--config",ruta])
+    cli.main(["predict","--config",ruta])
+    assert len((tmp_path/"pred.csv").read_text().splitlines())==41
+
+def test_predict_datos_nuevos(tmp_path):
+    ruta=configurar(tmp_path)
+    cli.main(["train","--config",ruta])
+    salida=str(tmp_path/"nuevo_pred.csv")
+    cli.main(["predict","--config",ruta,"--constante",str(tmp_path/"nuevo.csv"),
+              "--salida",salida])
+    with open(salida) as archivo:
+        assert len(archivo.read().splitlines())==11
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from funciones_data import (agregar_info_redes, array_redes, empaquetar_info_redes,
+                            tensor_empaquetado)
+
+def test_array_redes_alineado_con_agregar_info_redes():
+    temporal=pd.DataFrame({"NDI":["B","B","A","A","C","C"],
+                           "var1":[2.0,2.5,1.0,1.5,3.0,3.5]})
+    constante=pd.DataFrame({"NDI":["C","A","B"],"edad":[30,10,20]})
+    redes=agregar_info_redes(temporal,["NDI"],"NDI")
+    const=array_redes(constante,["NDI"],"NDI")
+    assert [i[0,0] for i in redes]==[1.0,2.0,3.0]
+    assert const[:,0,0].tolist()==[10,20,30]
+
+def test_tensor_empaquetado_mantiene_dtype():
+    temporal=pd.DataFrame({"NDI":["A","B","B"],"var1":[1.0,2.0,3.0]})
+    empaquetado=empaquetar_info_redes(temporal,["NDI"],"NDI",dtype=np.float32)
+    tensor,mascara=tensor_empaquetado(empaquetado)
+    assert tensor.dtype==np.float32
+    assert tensor[:,:,0].tolist()==[[1.0,0.0],[2.0,3.0]]
+    assert mascara.tolist()==[[True,False],[True,True]]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from algoritmo_gen import optimizar_gen
+from diversidad import ControlDiversidad, distancia_hamming, entropia_posiciones
+from observadores import HistorialMemoria
+
+def test_entropia_posiciones():
+    iguales=np.tile(np.arange(6.0),(8,1))
+    assert (entropia_posiciones(iguales)==0).all()
+    distintos=np.arange(48.0).reshape(8,6)
+    assert np.allclose(entropia_posiciones(distintos),1)
+    # primera posición repartida por igual entre dos de los tres valores, la segunda
+    # constante
+    mitades=np.array([[0,5],[1,5],[0,5],[1,5]])
+    assert np.allclose(entropia_posiciones(mitades),[np.log(2)/np.log(3),0])
+    assert (entropia_posiciones(iguales[:1])==0).all()
+
+def test_distancia_hamming():
+    iguales=np.tile(np.arange(6.0),(8,1))
+    assert distancia_hamming(iguales)==0
+    distintos=np.arange(48.0).reshape(8,6)
+    assert distancia_hamming(distintos)==1
+    # dos genes iguales y uno distinto en la mitad de las posiciones: 4 de 6 pares
+    # difieren en la mitad
+    genes=np.array([[0,0,0,0],[0,0,0,0],[0,0,1,1]])
+    assert distancia_hamming(genes)==pytest.approx(1/3)
+    # con más genes que la muestra se usa una muestra de la población
+    poblacion=np.random.default_rng(0).integers(0,3,(500,20))
+    muestreada=distancia_hamming(poblacion,muestra=64,rng=1)
+    assert muestreada==distancia_hamming(poblacion,muestra=64,rng=1)
+    assert muestreada==pytest.approx(2/3,abs=0.03)
+
+def test_control_sube_la_mutacion_sin_diversidad():
+    control=ControlDiversidad(prob_maxima=0.5,objetivo=0.4,umbral_convergencia=0)
+    distintos=np.arange(48.0).reshape(8,6)
+    assert control.actualizar(distintos,0.1)["prob_mutacion"]==0.1
+    iguales=np.tile(np.arange(6.0),(8,1))
+    assert control.actualizar(iguales,0.1)["prob_mutacion"]==pytest.approx(0.5)
+    # bajo objetivo sube en proporción a lo que falta para llegar a él
+    casi_iguales=iguales.copy()
+    casi_iguales[0,:2]=-1
+    registro=control.actualizar(casi_iguales,0.1)
+    assert 0<registro["entropia"]<0.4
+    assert registro["prob_mutacion"]==pytest.approx(0.1+0.4*(1-registro["entropia"]/0.4))
+    assert not any(registro["detener"] for registro in control.historial)
+
+def test_control_detiene_tras_paciencia():
+    control=ControlDiversidad(umbral_convergencia=0.1,paciencia=3)
+    iguales=np.tile(np.arange(6.0),(8,1))
+    distintos=np.arange(48.0).reshape(8,6)
+    detener=[control.actualizar(poblacion,0.1)["detener"]
+             for poblacion in (iguales,iguales,distintos,iguales,iguales,iguales)]
+    assert detener==[False,False,False,False,False,True]
+    with pytest.raises(ValueError):
+        ControlDiversidad(medida="varianza")
+
+def test_optimizar_gen_con_control_diversidad():
+    rng=np.random.default_rng(0)
+    V,C=2,3
+    datos=([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+           rng.integers(0,2,60))
+    pool=np.linspace(-2,2,50)
+    historial=HistorialMemoria()
+    control=ControlDiversidad(prob_maxima=0.5,objetivo=1.1,umbral_convergencia=0)
+    optimizar_gen(pool,V,C,20,*datos,0.05,6,1e-4,30,semilla=0,
+                  control_diversidad=control,observadores=[historial])
+    assert len(control.historial)==6
+    # cada generación muta con la probabilidad que indicó el control
+    assert historial.columna("prob_mutacion").tolist()==[
+        registro["prob_mutacion"] for registro in control.historial]
+    assert (historial.columna("prob_mutacion")>0.05).all()
+    historial=HistorialMemoria()
+    control=ControlDiversidad(umbral_convergencia=1.1,paciencia=2)
+    optimizar_gen(pool,V,C,20,*datos,0.05,6,1e-4,30,semilla=0,
+                  control_diversidad=control,observadores=[historial])
+    assert len(historial)==1 and len(control.historial)==2
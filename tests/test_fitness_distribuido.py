@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import threading
+import numpy as np
+import pytest
+from algoritmo_gen import calcular_fitness, crear_poblacion
+from benchmarks.sintetico import generar_panel
+from dataset_mmap import abrir_dataset, escribir_dataset
+from fitness_distribuido import CoordinadorFitness, TrabajadorFitness, ejecutar_trabajador
+from funciones_data import construir_datos_redes
+
+CLAVE=b"clave de prueba"
+contexto=multiprocessing.get_context("fork")
+
+def trabajador_que_muere(direccion,ruta):
+    # toma un bloque, avisa que lo empezó y muere sin responder
+    trabajador=TrabajadorFitness(direccion,ruta,CLAVE,nombre="muere")
+    gestor=trabajador._conectar()
+    resultados=gestor.cola_resultados()
+    resultados.put(("latido","muere"))
+    lote,_=gestor.cola_tareas().get()
+    resultados.put(("inicio","muere",lote))
+    os._exit(1)
+
+def trabajador_solo_latidos(direccion,ruta):
+    # trabajador vivo que nunca toma bloques
+    trabajador=TrabajadorFitness(direccion,ruta,CLAVE,nombre="latidos")
+    trabajador._latir(threading.Event(),0.1)
+
+@pytest.fixture
+def dataset(tmp_path):
+    temporal,constante,verdadero=generar_panel(80,4,2,3,2,0)
+    empaquetado,const=construir_datos_redes(temporal,constante,["NDI","fecha"],["NDI"],
+                                            "NDI")
+    escribir_dataset(str(tmp_path),empaquetado,const,verdadero)
+    return str(tmp_path)
+
+def iniciar(objetivo,*argumentos):
+    proceso=contexto.Process(target=objetivo,args=argumentos,daemon=True)
+    proceso.start()
+    return proceso
+
+def test_trabajador_muerto_a_mitad_de_bloque(dataset):
+    datos=abrir_dataset(dataset)
+    poblacion=crear_poblacion(np.linspace(-2,2,50),2,3,12,np.random.default_rng(0))
+    esperado=calcular_fitness(poblacion,datos,datos["const"],2,3,datos["verdadero"])
+    with CoordinadorFitness(dataset,CLAVE,tamano_bloque=4,tiempo_latido=0.1,
+                            latidos_perdidos=2,tiempo_minimo=0.5,
+                            tiempo_espera=20) as coordinador:
+        procesos=[iniciar(trabajador_que_muere,coordinador.direccion,dataset),
+                  iniciar(ejecutar_trabajador,coordinador.direccion,dataset,CLAVE)]
+        assert np.allclose(coordinador.evaluar(poblacion),esperado)
+    for proceso in procesos:
+        proceso.join(10)
+
+def test_bloque_perdido_en_todos_sus_envios(dataset):
+    poblacion=crear_poblacion(np.linspace(-2,2,50),2,3,4,np.random.default_rng(0))
+    with CoordinadorFitness(dataset,CLAVE,tamano_bloque=4,tiempo_latido=0.1,
+                            latidos_perdidos=2,tiempo_minimo=0.5,max_envios=1,
+                            tiempo_espera=20) as coordinador:
+        procesos=[iniciar(trabajador_solo_latidos,coordinador.direccion,dataset),
+                  iniciar(trabajador_que_muere,coordinador.direccion,dataset)]
+        # los latidos del trabajador vivo no deben dejar esperando para siempre
+        with pytest.raises(RuntimeError,match=r"\(1, 0\)"):
+            coordinador.evaluar(poblacion)
+    for proceso in procesos:
+        proceso.join(10)
+
+def test_coordinador_requiere_clave(dataset):
+    with pytest.raises(ValueError):
+        CoordinadorFitness(dataset,b"")
@@ -0,0 +1,47 @@
+import numpy as np
+from algoritmo_gen import optimizar_gen
+from fitness_escalonado import EvaluacionEscalonada, muestras_estratificadas
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+
+def test_muestras_estratificadas_anidadas():
+    verdadero=np.array([0]*70+[1]*30)
+    muestras=muestras_estratificadas(verdadero,[0.1,0.5,1.0],np.random.default_rng(0))
+    assert muestras[-1] is None
+    for muestra,fraccion in zip(muestras[:-1],[0.1,0.5]):
+        assert len(np.unique(muestra))==len(muestra)
+        assert (verdadero[muestra]==0).sum()==round(70*fraccion)
+        assert (verdadero[muestra]==1).sum()==round(30*fraccion)
+    assert np.isin(muestras[0],muestras[1]).all()
+
+def test_promocion_por_nivel():
+    escalonado=EvaluacionEscalonada((0.1,0.3,1.0),promocion=[0.5,0.25],semilla=0)
+    poblacion=np.arange(40,dtype=float)[:,None]
+    tamanos=[]
+    def funcion(genes,muestra):
+        tamanos.append(None if muestra is None else len(muestra))
+        return genes[:,0]
+    fitness,completos=escalonado.evaluar(poblacion,funcion,np.arange(100)%2)
+    assert escalonado.evaluaciones_nivel.tolist()==[40,20,5]
+    assert tamanos==[10,30,None]
+    # los promovidos son los de mayor valor en cada nivel
+    assert np.flatnonzero(completos).tolist()==list(range(35,40))
+    assert (fitness==poblacion[:,0]).all()
+    assert escalonado.evaluaciones_ahorradas==35
+
+def test_reanudar_con_escalonado(tmp_path):
+    rng=np.random.default_rng(0)
+    datos=([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+           rng.integers(0,2,60))
+    ruta=str(tmp_path/"ck.npz")
+    completo=optimizar_gen(POOL,V,C,20,*datos,0.05,12,1e-4,30,semilla=3,
+                           escalonado=EvaluacionEscalonada(semilla=1),observadores=[])
+    optimizar_gen(POOL,V,C,20,*datos,0.05,5,1e-4,30,semilla=3,
+                  escalonado=EvaluacionEscalonada(semilla=1),ruta_checkpoint=ruta,
+                  observadores=[])
+    reanudado=optimizar_gen(POOL,V,C,20,*datos,0.05,12,1e-4,30,semilla=3,
+                            escalonado=EvaluacionEscalonada(semilla=1),
+                            resume_from=ruta,observadores=[])
+    assert completo[0]==reanudado[0]
+    assert (completo[1]==reanudado[1]).all()
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from algoritmo_gen import calcular_fitness, crear_poblacion
+from dataset_mmap import abrir_dataset, escribir_dataset
+from fitness_paralelo import EvaluadorParalelo, descriptor_archivo
+
+@pytest.fixture
+def datos():
+    rng=np.random.default_rng(0)
+    data_red=[rng.random((rng.integers(1,5),2)) for _ in range(20)]
+    data_const=rng.random((20,3))
+    verdadero=rng.integers(0,2,20)
+    poblacion=crear_poblacion(np.linspace(-2,2,50),2,3,9,rng)
+    return data_red,data_const,verdadero,poblacion
+
+def empaquetar(data_red):
+    longitudes=np.array([len(i) for i in data_red])
+    return {"valores":np.concatenate(data_red),
+            "offsets":np.concatenate([[0],np.cumsum(longitudes)]),
+            "longitudes":longitudes,"identificadores":np.arange(len(data_red))}
+
+def test_evaluador_paralelo_igual_a_calcular_fitness(datos):
+    data_red,data_const,verdadero,poblacion=datos
+    with EvaluadorParalelo(data_red,data_const,verdadero,2,3,trabajadores=2) as evaluador:
+        fitness=evaluador.evaluar(poblacion)
+        vacio=evaluador.evaluar(poblacion[:0])
+    assert np.allclose(fitness,calcular_fitness(poblacion,data_red,data_const,2,3,
+                                                verdadero))
+    assert vacio.shape==(0,)
+
+def test_evaluador_paralelo_con_empaquetado_y_memmap(datos,tmp_path):
+    data_red,data_const,verdadero,poblacion=datos
+    esperado=calcular_fitness(poblacion,data_red,data_const,2,3,verdadero)
+    empaquetado=empaquetar(data_red)
+    with EvaluadorParalelo(empaquetado,data_const,verdadero,2,3,
+                           trabajadores=2) as evaluador:
+        assert np.allclose(evaluador.evaluar(poblacion),esperado)
+    escribir_dataset(str(tmp_path),empaquetado,data_const,verdadero)
+    dataset=abrir_dataset(str(tmp_path))
+    assert descriptor_archivo(dataset["valores"]) is not None
+    assert descriptor_archivo(dataset["valores"][1:]) is None
+    with EvaluadorParalelo(dataset,dataset["const"],dataset["verdadero"],2,3,
+                           trabajadores=2) as evaluador:
+        # los memmap se abren desde sus archivos, no se copian a memoria compartida
+        assert evaluador._bloques==[]
+        assert np.allclose(evaluador.evaluar(poblacion),esperado)
@@ -0,0 +1,84 @@
+import queue
+import threading
+import numpy as np
+import pytest
+from algoritmo_gen import calcular_fitness
+from islas import Migracion, destinos_migracion, optimizar_islas
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+
+def test_destinos_migracion():
+    assert [destinos_migracion(i,4,"anillo") for i in range(4)]==[[1],[2],[3],[0]]
+    assert destinos_migracion(2,4,"completa")==[0,1,3]
+    assert destinos_migracion(0,1,"completa")==[]
+    with pytest.raises(ValueError):
+        destinos_migracion(0,2,"estrella")
+
+def migraciones(islas,topologia,cada,compartido=None,tol=0.0,max_intentos=3):
+    colas=[queue.Queue() for _ in range(islas)]
+    compartido=compartido or {"mejor":0.0,"generacion":0,"generacion_mejora":0}
+    candado=threading.Lock()
+    detener=threading.Event()
+    return [Migracion(i,destinos_migracion(i,islas,topologia),colas,cada,2,compartido,
+                      candado,detener,tol,max_intentos) for i in range(islas)]
+
+def test_migracion_cada_intervalo():
+    isla0,isla1,isla2=migraciones(3,"anillo",3)
+    poblacion=np.arange(10,dtype=float)[:,None]*np.ones((1,4))
+    fitness=np.arange(10)/10
+    completos=np.ones(10,dtype=bool)
+    completos[9]=False
+    for generacion in (1,2):
+        peores,_,_=isla0.intercambiar(generacion,poblacion,fitness,completos)
+        assert len(peores)==0
+        assert isla1.colas[1].empty()
+    isla0.intercambiar(3,poblacion,fitness,completos)
+    # en anillo solo recibe la isla siguiente, los mejores completos
+    assert isla2.colas[2].empty()
+    peores,genes,valores=isla1.intercambiar(3,poblacion+100,fitness,completos)
+    assert sorted(peores.tolist())==[0,1]
+    assert genes[:,0].tolist()==[8,7]
+    assert valores.tolist()==[0.8,0.7]
+    # isla1 envio a isla2
+    assert not isla2.colas[2].empty()
+
+def test_migracion_completa():
+    islas=migraciones(3,"completa",1)
+    poblacion=np.ones((4,2))
+    islas[0].intercambiar(1,poblacion,np.arange(4)/4,np.ones(4,dtype=bool))
+    assert not islas[1].colas[1].empty() and not islas[2].colas[2].empty()
+    assert islas[0].colas[0].empty()
+
+def test_parada_temprana_global():
+    isla0,isla1=migraciones(2,"anillo",0,tol=0.01,max_intentos=3)
+    isla0.actualizar(1,0.5)
+    isla1.actualizar(1,0.505)
+    isla1.actualizar(2,0.5)
+    # isla0 va atrasada pero la generación global es la de isla1
+    isla0.actualizar(2,0.4)
+    assert not isla0.detenida()
+    isla1.actualizar(3,0.5)
+    assert not isla1.detenida()
+    isla1.actualizar(4,0.5)
+    assert isla0.detenida() and isla1.detenida()
+    assert isla0.compartido["generacion_mejora"]==1
+
+def test_optimizar_islas_con_empaquetado_y_opciones():
+    rng=np.random.default_rng(0)
+    data_red=[rng.random((rng.integers(2,7),V)) for _ in range(40)]
+    longitudes=np.array([len(i) for i in data_red])
+    empaquetado={"valores":np.concatenate(data_red),
+                 "offsets":np.concatenate([[0],np.cumsum(longitudes)]),
+                 "longitudes":longitudes}
+    data_const=rng.random((40,C))
+    verdadero=rng.integers(0,2,40)
+    valor_opt,param_opt=optimizar_islas(POOL,V,C,10,empaquetado,data_const,verdadero,
+                                        0.05,6,1e-4,3,islas=2,migracion_cada=2,
+                                        semilla=0,elite=2,seleccion="torneo",
+                                        codificar=True)
+    exacto=calcular_fitness(param_opt[None,:],data_red,data_const,V,C,verdadero)
+    assert np.isclose(valor_opt,exacto[0])
+    with pytest.raises(ValueError):
+        optimizar_islas(POOL,V,C,10,empaquetado,data_const,verdadero,0.05,6,1e-4,3,
+                        islas=2,observadores=[])
@@ -0,0 +1,33 @@
+import warnings
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score
+from metricas import METRICAS, obtener_metrica
+
+REFERENCIAS={"f1_macro":lambda v,p:f1_score(v,p,average="macro"),
+             "f1_ponderado":lambda v,p:f1_score(v,p,average="weighted"),
+             "exactitud":accuracy_score,
+             "exactitud_balanceada":balanced_accuracy_score}
+
+CASOS={"aleatorio":(np.random.default_rng(0).integers(0,2,(6,30)),
+                    np.random.default_rng(1).integers(0,2,30)),
+       # una categoria nunca se predice
+       "sin_predecir":(np.array([[0]*10,[1]*10,[0]*9+[1]]),np.array([0,1]*5)),
+       # una categoria predicha que no aparece en verdadero
+       "sin_verdad":(np.array([[0,1,0,1,0,1],[0]*6,[1]*6]),np.zeros(6,dtype=int)),
+       # varias categorias, algunas ausentes en cada gen
+       "multiclase":(np.array([[0,1,2,2,1,0],[2]*6,[0,0,1,1,0,0]]),
+                     np.array([0,1,2,0,1,2]))}
+
+@pytest.mark.parametrize("nombre",list(METRICAS))
+@pytest.mark.parametrize("caso",list(CASOS))
+def test_igual_a_sklearn(nombre,caso):
+    predicciones,verdadero=CASOS[caso]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        esperado=[REFERENCIAS[nombre](verdadero,p) for p in predicciones]
+    assert np.allclose(obtener_metrica(nombre)(predicciones,verdadero),esperado)
+
+def test_metrica_desconocida():
+    with pytest.raises(ValueError):
+        obtener_metrica("auc")
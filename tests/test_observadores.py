@@ -0,0 +1,49 @@
+import json
+import numpy as np
+from algoritmo_gen import optimizar_gen
+from busqueda_local import BusquedaLocal
+from cache_fitness import CacheFitness
+from observadores import HistorialMemoria, RegistroJSONL
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+LLAVES={"generacion","generaciones","segundos_fitness","segundos_busqueda_local",
+        "segundos_seleccion","segundos_cruce","segundos_mutacion","segundos_total",
+        "evaluaciones","evaluaciones_por_segundo","evaluaciones_busqueda_local","mejor",
+        "media","desviacion","mejor_global","intentos_restantes","diversidad",
+        "prob_mutacion","tasa_cache","tasa_cache_lstm","entropia","hamming"}
+
+def datos():
+    rng=np.random.default_rng(0)
+    return ([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+            rng.integers(0,2,60))
+
+def test_registros_y_jsonl(tmp_path):
+    historial=HistorialMemoria()
+    ruta=str(tmp_path/"registro.jsonl")
+    optimizar_gen(POOL,V,C,20,*datos(),0.05,6,1e-4,30,semilla=0,cache=CacheFitness(),
+                  observadores=[historial,RegistroJSONL(ruta,"w")])
+    assert len(historial)==6
+    for registro in historial.registros:
+        assert set(registro)==LLAVES
+        assert registro["segundos_total"]>=registro["segundos_fitness"]>=0
+        assert 0<=registro["tasa_cache"]<=1
+    assert historial.columna("generacion").tolist()==list(range(1,7))
+    with open(ruta) as archivo:
+        lineas=[json.loads(linea) for linea in archivo]
+    assert len(lineas)==6
+    assert lineas[-1]["mejor"]==historial.registros[-1]["mejor"]
+    assert set(lineas[0])==LLAVES
+
+def test_tasa_cache_sin_busqueda_local():
+    historial=HistorialMemoria()
+    busqueda=BusquedaLocal(cada=1,mejores=2,max_pasos=2)
+    optimizar_gen(POOL,V,C,20,*datos(),0.05,5,1e-4,30,semilla=0,cache=CacheFitness(),
+                  busqueda_local=busqueda,observadores=[historial])
+    for registro in historial.registros:
+        # la tasa se mide sobre los 20 genes de la generación
+        fallos=(1-registro["tasa_cache"])*20
+        assert np.isclose(fallos,round(fallos))
+        assert registro["evaluaciones"]<=round(fallos)
+        assert registro["evaluaciones_busqueda_local"]>0
+    assert historial.columna("evaluaciones_busqueda_local").sum()==busqueda.evaluaciones
@@ -0,0 +1,92 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from algoritmo_gen import gen_a_diccionario
+from almacen_memorias import ARCHIVO_METADATOS, AlmacenMemorias
+from benchmarks.sintetico import generar_panel
+from funciones_redes import red_completa
+from prediccion import Predictor
+
+V,C=2,2
+
+@pytest.fixture
+def datos():
+    rng=np.random.default_rng(0)
+    gen=rng.choice(np.linspace(-2,2,50),12*V+V+C+1)
+    historia=[rng.random((rng.integers(1,6),V)) for _ in range(30)]
+    nuevos=[rng.random((rng.integers(0,3),V)) for _ in range(30)]
+    identificadores=np.array([f"P{i:03d}" for i in range(30)])
+    return Predictor(gen,V,C),historia,nuevos,rng.random((30,C)),identificadores
+
+def test_update_igual_a_recalcular_y_no_repite_pasos(datos,tmp_path):
+    predictor,historia,nuevos,const,identificadores=datos
+    almacen=AlmacenMemorias(str(tmp_path))
+    completa=[np.concatenate([h,n]) for h,n in zip(historia,nuevos)]
+    esperado=predictor.predict(completa,const)
+    predictor.update(historia,const,almacen,0,identificadores)
+    previos=np.array([len(h) for h in historia])
+    for _ in range(2):
+        # repetir la misma actualización no avanza de nuevo la red
+        assert (predictor.update(nuevos,const,almacen,previos,
+                                 identificadores)==esperado).all()
+    _,_,pasos,_=almacen.leer(predictor.version,identificadores,V)
+    assert (pasos==[len(i) for i in completa]).all()
+    # con observaciones que se solapan solo se aplican las que faltan
+    solapadas=[np.concatenate([h[-1:],n]) for h,n in zip(historia,nuevos)]
+    assert (predictor.update(solapadas,const,almacen,previos-1,
+                             identificadores)==esperado).all()
+    with pytest.raises(ValueError):
+        predictor.update(nuevos,const,almacen,previos+len(max(nuevos,key=len))+1,
+                         identificadores)
+
+def test_almacen_sin_metadatos_levanta_error(datos,tmp_path):
+    predictor,historia,_,const,identificadores=datos
+    almacen=AlmacenMemorias(str(tmp_path))
+    predictor.update(historia,const,almacen,0,identificadores)
+    assert almacen.versiones()==[predictor.version]
+    os.remove(os.path.join(str(tmp_path),predictor.version,ARCHIVO_METADATOS))
+    with pytest.raises(FileNotFoundError):
+        almacen.leer(predictor.version,identificadores,V)
+
+@pytest.fixture
+def panel():
+    temporal,constante,_=generar_panel(23,5,V,C,1,3)
+    rng=np.random.default_rng(4)
+    gen=rng.choice(np.linspace(-2,2,50),12*V+V+C+1)
+    valores=[grupo[["var1","var2"]].to_numpy(dtype=np.float32).astype(float)
+             for _,grupo in temporal.groupby("NDI",sort=True)]
+    const=constante.sort_values("NDI")[["const1","const2"]].to_numpy(dtype=float)
+    esperado=red_completa(valores,const,*gen_a_diccionario(gen,V,C))
+    return Predictor(gen,V,C),temporal,constante,valores,const,esperado
+
+@pytest.mark.parametrize("tamano",[1,4,23,100])
+def test_predict_igual_a_red_completa(panel,tamano):
+    predictor,_,_,valores,const,esperado=panel
+    assert (predictor.predict(valores,const,tamano_bloque=tamano)==esperado).all()
+
+@pytest.mark.parametrize("tamano_chunk",[1,2,7,1000])
+def test_predict_stream_igual_a_red_completa(panel,tamano_chunk,tmp_path):
+    predictor,temporal,constante,_,_,esperado=panel
+    ruta=str(tmp_path/"temporal.csv")
+    temporal.merge(constante,on="NDI").to_csv(ruta,index=False)
+    salida=str(tmp_path/"prediccion.csv")
+    resumen=predictor.predict_stream(ruta,salida,"NDI",
+                                     ["NDI","fecha","const1","const2","const3"],
+                                     columnas_const=["const1","const2"],
+                                     tamano_chunk=tamano_chunk)
+    resultado=pd.read_csv(salida)
+    assert resumen["filas"]==len(temporal) and resumen["individuos"]==23
+    assert resultado["NDI"].tolist()==sorted(constante["NDI"])
+    assert (resultado["prediccion"].to_numpy()==esperado).all()
+
+def test_predict_stream_archivo_vacio(panel,tmp_path):
+    predictor,temporal,_,_,_,_=panel
+    ruta=str(tmp_path/"vacio.csv")
+    temporal.iloc[:0].to_csv(ruta,index=False)
+    salida=str(tmp_path/"prediccion.csv")
+    resumen=predictor.predict_stream(ruta,salida,"NDI",["NDI","fecha"],
+                                     data_const=pd.DataFrame({"NDI":[],"const1":[],
+                                                              "const2":[]}))
+    assert resumen["filas"]==0
+    assert len(pd.read_csv(salida))==0
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+import funciones_redes
+from algoritmo_gen import crear_poblacion, gen_a_diccionario, genes_a_pesos, optimizar_gen
+from cache_lstm import CacheLSTM
+from funciones_redes import red_completa, red_completa_poblacion, datos_a_tensor
+
+VAR_REDES=3
+VAR_CONST=4
+
+@pytest.fixture
+def datos():
+    rng=np.random.default_rng(0)
+    data_temp=[rng.random((rng.integers(1,7),VAR_REDES)) for _ in range(40)]
+    data_const=rng.random((40,VAR_CONST))
+    poblacion=crear_poblacion(np.linspace(-2,2,50),VAR_REDES,VAR_CONST,15,rng)
+    return data_temp,data_const,poblacion
+
+def esperado(data_temp,data_const,poblacion):
+    resultados=[]
+    for gen in poblacion:
+        pesos_lstm,pesos_const=gen_a_diccionario(gen,VAR_REDES,VAR_CONST)
+        resultados.append(red_completa(data_temp,data_const,pesos_lstm,pesos_const))
+    return np.array(resultados)
+
+@pytest.mark.parametrize("tamano_bloque",[None,1,7,40])
+def test_poblacion_igual_a_red_completa(datos,tamano_bloque):
+    data_temp,data_const,poblacion=datos
+    pesos_lstm,pesos_const=genes_a_pesos(poblacion,VAR_REDES,VAR_CONST)
+    resultado=red_completa_poblacion(data_temp,data_const,pesos_lstm,pesos_const,
+                                     tamano_bloque=tamano_bloque)
+    assert (resultado==esperado(data_temp,data_const,poblacion)).all()
+
+def test_poblacion_igual_con_tensor_y_empaquetado(datos):
+    data_temp,data_const,poblacion=datos
+    pesos_lstm,pesos_const=genes_a_pesos(poblacion,VAR_REDES,VAR_CONST)
+    tensor,longitudes=datos_a_tensor(data_temp)
+    longitudes_emp=np.array([len(i) for i in data_temp])
+    offsets=np.concatenate([[0],np.cumsum(longitudes_emp)])
+    empaquetado={"valores":np.concatenate(data_temp),"offsets":offsets,
+                 "longitudes":longitudes_emp,"identificadores":np.arange(len(data_temp))}
+    referencia=esperado(data_temp,data_const,poblacion)
+    assert (red_completa_poblacion(tensor,data_const,pesos_lstm,pesos_const,
+                                   longitudes)==referencia).all()
+    assert (red_completa_poblacion(empaquetado,data_const,pesos_lstm,
+                                   pesos_const)==referencia).all()
+
+def test_red_completa_usa_la_fila_de_cada_individuo():
+    data_temp=[np.zeros((2,1)),np.zeros((2,1))]
+    data_const=np.array([[1.0],[-1.0]])
+    pesos_lstm={"var1":dict.fromkeys(["w01","w11","b11","w02","w12","b12",
+                                      "w03","w13","b13","w04","w14","b14"],0.0)}
+    pesos_const={"var1":0.0,"var2":1.0,"bcat":0.0}
+    assert red_completa(data_temp,data_const,pesos_lstm,pesos_const).tolist()==[1,0]
+    pesos_const["bcat"]=2.0
+    assert red_completa(data_temp,data_const,pesos_lstm,pesos_const).tolist()==[1,1]
+
+def test_cache_lstm_por_bloques_igual_sin_cache(datos):
+    data_temp,data_const,poblacion=datos
+    pesos_lstm,pesos_const=genes_a_pesos(poblacion,VAR_REDES,VAR_CONST)
+    cache=CacheLSTM()
+    referencia=red_completa_poblacion(data_temp,data_const,pesos_lstm,pesos_const)
+    for _ in range(2):
+        resultado=red_completa_poblacion(data_temp,data_const,pesos_lstm,pesos_const,
+                                         tamano_bloque=7,cache_lstm=cache)
+        assert (resultado==referencia).all()
+    assert cache.cerrar_generacion()["aciertos"]>0
+
+def test_bloque_por_defecto_limita_la_memoria(datos,monkeypatch):
+    data_temp,data_const,poblacion=datos
+    pesos_lstm,pesos_const=genes_a_pesos(poblacion,VAR_REDES,VAR_CONST)
+    referencia=esperado(data_temp,data_const,poblacion)
+    tensor,longitudes=datos_a_tensor(data_temp)
+    monkeypatch.setattr(funciones_redes,"ELEMENTOS_POR_BLOQUE",15*VAR_REDES*6)
+    assert funciones_redes.tamano_bloque_red(15,VAR_REDES)==6
+    tamanos=[]
+    original=funciones_redes.red_lstm_poblacion
+    def registrar(bloque,*args,**kwargs):
+        tamanos.append(bloque.shape[0])
+        return original(bloque,*args,**kwargs)
+    monkeypatch.setattr(funciones_redes,"red_lstm_poblacion",registrar)
+    for datos_red,long_red in ((data_temp,None),(tensor,longitudes)):
+        tamanos.clear()
+        assert (red_completa_poblacion(datos_red,data_const,pesos_lstm,pesos_const,
+                                       long_red)==referencia).all()
+        assert max(tamanos)==6 and sum(tamanos)==40
+
+def test_optimizar_gen_con_tamano_bloque_red(datos):
+    data_temp,data_const,_=datos
+    verdadero=np.arange(40)%2
+    pool=np.linspace(-2,2,50)
+    resultados=[optimizar_gen(pool,VAR_REDES,VAR_CONST,10,data_temp,data_const,verdadero,
+                              0.05,4,1e-4,10,semilla=0,observadores=[],
+                              tamano_bloque_red=tamano)
+                for tamano in (None,3)]
+    assert resultados[0][0]==resultados[1][0]
+    assert (resultados[0][1]==resultados[1][1]).all()
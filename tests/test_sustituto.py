@@ -0,0 +1,45 @@
+import numpy as np
+from algoritmo_gen import calcular_fitness, optimizar_gen
+from sustituto import ModeloSustituto
+
+V,C=2,3
+POOL=np.linspace(-2,2,50)
+
+def datos():
+    rng=np.random.default_rng(0)
+    return ([rng.random((rng.integers(2,7),V)) for _ in range(60)],rng.random((60,C)),
+            rng.integers(0,2,60))
+
+def test_mejor_gen_con_fitness_exacto():
+    data_red,data_const,verdadero=datos()
+    sustituto=ModeloSustituto(minimo_entrenamiento=20)
+    valor_opt,param_opt=optimizar_gen(POOL,V,C,20,data_red,data_const,verdadero,0.05,15,
+                                      1e-4,30,semilla=0,sustituto=sustituto,
+                                      observadores=[])
+    assert sustituto.evaluaciones_evitadas>0
+    exacto=calcular_fitness(param_opt[None,:],data_red,data_const,V,C,verdadero)
+    assert valor_opt==exacto[0]
+
+def test_solo_estima_genes_no_completos():
+    rng=np.random.default_rng(1)
+    sustituto=ModeloSustituto(minimo_entrenamiento=10,revalidar_cada=0)
+    real=lambda genes:np.abs(genes).sum(axis=1)
+    sustituto.evaluar(rng.choice(POOL,(30,4)),real)
+    poblacion=rng.choice(POOL,(30,4))
+    fitness,completos=sustituto.evaluar(poblacion,real)
+    assert not completos.all()
+    assert (fitness[completos]==real(poblacion[completos])).all()
+
+def test_reanudar_con_sustituto(tmp_path):
+    ruta=str(tmp_path/"ck.npz")
+    completo=optimizar_gen(POOL,V,C,20,*datos(),0.05,12,1e-4,30,semilla=3,
+                           sustituto=ModeloSustituto(minimo_entrenamiento=20),
+                           observadores=[])
+    optimizar_gen(POOL,V,C,20,*datos(),0.05,5,1e-4,30,semilla=3,
+                  sustituto=ModeloSustituto(minimo_entrenamiento=20),
+                  ruta_checkpoint=ruta,observadores=[])
+    reanudado=optimizar_gen(POOL,V,C,20,*datos(),0.05,12,1e-4,30,semilla=3,
+                            sustituto=ModeloSustituto(minimo_entrenamiento=20),
+                            resume_from=ruta,observadores=[])
+    assert completo[0]==reanudado[0]
+    assert (completo[1]==reanudado[1]).all()